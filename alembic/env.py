@@ -25,6 +25,9 @@ try:
 
     # Penting: Impor SEMUA model yang ingin Anda lacak dengan Alembic
     from app.models.artwork import Artwork
+    from app.models.artwork_hash_band import ArtworkHashBand
+    from app.models.email_outbox import EmailOutbox
+    from app.models.upload_job import UploadJob
     from app.models.user import User
     # from app.models.receipt import Receipt
     # from app.models.your_other_model import YourOtherModel # Jika ada model lain
@@ -0,0 +1,97 @@
+"""add bigint perceptual hash columns and hash band index
+
+Revision ID: 182f236f8125
+Revises: 36b07c88590a
+Create Date: 2026-10-18 09:12:40.518337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '182f236f8125'
+down_revision: Union[str, None] = '36b07c88590a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (kolom hex, kolom bigint), urutannya = nilai `kind` di artwork_hash_bands
+HASH_COLUMNS = [
+    ('hash', 'hash_bits'),
+    ('hash_phash', 'hash_phash_bits'),
+    ('hash_dhash', 'hash_dhash_bits'),
+    ('hash_whash', 'hash_whash_bits'),
+]
+HASH_BANDS = 4
+BAND_BITS = 16
+BATCH_SIZE = 1000
+
+
+def _backfill() -> None:
+    """Mengisi kolom bigint dan band dari hash hex yang sudah ada."""
+    bind = op.get_bind()
+    artworks = sa.table(
+        'artworks',
+        sa.column('id', sa.UUID()),
+        *(sa.column(hex_col, sa.String()) for hex_col, _ in HASH_COLUMNS),
+        *(sa.column(bits_col, sa.BigInteger()) for _, bits_col in HASH_COLUMNS),
+    )
+    bands = sa.table(
+        'artwork_hash_bands',
+        sa.column('artwork_id', sa.UUID()),
+        sa.column('kind', sa.SmallInteger()),
+        sa.column('band', sa.SmallInteger()),
+        sa.column('value', sa.Integer()),
+    )
+
+    rows = bind.execute(
+        sa.select(artworks.c.id, *(artworks.c[hex_col] for hex_col, _ in HASH_COLUMNS))
+    ).fetchall()
+    band_rows = []
+    for row in rows:
+        values = {}
+        for kind, (hex_col, bits_col) in enumerate(HASH_COLUMNS):
+            hex_hash = row._mapping[hex_col]
+            if not hex_hash:
+                continue
+            value = int(hex_hash, 16) & 0xFFFFFFFFFFFFFFFF
+            values[bits_col] = value - (1 << 64) if value >= (1 << 63) else value
+            for band in range(HASH_BANDS):
+                band_rows.append({
+                    'artwork_id': row.id,
+                    'kind': kind,
+                    'band': band,
+                    'value': (value >> (BAND_BITS * band)) & 0xFFFF,
+                })
+        if values:
+            bind.execute(artworks.update().where(artworks.c.id == row.id).values(**values))
+        if len(band_rows) >= BATCH_SIZE:
+            bind.execute(bands.insert(), band_rows)
+            band_rows = []
+    if band_rows:
+        bind.execute(bands.insert(), band_rows)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for _, bits_col in HASH_COLUMNS:
+        op.add_column('artworks', sa.Column(bits_col, sa.BigInteger(), nullable=True))
+    op.create_table('artwork_hash_bands',
+    sa.Column('artwork_id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.SmallInteger(), nullable=False),
+    sa.Column('band', sa.SmallInteger(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['artwork_id'], ['artworks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('artwork_id', 'kind', 'band')
+    )
+    op.create_index('ix_artwork_hash_bands_lookup', 'artwork_hash_bands', ['kind', 'band', 'value'], unique=False)
+    _backfill()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_artwork_hash_bands_lookup', table_name='artwork_hash_bands')
+    op.drop_table('artwork_hash_bands')
+    for _, bits_col in reversed(HASH_COLUMNS):
+        op.drop_column('artworks', bits_col)
@@ -0,0 +1,43 @@
+"""add orientation-canonical perceptual hash columns
+
+Revision ID: 5c1f0e7a9b42
+Revises: 182f236f8125
+Create Date: 2026-10-18 15:02:11.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f0e7a9b42'
+down_revision: Union[str, None] = '182f236f8125'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Urutannya = nilai `kind` - CANONICAL_KIND_OFFSET di artwork_hash_bands
+CANONICAL_COLUMNS = [
+    'canonical_hash_bits',
+    'canonical_phash_bits',
+    'canonical_dhash_bits',
+    'canonical_whash_bits',
+]
+CANONICAL_KIND_OFFSET = 4
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Hash kanonik dihitung dari file gambar, bukan dari hash yang sudah ada;
+    artwork lama diisi dengan `python -m app.jobs.backfill_canonical_hashes`.
+    """
+    for column in CANONICAL_COLUMNS:
+        op.add_column('artworks', sa.Column(column, sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f'DELETE FROM artwork_hash_bands WHERE kind >= {CANONICAL_KIND_OFFSET}')
+    for column in reversed(CANONICAL_COLUMNS):
+        op.drop_column('artworks', column)
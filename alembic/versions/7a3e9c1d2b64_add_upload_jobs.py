@@ -0,0 +1,52 @@
+"""add upload job queue table
+
+Revision ID: 7a3e9c1d2b64
+Revises: 5c1f0e7a9b42
+Create Date: 2026-10-18 18:40:27.913065
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3e9c1d2b64'
+down_revision: Union[str, None] = '5c1f0e7a9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'upload_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('owner_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('stage', sa.String(length=32), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('upload_path', sa.Text(), nullable=False),
+        sa.Column('artwork_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('error_status', sa.Integer(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('worker', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_upload_jobs_owner_id', 'upload_jobs', ['owner_id'], unique=False)
+    op.create_index('ix_upload_jobs_status_created', 'upload_jobs', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_upload_jobs_status_created', table_name='upload_jobs')
+    op.drop_index('ix_upload_jobs_owner_id', table_name='upload_jobs')
+    op.drop_table('upload_jobs')
@@ -0,0 +1,38 @@
+"""add sha256 digest columns for content-addressed artwork storage
+
+Revision ID: b1e7c3a9d024
+Revises: 9d4b2f6e8a15
+Create Date: 2026-10-18 21:26:03.118540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1e7c3a9d024'
+down_revision: Union[str, None] = '9d4b2f6e8a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    File upload mentah artwork lama tidak disimpan, jadi content_sha256 tetap
+    NULL; image_sha256 diisi dari file yang ada dengan
+    `python -m app.jobs.backfill_image_digests`.
+    """
+    op.add_column('artworks', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.add_column('artworks', sa.Column('image_sha256', sa.String(length=64), nullable=True))
+    op.create_index('ix_artworks_content_sha256', 'artworks', ['content_sha256'], unique=True)
+    op.create_index('ix_artworks_image_sha256', 'artworks', ['image_sha256'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_artworks_image_sha256', table_name='artworks')
+    op.drop_index('ix_artworks_content_sha256', table_name='artworks')
+    op.drop_column('artworks', 'image_sha256')
+    op.drop_column('artworks', 'content_sha256')
@@ -0,0 +1,36 @@
+"""add indexed copyright_hash column to artworks
+
+Revision ID: d4f8a2c6e913
+Revises: b1e7c3a9d024
+Create Date: 2026-10-18 23:02:41.527310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f8a2c6e913'
+down_revision: Union[str, None] = 'b1e7c3a9d024'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Nilainya SHA-256 hex dari unique_key (sama dengan hash yang disisipkan ke
+    LSB saat upload), diisi untuk semua artwork lama dengan sha256() bawaan
+    Postgres (11+) sebelum kolom dibuat NOT NULL.
+    """
+    op.add_column('artworks', sa.Column('copyright_hash', sa.String(length=64), nullable=True))
+    op.execute("UPDATE artworks SET copyright_hash = encode(sha256(convert_to(unique_key, 'UTF8')), 'hex')")
+    op.alter_column('artworks', 'copyright_hash', existing_type=sa.String(length=64), nullable=False)
+    op.create_index('ix_artworks_copyright_hash', 'artworks', ['copyright_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_artworks_copyright_hash', table_name='artworks')
+    op.drop_column('artworks', 'copyright_hash')
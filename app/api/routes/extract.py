@@ -1,7 +1,7 @@
 import logging # Tambahkan ini
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from app.steganography import extract_message_lsb, xor_encrypt_decrypt
+from app.steganography import extract_watermark as extract_stego_watermark, xor_encrypt_decrypt
 import os
 import time
 import requests
@@ -44,20 +44,19 @@ def extract_watermark(data: ExtractWatermarkRequest):
             logger.info(f"EXTRACT: Using local image path: {temp_path}")
 
         start = time.time()
-        extracted = extract_message_lsb(temp_path)
+        watermark = extract_stego_watermark(temp_path)
         elapsed = time.time() - start
-        logger.info(f"EXTRACT: Raw extracted message: '{extracted}' (took {elapsed:.4f}s)") 
+        logger.info(f"EXTRACT: Raw extracted watermark: {watermark} (took {elapsed:.4f}s)") 
 
-        if not extracted.startswith("COPYRIGHT:"):
-            logger.warning(f"EXTRACT: Watermark not found or invalid format. Extracted: '{extracted[:50]}...'")
+        if not watermark:
+            logger.warning("EXTRACT: Watermark not found or invalid format.")
             raise HTTPException(status_code=400, detail="Watermark not found")
 
-        parts = extracted.split("<USER_MESSAGE>")
-        copyright_hash = parts[0].replace("COPYRIGHT:", "").strip()
+        copyright_hash = watermark["copyright_hash"]
         creator_message = None
 
-        if len(parts) > 1:
-            encrypted_creator_message = parts[1]
+        if watermark["user_message"]:
+            encrypted_creator_message = watermark["user_message"]
             logger.info(f"EXTRACT: Encrypted creator message part: '{encrypted_creator_message}'")
             logger.info(f"EXTRACT: Attempting to decrypt with buyer_secret_code: '{data.buyer_secret_code}'")
             creator_message = xor_encrypt_decrypt(encrypted_creator_message, data.buyer_secret_code)
@@ -0,0 +1,19 @@
+"""/static/<key> untuk STORAGE_BACKEND=s3: dialihkan ke URL objek di bucket.
+
+Dengan backend lokal path ini dilayani langsung oleh mount StaticFiles.
+"""
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import RedirectResponse
+
+from app.storage import get_storage
+
+router = APIRouter()
+
+
+@router.get("/static/{key:path}")
+def redirect_to_storage(key: str):
+    try:
+        url = get_storage().url(key)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="File tidak ditemukan.")
+    return RedirectResponse(url, status_code=307)
@@ -7,7 +7,7 @@ from app.models.artwork import Artwork
 from app.models.receipt import Receipt, ReceiptStatusEnum
 from app.api.deps import get_current_user
 from app.schemas.receipt_schema import ReceiptDetailResponse
-from app.utils.send_email import send_purchase_email
+from app.services.email_outbox import enqueue_email
 import requests
 import os
 import base64
@@ -183,31 +183,26 @@ async def payment_callback(request: Request, db: Session = Depends(get_db)):
             )
 
     try:
-        db.commit()
-        db.refresh(receipt)
-        if artwork_to_update:
-            db.refresh(artwork_to_update)
-
         if receipt.status == ReceiptStatusEnum.paid and email_should_be_sent:
             artwork = artwork_to_update or db.query(Artwork).filter_by(id=receipt.artwork_id).first()
             buyer = db.query(User).filter_by(id=receipt.buyer_id).first()
             if artwork and buyer:
-                try:
-                    await send_purchase_email(
-                        to_email=buyer.email,
-                        context={
-                            "artwork_title": artwork.title,
-                            "purchase_date": receipt.purchase_date.strftime("%d %B %Y"),
-                            "price": float(receipt.amount),
-                            "buyer_secret_code": receipt.buyer_secret_code,
-                            "download_url": f"{FRONTEND_BASE_URL}{artwork.image_url}",
-                            "watermark_api": f"{BACKEND_API_BASE_URL}/api/extract/extract-watermark",
-                            "image_url": artwork.image_url,
-                            "receipt_id": str(receipt.id)
-                        }
-                    )
-                except Exception:
-                    pass
+                # Tanda terima ikut ter-commit bersama status lunas; dikirim sender outbox
+                enqueue_email(db, buyer.email, "purchase", {
+                    "artwork_title": artwork.title,
+                    "purchase_date": receipt.purchase_date.strftime("%d %B %Y") if receipt.purchase_date else "-",
+                    "price": float(receipt.amount),
+                    "buyer_secret_code": receipt.buyer_secret_code,
+                    "download_url": f"{FRONTEND_BASE_URL}{artwork.image_url}",
+                    "watermark_api": f"{BACKEND_API_BASE_URL}/api/extract/extract-watermark",
+                    "image_url": artwork.image_url,
+                    "receipt_id": str(receipt.id)
+                })
+
+        db.commit()
+        db.refresh(receipt)
+        if artwork_to_update:
+            db.refresh(artwork_to_update)
     except Exception as e:
         db.rollback()
         return {"message": "Callback Midtrans diterima, tetapi ada masalah internal saat menyimpan data.", "error": str(e)}, 200
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.process_pool import pool_stats
+from app.services.warmup import readiness
+
+router = APIRouter()
+
+
+@router.get("/cpu-pool")
+def get_cpu_pool_stats():
+    return pool_stats()
+
+
+@router.get("/ready")
+def get_readiness():
+    status = readiness()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
@@ -6,15 +6,15 @@ from fastapi.responses import StreamingResponse
 from app.schemas.user_schema import UserResponse, UserLogin, UserUpdate
 from app.models.user import User
 from app.api.deps import get_db, get_current_user
+from app.services.upload_service import remove_from_indexes
+from app.storage import get_storage, key_from_url, static_url
 from passlib.hash import bcrypt
 import uuid
 import os
-import shutil
 
 router = APIRouter()    
 
-UPLOAD_DIR = "static/profile_pictures"
-BASE_URL = "/static/profile_pictures"   
+PROFILE_PICTURE_PREFIX = "profile_pictures"
 
 
 @router.post("/register", response_model=UserResponse)
@@ -34,14 +34,10 @@ async def register_user(
     profile_picture_url = None
 
     if file:
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        filename = f"{user_id}_{file.filename}"
-        file_path = os.path.join(UPLOAD_DIR, filename)
+        key = f"{PROFILE_PICTURE_PREFIX}/{user_id}_{os.path.basename(file.filename)}"
+        await get_storage().put_stream(key, file.file, content_type=file.content_type)
 
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        profile_picture_url = f"{request.url.scheme}://{request.url.netloc}{BASE_URL}/{filename}"
+        profile_picture_url = f"{request.url.scheme}://{request.url.netloc}{static_url(key)}"
 
     new_user = User(
         id=user_id,
@@ -100,7 +96,7 @@ def update_user(user_id: uuid.UUID, update: UserUpdate, db: Session = Depends(ge
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: uuid.UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_user(user_id: uuid.UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     db_user = db.query(User).filter(User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -109,13 +105,15 @@ def delete_user(user_id: uuid.UUID, db: Session = Depends(get_db), current_user:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this user")
 
     if db_user.profile_picture:
-        filename = os.path.basename(db_user.profile_picture)
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        key = key_from_url(db_user.profile_picture)
+        if key:
+            await get_storage().delete(key)
 
+    artwork_ids = [artwork.id for artwork in db_user.artworks]
     db.delete(db_user)
     db.commit()
+    for artwork_id in artwork_ids:
+        remove_from_indexes(artwork_id)
     return {"message": "User deleted successfully"}
 
 
@@ -3,61 +3,56 @@
 from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.db.database import get_db
+from app.crud.artwork_crud import get_artwork_with_owner_by_copyright_hash
 from app.models.artwork import Artwork
 from app.models.user import User
-from app.steganography import extract_message_lsb
-from app.utils.image_similarity import compute_all_hashes, is_similar_image
-import os, uuid, hashlib, io
-from PIL import Image
+from app.core.process_pool import run_in_pool
+from app.services.image_tasks import artwork_snapshot, match_artwork, verify_image
+from app.services.ingest import ImageRejected, receive_image
+import uuid
 
 router = APIRouter()
 
-UPLOAD_DIR = "static/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 @router.post("/verify_artwork", status_code=status.HTTP_200_OK)
 async def verify_artwork(
     image: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    temp_file_path = None
-    
     try:
-        content = await image.read()
-        pil_image = Image.open(io.BytesIO(content)).convert("RGB")
+        received = await receive_image(image)
+        try:
+            content = received.read()
+        finally:
+            received.close()
         
-        temp_file_name = f"temp_verify_{uuid.uuid4().hex}.png"
-        temp_file_path = os.path.join(UPLOAD_DIR, temp_file_name)
-        pil_image.save(temp_file_path)
-            
-        extracted_message = extract_message_lsb(temp_file_path)
+        # Satu task pool: decode sekali, LSB dibaca langsung dari gambar di memori
+        # (tanpa file sementara), sekaligus input cek kemiripan dari gambar yang sama
+        result = await run_in_pool(verify_image, content)
         
-        if not extracted_message:
-            raise HTTPException(status_code=404, detail="Tidak ada watermark steganografi yang ditemukan.")
+        if not result["watermark"]:
+            # Potongan artwork tidak membawa payload LSB; sumbernya dicari di tile index
+            fragments = result["fragments"]
+            source = db.query(Artwork).filter(Artwork.id == uuid.UUID(fragments[0]["artwork_id"])).first() if fragments else None
+            if not source:
+                raise HTTPException(status_code=404, detail="Tidak ada watermark steganografi yang ditemukan.")
+            owner = db.query(User).filter(User.id == source.owner_id).first()
+            return {
+                "verified": False,
+                "message": "Watermark steganografi tidak ditemukan, tetapi gambar cocok dengan potongan karya seni di database.",
+                "title": source.title,
+                "owner_name": owner.username if owner else None,
+                "image_url": source.image_url,
+                "region": fragments[0]["region"]
+            }
             
-        parts = extracted_message.split("<USER_MESSAGE>")
-        extracted_hash = parts[0].replace("COPYRIGHT:", "")
-        
-        # Cari semua karya seni dan bandingkan hash satu per satu
-        artworks = db.query(Artwork).all()
-        artwork = None
-        for art in artworks:
-            # Buat hash dari unique_key yang disimpan di database
-            db_hash = hashlib.sha256(art.unique_key.encode()).hexdigest()
-            if db_hash == extracted_hash:
-                artwork = art
-                break
-        
-        if not artwork:
+        # Lookup index copyright_hash, artwork dan pemiliknya dalam satu query
+        found = get_artwork_with_owner_by_copyright_hash(db, result["watermark"]["copyright_hash"])
+        if not found:
             raise HTTPException(status_code=404, detail="Karya seni tidak ditemukan di database.")
-            
-        owner = db.query(User).filter(User.id == artwork.owner_id).first()
-        if not owner:
-            raise HTTPException(status_code=404, detail="Pemilik karya seni tidak ditemukan.")
+        artwork, owner = found
         
-        # Verifikasi kesamaan gambar
-        hashes_to_verify = compute_all_hashes(pil_image)
-        if not is_similar_image(hashes_to_verify, pil_image, artwork):
+        # Verifikasi kesamaan gambar (di pool, dari input yang sudah dihitung)
+        if not await run_in_pool(match_artwork, result["query"], artwork_snapshot(artwork)):
             return {
                 "verified": False,
                 "message": "Watermark steganografi terdeteksi, tetapi gambar tidak cocok dengan gambar asli di database."
@@ -77,9 +72,7 @@ async def verify_artwork(
         
     except HTTPException as e:
         raise e
+    except ImageRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Verifikasi gagal: {str(e)}")
-        
-    finally:
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Verifikasi gagal: {str(e)}")
\ No newline at end of file
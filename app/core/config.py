@@ -20,5 +20,102 @@ class Settings(BaseSettings):
     MAIL_SERVER: str = Field(..., env="MAIL_SERVER")
     MAIL_STARTTLS: bool = Field(True, env="MAIL_STARTTLS")
     MAIL_SSL_TLS: bool = Field(False, env="MAIL_SSL_TLS")
+    SMTP_TIMEOUT: float = Field(30, env="SMTP_TIMEOUT")
+
+    # Outbox email: sender latar belakang di proses API (false jika dijalankan
+    # terpisah lewat app.jobs.email_sender), ukuran batch dan jadwal retry
+    EMAIL_SENDER_ENABLED: bool = Field(True, env="EMAIL_SENDER_ENABLED")
+    EMAIL_OUTBOX_BATCH_SIZE: int = Field(20, env="EMAIL_OUTBOX_BATCH_SIZE")
+    EMAIL_OUTBOX_POLL_SECONDS: float = Field(2.0, env="EMAIL_OUTBOX_POLL_SECONDS")
+    EMAIL_MAX_ATTEMPTS: int = Field(6, env="EMAIL_MAX_ATTEMPTS")
+    EMAIL_RETRY_BASE_SECONDS: float = Field(30, env="EMAIL_RETRY_BASE_SECONDS")
+    EMAIL_RETRY_MAX_SECONDS: float = Field(3600, env="EMAIL_RETRY_MAX_SECONDS")
+
+    # Jumlah worker process untuk pekerjaan gambar CPU-bound.
+    # Kosong = jumlah core, 0 = tanpa process pool (pakai thread executor).
+    CPU_POOL_WORKERS: int | None = Field(None, env="CPU_POOL_WORKERS")
+
+    # Direktori file memory-mapped berisi perceptual hash seluruh katalog. Semua
+    # path index di bawah ini harus menunjuk ke direktori yang sama untuk proses
+    # API dan worker upload (satu host atau volume bersama); proses lain memetakan
+    # ulang file begitu jumlah barisnya berubah
+    HASH_INDEX_PATH: str = Field("data/hash_index", env="HASH_INDEX_PATH")
+    # "memory" = index memory-mapped lokal, "database" = tabel band di Postgres
+    # (untuk deploy stateless seperti Vercel)
+    HASH_INDEX_BACKEND: str = Field("memory", env="HASH_INDEX_BACKEND")
+    # Hash orientasi kanonik (tahan rotasi 90 derajat dan cermin)
+    CANONICAL_HASH_INDEX_PATH: str = Field("data/hash_index_canonical", env="CANONICAL_HASH_INDEX_PATH")
+    # phash per tile (grid 2x2 dan 4x4) untuk mendeteksi potongan artwork
+    TILE_INDEX_PATH: str = Field("data/tile_index", env="TILE_INDEX_PATH")
+    TILE_MAX_DISTANCE: int = Field(3, env="TILE_MAX_DISTANCE")
+    TILE_MIN_MATCHES: int = Field(2, env="TILE_MIN_MATCHES")
+    # Deskriptor ORB seluruh katalog (multi-probe LSH). Naikkan ORB_LSH_BITS
+    # untuk katalog besar agar bucket tetap kecil
+    ORB_INDEX_PATH: str = Field("data/orb_index", env="ORB_INDEX_PATH")
+    ORB_LSH_TABLES: int = Field(8, env="ORB_LSH_TABLES")
+    ORB_LSH_BITS: int = Field(16, env="ORB_LSH_BITS")
+    # Interval task latar belakang API yang me-merge ekor ORB index ke postings
+    ORB_POSTINGS_MERGE_SECONDS: float = Field(60, env="ORB_POSTINGS_MERGE_SECONDS")
+
+    # Thumbnail + deskriptor ORB per artwork untuk tahap SSIM/ORB
+    FEATURE_STORE_PATH: str = Field("data/features", env="FEATURE_STORE_PATH")
+    FEATURE_CACHE_SIZE: int = Field(1024, env="FEATURE_CACHE_SIZE")
+
+    # Embedding ResNet18 (float16) dan batas cosine similarity untuk duplikat
+    EMBEDDING_INDEX_PATH: str = Field("data/embeddings", env="EMBEDDING_INDEX_PATH")
+    EMBEDDING_THRESHOLD: float = Field(0.95, env="EMBEDDING_THRESHOLD")
+    # false = tanpa torch/ResNet sama sekali; duplikat dicek lewat hash + SSIM/ORB
+    NEURAL_SIMILARITY_ENABLED: bool = Field(True, env="NEURAL_SIMILARITY_ENABLED")
+
+    # Batas kandidat dan waktu (ms) per tahap cascade deteksi duplikat
+    SIMILARITY_HASH_TOP_K: int = Field(8, env="SIMILARITY_HASH_TOP_K")
+    SIMILARITY_HASH_BUDGET_MS: float = Field(100, env="SIMILARITY_HASH_BUDGET_MS")
+    SIMILARITY_TILE_TOP_K: int = Field(5, env="SIMILARITY_TILE_TOP_K")
+    SIMILARITY_TILE_BUDGET_MS: float = Field(100, env="SIMILARITY_TILE_BUDGET_MS")
+    SIMILARITY_ORB_TOP_K: int = Field(8, env="SIMILARITY_ORB_TOP_K")
+    SIMILARITY_ORB_BUDGET_MS: float = Field(300, env="SIMILARITY_ORB_BUDGET_MS")
+    SIMILARITY_EMBEDDING_TOP_K: int = Field(8, env="SIMILARITY_EMBEDDING_TOP_K")
+    SIMILARITY_EMBEDDING_BUDGET_MS: float = Field(500, env="SIMILARITY_EMBEDDING_BUDGET_MS")
+    SIMILARITY_RERANK_MAX_CANDIDATES: int = Field(12, env="SIMILARITY_RERANK_MAX_CANDIDATES")
+    SIMILARITY_RERANK_BUDGET_MS: float = Field(2000, env="SIMILARITY_RERANK_BUDGET_MS")
+    # Thread rerank SSIM/ORB per proses, dan batas kandidat paralel per request
+    SIMILARITY_RERANK_THREADS: int = Field(4, env="SIMILARITY_RERANK_THREADS")
+    SIMILARITY_RERANK_CONCURRENCY: int = Field(4, env="SIMILARITY_RERANK_CONCURRENCY")
+
+    # Batas file upload (byte) dan resolusi gambar (piksel) yang diterima;
+    # upload disimpan di memori sampai UPLOAD_SPOOL_BYTES, sisanya di file sementara
+    MAX_UPLOAD_BYTES: int = Field(25 * 1024 * 1024, env="MAX_UPLOAD_BYTES")
+    MAX_IMAGE_PIXELS: int = Field(40_000_000, env="MAX_IMAGE_PIXELS")
+    UPLOAD_SPOOL_BYTES: int = Field(2 * 1024 * 1024, env="UPLOAD_SPOOL_BYTES")
+
+    # Antrean job upload (tabel upload_jobs); file mentah disimpan di storage
+    # privat (lihat get_private_storage) sampai worker selesai
+    UPLOAD_JOB_POLL_SECONDS: float = Field(1.0, env="UPLOAD_JOB_POLL_SECONDS")
+    # Job "running" tanpa heartbeat selama ini dianggap ditinggal worker yang mati;
+    # worker memperbarui heartbeat tiap UPLOAD_JOB_HEARTBEAT_SECONDS (harus jauh lebih kecil)
+    UPLOAD_JOB_STALE_SECONDS: float = Field(600, env="UPLOAD_JOB_STALE_SECONDS")
+    UPLOAD_JOB_HEARTBEAT_SECONDS: float = Field(30, env="UPLOAD_JOB_HEARTBEAT_SECONDS")
+    UPLOAD_JOB_MAX_ATTEMPTS: int = Field(3, env="UPLOAD_JOB_MAX_ATTEMPTS")
+
+    # Penyimpanan file artwork dan foto profil: "local" (STORAGE_LOCAL_ROOT) atau
+    # "s3" (bucket S3-compatible, dipakai bersama semua node API dan worker)
+    STORAGE_BACKEND: str = Field("local", env="STORAGE_BACKEND")
+    STORAGE_LOCAL_ROOT: str = Field("static", env="STORAGE_LOCAL_ROOT")
+    # File yang tidak boleh diunduh publik (upload mentah sebelum watermark);
+    # untuk "s3" wajib bucket terpisah yang tidak publik
+    PRIVATE_STORAGE_LOCAL_ROOT: str = Field("data/private", env="PRIVATE_STORAGE_LOCAL_ROOT")
+    S3_PRIVATE_BUCKET: str | None = Field(None, env="S3_PRIVATE_BUCKET")
+    # Masa berlaku presigned URL jika bucket tidak publik
+    STORAGE_URL_EXPIRE_SECONDS: int = Field(3600, env="STORAGE_URL_EXPIRE_SECONDS")
+    S3_BUCKET: str | None = Field(None, env="S3_BUCKET")
+    S3_PREFIX: str = Field("", env="S3_PREFIX")
+    # Kosong = AWS; isi untuk MinIO/R2 dsb. (mis. http://localhost:9000)
+    S3_ENDPOINT_URL: str | None = Field(None, env="S3_ENDPOINT_URL")
+    S3_REGION: str | None = Field(None, env="S3_REGION")
+    S3_ACCESS_KEY_ID: str | None = Field(None, env="S3_ACCESS_KEY_ID")
+    S3_SECRET_ACCESS_KEY: str | None = Field(None, env="S3_SECRET_ACCESS_KEY")
+    # URL publik bucket/CDN; jika kosong, file diakses lewat presigned URL
+    S3_PUBLIC_BASE_URL: str | None = Field(None, env="S3_PUBLIC_BASE_URL")
+    S3_MULTIPART_PART_BYTES: int = Field(8 * 1024 * 1024, env="S3_MULTIPART_PART_BYTES")
 
 settings = Settings() 
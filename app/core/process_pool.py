@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_executor: ProcessPoolExecutor | None = None
+_workers = 0
+# _started baru True setelah _executor (jika ada) siap dipakai
+_started = False
+_start_lock = threading.Lock()
+# Startup pool yang sedang berjalan di thread; ditunggu bersama oleh semua request
+_starting: asyncio.Future | None = None
+
+# Semua counter hanya diubah dari thread event loop, jadi tidak perlu lock
+_stats = {"submitted": 0, "completed": 0, "failed": 0, "in_flight": 0}
+_latencies: deque = deque(maxlen=512)  # (antri_detik, eksekusi_detik)
+
+
+def _init_worker() -> None:
+    # Import modul berat dan muat model sekali per worker agar task pertama
+    # tidak membayar biayanya
+    import app.services.image_tasks  # noqa: F401
+    from app.utils.image_similarity import warm_up_models
+
+    try:
+        warm_up_models()
+    except Exception as e:
+        # Worker tetap hidup; model dicoba dimuat lagi saat pertama dipakai
+        logger.warning(f"Gagal memuat model di worker {os.getpid()}: {e}")
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> tuple[Any, float, float]:
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return result, started, time.time()
+
+
+def _mp_context():
+    # Worker tidak di-fork langsung dari proses API yang sudah punya banyak thread
+    # (event loop, to_thread, rerank); forkserver memulai dari proses bersih
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def start_pool(workers: int | None = None) -> None:
+    """Membuat process pool dan memanaskan semua worker (blocking; aman dari thread mana pun).
+
+    Dari event loop gunakan ensure_pool().
+    """
+    global _executor, _workers, _started
+    with _start_lock:
+        if _started:
+            return
+
+        workers = settings.CPU_POOL_WORKERS if workers is None else workers
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 0:
+            logger.info("CPU pool dinonaktifkan; task CPU dijalankan di thread executor.")
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context(), initializer=_init_worker)
+            pids = {f.result() for f in [executor.submit(_worker_pid) for _ in range(workers)]}
+            logger.info(f"CPU pool siap: {workers} worker ({len(pids)} sudah dipanaskan).")
+            _executor = executor
+        _workers = workers
+        _started = True
+
+
+async def ensure_pool() -> None:
+    """Memulai pool di thread (sekali) dan menunggu sampai siap, tanpa memblokir event loop."""
+    global _starting
+    if _started:
+        return
+    if _starting is None or (_starting.done() and (_starting.cancelled() or _starting.exception() is not None)):
+        _starting = asyncio.ensure_future(asyncio.to_thread(start_pool))
+    # shield: request yang dibatalkan tidak ikut membatalkan startup untuk request lain
+    await asyncio.shield(_starting)
+
+
+def shutdown_pool() -> None:
+    global _executor, _started, _starting
+    with _start_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+        _started = False
+        _starting = None
+
+
+async def run_in_pool(fn: Callable, *args, **kwargs) -> Any:
+    """Menjalankan fungsi CPU-bound (top-level, picklable) di luar event loop.
+
+    Request yang datang sebelum pool siap menunggu startup-nya selesai, bukan
+    berjalan di thread executor proses API.
+    """
+    if not _started:
+        await ensure_pool()
+
+    loop = asyncio.get_running_loop()
+    submitted = time.time()
+    _stats["submitted"] += 1
+    _stats["in_flight"] += 1
+    try:
+        result, started, finished = await loop.run_in_executor(_executor, _timed_call, fn, args, kwargs)
+    except Exception:
+        _stats["failed"] += 1
+        raise
+    finally:
+        _stats["in_flight"] -= 1
+
+    _stats["completed"] += 1
+    _latencies.append((max(0.0, started - submitted), finished - started))
+    return result
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def pool_stats() -> dict:
+    """Kedalaman antrean dan latensi task (ms) untuk monitoring."""
+    waits = [w for w, _ in _latencies]
+    runs = [r for _, r in _latencies]
+    return {
+        "mode": "process" if _executor is not None else "thread",
+        "workers": _workers,
+        "in_flight": _stats["in_flight"],
+        "queue_depth": max(0, _stats["in_flight"] - _workers) if _executor is not None else 0,
+        "submitted": _stats["submitted"],
+        "completed": _stats["completed"],
+        "failed": _stats["failed"],
+        "queue_wait_ms": {
+            "avg": round(1000 * sum(waits) / len(waits), 2) if waits else 0.0,
+            "p95": round(1000 * _percentile(waits, 0.95), 2),
+        },
+        "run_ms": {
+            "avg": round(1000 * sum(runs) / len(runs), 2) if runs else 0.0,
+            "p95": round(1000 * _percentile(runs, 0.95), 2),
+        },
+    }
@@ -1,3 +1,4 @@
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from app.models.artwork import Artwork
 from app.models.user import User
@@ -15,4 +16,19 @@ def fet_all_artworks(
         query = query.filter(Artwork.category.ilike(f"%{category}%"))
     if license_type:
         query = query.filter(Artwork.license_type.ilike(f"%{license_type}%"))
-    return query.all()
\ No newline at end of file
+    return query.all()
+
+
+def get_artwork_with_owner_by_copyright_hash(db: Session, copyright_hash: str) -> tuple[Artwork, User] | None:
+    """Artwork beserta pemiliknya untuk hash hak cipta hasil ekstraksi (satu join ber-index)."""
+    return (
+        db.query(Artwork, User)
+        .join(User, User.id == Artwork.owner_id)
+        .filter(Artwork.copyright_hash == copyright_hash)
+        .first()
+    )
+
+
+def get_artwork_by_digest(db: Session, sha256: str) -> Artwork | None:
+    """Artwork yang file upload aslinya atau file hasil watermark-nya identik (SHA-256)."""
+    return db.query(Artwork).filter(or_(Artwork.content_sha256 == sha256, Artwork.image_sha256 == sha256)).first()
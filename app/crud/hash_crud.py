@@ -0,0 +1,125 @@
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+from app.models.artwork import Artwork
+from app.models.artwork_hash_band import ArtworkHashBand
+from app.services.hash_index import (
+    CANONICAL_KIND_OFFSET,
+    HASH_KINDS,
+    from_signed64,
+    hash_bands,
+    hex_to_int,
+    required_band_matches,
+    to_signed64,
+)
+
+BITS_COLUMNS = {
+    "ahash": Artwork.hash_bits,
+    "phash": Artwork.hash_phash_bits,
+    "dhash": Artwork.hash_dhash_bits,
+    "whash": Artwork.hash_whash_bits,
+}
+CANONICAL_BITS_COLUMNS = {
+    "ahash": Artwork.canonical_hash_bits,
+    "phash": Artwork.canonical_phash_bits,
+    "dhash": Artwork.canonical_dhash_bits,
+    "whash": Artwork.canonical_whash_bits,
+}
+
+
+def _columns(canonical: bool) -> tuple[dict, int]:
+    """(kolom BIGINT per jenis hash, offset `kind` di artwork_hash_bands)."""
+    if canonical:
+        return CANONICAL_BITS_COLUMNS, CANONICAL_KIND_OFFSET
+    return BITS_COLUMNS, 0
+
+
+def _add_hash_rows(db: Session, artwork: Artwork, hashes: dict, canonical: bool) -> None:
+    columns, kind_offset = _columns(canonical)
+    for kind_index, kind in enumerate(HASH_KINDS):
+        value = hex_to_int(hashes.get(kind))
+        setattr(artwork, columns[kind].key, to_signed64(value))
+        if value is None:
+            continue
+        db.add_all(
+            ArtworkHashBand(artwork_id=artwork.id, kind=kind_offset + kind_index, band=band, value=band_value)
+            for band, band_value in enumerate(hash_bands(value))
+        )
+
+
+def set_artwork_hashes(db: Session, artwork: Artwork, hashes: dict, canonical_hashes: dict | None = None) -> None:
+    """Mengisi kolom BIGINT dan baris band untuk artwork (belum di-commit)."""
+    _add_hash_rows(db, artwork, hashes, canonical=False)
+    if canonical_hashes:
+        set_canonical_hashes(db, artwork, canonical_hashes)
+
+
+def set_canonical_hashes(db: Session, artwork: Artwork, canonical_hashes: dict) -> None:
+    """Seperti set_artwork_hashes, hanya untuk hash orientasi kanonik."""
+    _add_hash_rows(db, artwork, canonical_hashes, canonical=True)
+
+
+def find_hash_candidates(
+    db: Session,
+    hashes: dict,
+    max_distance: int = 2,
+    min_matches: int = 2,
+    canonical: bool = False,
+) -> list:
+    """Artwork yang minimal `min_matches` jenis hash-nya berjarak <= `max_distance` bit.
+
+    Kandidat diambil lewat lookup equality di index (kind, band, value), lalu
+    jarak sebenarnya diverifikasi dari kolom BIGINT. Hasil diurutkan dari yang
+    paling dekat. `canonical=True` mencari di hash orientasi kanonik.
+    """
+    needed_bands = required_band_matches(max_distance)
+    columns, kind_offset = _columns(canonical)
+
+    query_bits = {}
+    probes = []
+    for kind_index, kind in enumerate(HASH_KINDS):
+        value = hex_to_int(hashes.get(kind))
+        if value is None:
+            continue
+        query_bits[kind] = value
+        probes.extend(
+            and_(
+                ArtworkHashBand.kind == kind_offset + kind_index,
+                ArtworkHashBand.band == band,
+                ArtworkHashBand.value == band_value,
+            )
+            for band, band_value in enumerate(hash_bands(value))
+        )
+    if len(query_bits) < min_matches:
+        return []
+
+    per_kind = (
+        select(ArtworkHashBand.artwork_id)
+        .where(or_(*probes))
+        .group_by(ArtworkHashBand.artwork_id, ArtworkHashBand.kind)
+        .having(func.count() >= needed_bands)
+        .subquery()
+    )
+    candidate_ids = (
+        select(per_kind.c.artwork_id)
+        .group_by(per_kind.c.artwork_id)
+        .having(func.count() >= min_matches)
+    )
+    rows = (
+        db.query(Artwork.id, *(columns[kind] for kind in query_bits))
+        .filter(Artwork.id.in_(candidate_ids))
+        .all()
+    )
+
+    matches = []
+    for row in rows:
+        distances = []
+        for kind, stored in zip(query_bits, row[1:]):
+            stored = from_signed64(stored)
+            if stored is None:
+                continue
+            distance = bin(stored ^ query_bits[kind]).count("1")
+            if distance <= max_distance:
+                distances.append(distance)
+        if len(distances) >= min_matches:
+            matches.append((sum(distances), row.id))
+    return [artwork_id for _, artwork_id in sorted(matches, key=lambda m: m[0])]
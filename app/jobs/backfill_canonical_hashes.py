@@ -0,0 +1,83 @@
+"""Job offline: isi hash orientasi kanonik untuk artwork lama.
+
+Pemakaian:
+    python -m app.jobs.backfill_canonical_hashes [--batch-size 200] [--workers 4]
+
+Hash kanonik dihitung dari file gambar di static/ (gambar yang sudah diberi
+watermark, karena file asli upload tidak disimpan). Artwork yang filenya hilang
+dilewati. Setelah selesai, index kanonik memory-mapped dibangun ulang.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+
+from PIL import Image
+
+from app.utils.image_hashing import compute_canonical_hashes
+
+logger = logging.getLogger(__name__)
+
+
+def image_path(image_url: str) -> str:
+    """File artwork di STORAGE_LOCAL_ROOT; "" (dilewati) jika URL bukan /static/<key>."""
+    from app.core.config import settings
+    from app.storage import LocalStorage, key_from_url
+
+    key = key_from_url(image_url)
+    return LocalStorage(settings.STORAGE_LOCAL_ROOT).path(key) if key else ""
+
+
+def canonical_hashes_from_file(item: tuple[str, str]) -> tuple[str, dict | None]:
+    artwork_id, path = item
+    try:
+        with Image.open(path) as image:
+            return artwork_id, compute_canonical_hashes(image.convert("RGB"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Gagal membaca gambar artwork {artwork_id} ({path}): {e}")
+        return artwork_id, None
+
+
+def run(batch_size: int = 200, workers: int | None = None) -> int:
+    from app.crud.hash_crud import set_canonical_hashes
+    from app.db.database import SessionLocal
+    from app.models.artwork import Artwork
+    # Relasi Artwork baru bisa dikonfigurasi jika semua model sudah terdaftar
+    from app.models import like, purchase, receipt, user  # noqa: F401
+    from app.services.hash_index import sync_hash_index
+
+    filled, skipped = 0, set()
+    with SessionLocal() as db, multiprocessing.Pool(workers or os.cpu_count() or 1) as pool:
+        while True:
+            query = db.query(Artwork).filter(Artwork.canonical_hash_bits.is_(None))
+            if skipped:
+                query = query.filter(Artwork.id.notin_(skipped))
+            artworks = query.order_by(Artwork.id).limit(batch_size).all()
+            if not artworks:
+                break
+            by_id = {str(artwork.id): artwork for artwork in artworks}
+            items = [(artwork_id, image_path(artwork.image_url)) for artwork_id, artwork in by_id.items()]
+            for artwork_id, canonical in pool.imap_unordered(canonical_hashes_from_file, items):
+                if canonical is None:
+                    skipped.add(by_id[artwork_id].id)
+                    continue
+                set_canonical_hashes(db, by_id[artwork_id], canonical)
+                filled += 1
+            db.commit()
+            logger.info(f"{filled} artwork terisi, {len(skipped)} dilewati.")
+        sync_hash_index(db)
+    return filled
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Isi hash orientasi kanonik untuk artwork lama.")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses (default: jumlah core)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    run(batch_size=args.batch_size, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Job offline: isi SHA-256 file gambar (image_sha256) untuk artwork lama.
+
+Pemakaian:
+    python -m app.jobs.backfill_image_digests [--batch-size 500]
+
+Digest dihitung dari file hasil watermark di static/; upload ulang file yang
+identik lalu ditolak tanpa decode. File lama tidak dipindahkan ke layout blob
+store. Artwork yang filenya hilang, atau yang isinya identik dengan artwork
+lain, dilewati.
+"""
+import argparse
+import hashlib
+import logging
+
+from app.jobs.backfill_canonical_hashes import image_path
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def run(batch_size: int = 500) -> int:
+    from app.db.database import SessionLocal
+    from app.models.artwork import Artwork
+    # Relasi Artwork baru bisa dikonfigurasi jika semua model sudah terdaftar
+    from app.models import like, purchase, receipt, user  # noqa: F401
+
+    filled, skipped = 0, set()
+    with SessionLocal() as db:
+        seen = {digest for digest, in db.query(Artwork.image_sha256).filter(Artwork.image_sha256.isnot(None))}
+        while True:
+            query = db.query(Artwork).filter(Artwork.image_sha256.is_(None))
+            if skipped:
+                query = query.filter(Artwork.id.notin_(skipped))
+            artworks = query.order_by(Artwork.id).limit(batch_size).all()
+            if not artworks:
+                break
+            for artwork in artworks:
+                path = image_path(artwork.image_url)
+                try:
+                    digest = file_sha256(path)
+                except OSError as e:
+                    logger.warning(f"Gagal membaca gambar artwork {artwork.id} ({path}): {e}")
+                    skipped.add(artwork.id)
+                    continue
+                if digest in seen:
+                    logger.warning(f"Gambar artwork {artwork.id} identik dengan artwork lain; dilewati.")
+                    skipped.add(artwork.id)
+                    continue
+                artwork.image_sha256 = digest
+                seen.add(digest)
+                filled += 1
+            db.commit()
+            logger.info(f"{filled} artwork terisi, {len(skipped)} dilewati.")
+    return filled
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Isi SHA-256 file gambar untuk artwork lama.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    run(batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Job offline: bangun ulang ORB index dari fitur seluruh artwork.
+
+Pemakaian:
+    python -m app.jobs.build_orb_index [--workers 4]
+    python -m app.jobs.build_orb_index --compact
+    python -m app.jobs.build_orb_index --postings
+
+Deskriptor diambil dari feature store; artwork lama yang belum punya file
+fitur dihitung sekali dari gambarnya. --compact hanya membuang baris artwork
+yang sudah dihapus (tombstone) tanpa membaca feature store. --postings hanya
+me-merge ekor (baris yang di-append upload) ke file postings.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+
+from app.jobs.backfill_canonical_hashes import image_path
+
+logger = logging.getLogger(__name__)
+
+
+def descriptors_for(item: tuple[str, str]):
+    from app.services.feature_store import get_feature_store
+
+    artwork_id, path = item
+    features = get_feature_store().get(artwork_id, path)
+    if features is None:
+        logger.warning(f"Fitur artwork {artwork_id} tidak tersedia ({path}).")
+        return artwork_id, None
+    return artwork_id, features.descriptors
+
+
+def run(workers: int | None = None) -> int:
+    from app.db.database import SessionLocal
+    from app.models.artwork import Artwork
+    # Relasi Artwork baru bisa dikonfigurasi jika semua model sudah terdaftar
+    from app.models import like, purchase, receipt, user  # noqa: F401
+    from app.services.orb_index import get_orb_index
+
+    with SessionLocal() as db:
+        items = [(str(row.id), image_path(row.image_url)) for row in db.query(Artwork.id, Artwork.image_url)]
+
+    with multiprocessing.Pool(workers or os.cpu_count() or 1) as pool:
+        count = get_orb_index().rebuild(pool.imap_unordered(descriptors_for, items, chunksize=8))
+    logger.info(f"ORB index dibangun ulang: {count} deskriptor dari {len(items)} artwork.")
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bangun ulang ORB index dari fitur seluruh artwork.")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses (default: jumlah core)")
+    parser.add_argument("--compact", action="store_true", help="hanya buang baris artwork yang sudah dihapus")
+    parser.add_argument("--postings", action="store_true", help="hanya susun ulang postings dari baris saat ini")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    if args.compact:
+        from app.services.orb_index import get_orb_index
+        count = get_orb_index().compact()
+        logger.info(f"ORB index di-compact: {count} deskriptor tersisa.")
+        return
+    if args.postings:
+        from app.services.orb_index import get_orb_index
+        get_orb_index().build_postings()
+        return
+    run(workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Job offline: bangun ulang tile index dari gambar seluruh artwork.
+
+Pemakaian:
+    python -m app.jobs.build_tile_index [--workers 4]
+
+Dipakai untuk mengisi index pertama kali (artwork lama) atau setelah file
+index hilang. Artwork yang filenya hilang dilewati.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+
+from PIL import Image
+
+from app.jobs.backfill_canonical_hashes import image_path
+from app.services.tile_index import compute_tile_hashes
+
+logger = logging.getLogger(__name__)
+
+
+def tile_hashes_from_file(item: tuple[str, str]) -> tuple[str, list]:
+    artwork_id, path = item
+    try:
+        with Image.open(path) as image:
+            return artwork_id, compute_tile_hashes(image.convert("RGB"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Gagal membaca gambar artwork {artwork_id} ({path}): {e}")
+        return artwork_id, []
+
+
+def run(workers: int | None = None) -> int:
+    from app.db.database import SessionLocal
+    from app.models.artwork import Artwork
+    # Relasi Artwork baru bisa dikonfigurasi jika semua model sudah terdaftar
+    from app.models import like, purchase, receipt, user  # noqa: F401
+    from app.services.tile_index import get_tile_index
+
+    with SessionLocal() as db:
+        items = [(str(row.id), image_path(row.image_url)) for row in db.query(Artwork.id, Artwork.image_url)]
+
+    with multiprocessing.Pool(workers or os.cpu_count() or 1) as pool:
+        count = get_tile_index().rebuild(pool.imap_unordered(tile_hashes_from_file, items, chunksize=8))
+    logger.info(f"Tile index dibangun ulang: {count} tile dari {len(items)} artwork.")
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bangun ulang tile index dari gambar seluruh artwork.")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses (default: jumlah core)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    run(workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
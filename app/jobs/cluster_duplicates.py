@@ -0,0 +1,388 @@
+"""Job offline: cari cluster near-duplicate di seluruh tabel artworks.
+
+Pemakaian:
+    python -m app.jobs.cluster_duplicates --output reports/duplicates.json
+    python -m app.jobs.cluster_duplicates --output reports/duplicates.csv --workers 8
+
+Pasangan kandidat tidak dicari O(N^2), melainkan lewat bucket LSH:
+
+- hash: setiap hash 64-bit dipecah menjadi HASH_BANDS band 16-bit (sama dengan
+  tabel artwork_hash_bands). Dua hash berjarak <= 2 pasti berbagi minimal satu
+  band, sehingga aturan duplikat saat upload (MIN_SIMILAR_HASHES hash dekat)
+  tidak ada yang terlewat;
+- embedding (jika ada): random-hyperplane LSH, beberapa tabel signature.
+
+Bucket dibagi menjadi shard yang diproses paralel di beberapa proses. Setiap
+shard yang selesai dicatat di direktori checkpoint sehingga job yang terhenti
+bisa dilanjutkan (default) tanpa mengulang shard yang sudah selesai. Pasangan
+yang terverifikasi digabung dengan union-find menjadi cluster, lalu ditulis
+sebagai laporan JSON atau CSV.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.services.hash_index import BAND_BITS, HASH_BANDS, HASH_KINDS, hex_to_int, popcount64
+from app.utils.files import write_bytes_atomic
+
+logger = logging.getLogger(__name__)
+
+# Jumlah shard per (jenis hash, band) atau per tabel embedding
+VALUE_SHARDS = 16
+
+# Data katalog untuk worker; diisi sebelum fork agar tidak perlu di-pickle
+_data: dict = {}
+
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def load_catalog(include_embeddings: bool = True) -> dict:
+    """Hash (uint64) dan embedding seluruh artwork, diurutkan berdasarkan id."""
+    from app.db.database import SessionLocal
+    from app.models.artwork import Artwork
+    # Relasi Artwork baru bisa dikonfigurasi jika semua model sudah terdaftar
+    from app.models import like, purchase, receipt, user  # noqa: F401
+
+    ids, titles, urls, rows = [], [], [], []
+    with SessionLocal() as db:
+        query = db.query(
+            Artwork.id, Artwork.title, Artwork.image_url,
+            Artwork.hash, Artwork.hash_phash, Artwork.hash_dhash, Artwork.hash_whash,
+        ).order_by(Artwork.id)
+        for row in query.yield_per(10000):
+            ids.append(str(row.id))
+            titles.append(row.title)
+            urls.append(row.image_url)
+            rows.append([row.hash, row.hash_phash, row.hash_dhash, row.hash_whash])
+
+    count = len(ids)
+    bits = np.zeros((count, len(HASH_KINDS)), dtype=np.uint64)
+    valid = np.zeros((count, len(HASH_KINDS)), dtype=bool)
+    for i, hashes in enumerate(rows):
+        for k, hex_hash in enumerate(hashes):
+            value = hex_to_int(hex_hash)
+            if value is not None:
+                bits[i, k] = value
+                valid[i, k] = True
+
+    embeddings, has_embedding = None, np.zeros(count, dtype=bool)
+    if include_embeddings and count:
+        from app.services.embedding_index import EMBEDDING_DIM, get_embedding_index
+
+        index = get_embedding_index()
+        positions = index.positions(ids)
+        has_embedding = positions >= 0
+        if has_embedding.any():
+            embeddings = np.zeros((count, EMBEDDING_DIM), dtype=np.float32)
+            embeddings[has_embedding] = index._columns["vectors"][positions[has_embedding]].astype(np.float32)
+
+    return {
+        "ids": ids,
+        "titles": titles,
+        "urls": urls,
+        "bits": bits,
+        "valid": valid,
+        "embeddings": embeddings,
+        "has_embedding": has_embedding,
+    }
+
+
+def fingerprint(catalog: dict, params: dict) -> str:
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+    for artwork_id in catalog["ids"]:
+        digest.update(artwork_id.encode())
+    return digest.hexdigest()
+
+
+def _embedding_signatures(embeddings: np.ndarray, tables: int, bits: int, seed: int) -> np.ndarray:
+    """Signature SimHash per tabel, int64[N, tables]."""
+    rng = np.random.default_rng(seed)
+    planes = rng.standard_normal((tables, bits, embeddings.shape[1])).astype(np.float32)
+    weights = (1 << np.arange(bits, dtype=np.int64))
+    signatures = np.empty((len(embeddings), tables), dtype=np.int64)
+    for t in range(tables):
+        signatures[:, t] = ((embeddings @ planes[t].T) > 0).astype(np.int64) @ weights
+    return signatures
+
+
+def build_shards(catalog: dict, params: dict) -> list[str]:
+    shards = [
+        f"hash:{k}:{b}:{m}"
+        for k in range(len(HASH_KINDS))
+        for b in range(HASH_BANDS)
+        for m in range(VALUE_SHARDS)
+    ]
+    if catalog["embeddings"] is not None:
+        shards += [f"embedding:{t}:{m}" for t in range(params["lsh_tables"]) for m in range(VALUE_SHARDS)]
+    return shards
+
+
+def _groups(members: np.ndarray, keys: np.ndarray, max_bucket: int):
+    """Bucket (baris dengan key sama) berukuran 2..max_bucket; juga jumlah bucket yang dilewati."""
+    order = np.argsort(keys, kind="stable")
+    members, keys = members[order], keys[order]
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+    skipped = 0
+    groups = []
+    for group in np.split(members, bounds):
+        if len(group) < 2:
+            continue
+        if len(group) > max_bucket:
+            skipped += 1
+            continue
+        groups.append(group)
+    return groups, skipped
+
+
+def _hash_pairs(group: np.ndarray, thresholds: np.ndarray, min_matches: int) -> list[tuple[int, int]]:
+    bits, valid = _data["bits"][group], _data["valid"][group]
+    dist = popcount64(bits[:, None, :] ^ bits[None, :, :])
+    both = valid[:, None, :] & valid[None, :, :]
+    close = ((dist <= thresholds) & both).sum(axis=2)
+    a, b = np.nonzero(np.triu(close >= min_matches, k=1))
+    return [(int(group[i]), int(group[j])) for i, j in zip(a, b)]
+
+
+def _embedding_pairs(group: np.ndarray, threshold: float) -> list[tuple[int, int]]:
+    vectors = _data["embeddings"][group]
+    a, b = np.nonzero(np.triu(vectors @ vectors.T >= threshold, k=1))
+    return [(int(group[i]), int(group[j])) for i, j in zip(a, b)]
+
+
+def process_shard(shard: str) -> dict:
+    """Pasangan near-duplicate terverifikasi di satu shard bucket."""
+    params = _data["params"]
+    kind, *parts = shard.split(":")
+    edges, skipped = [], 0
+
+    if kind == "hash":
+        k, band, modulo = (int(p) for p in parts)
+        values = (_data["bits"][:, k] >> np.uint64(BAND_BITS * band)) & np.uint64((1 << BAND_BITS) - 1)
+        members = np.flatnonzero(_data["valid"][:, k] & (values % VALUE_SHARDS == modulo))
+        groups, skipped = _groups(members, values[members], params["max_bucket"])
+        thresholds = np.array(params["hash_thresholds"], dtype=np.uint8)
+        for group in groups:
+            edges += [(a, b, "hash") for a, b in _hash_pairs(group, thresholds, params["min_similar_hashes"])]
+    else:
+        table, modulo = (int(p) for p in parts)
+        signatures = _data["signatures"][:, table]
+        members = np.flatnonzero(_data["has_embedding"] & (signatures % VALUE_SHARDS == modulo))
+        groups, skipped = _groups(members, signatures[members], params["max_bucket"])
+        for group in groups:
+            edges += [(a, b, "embedding") for a, b in _embedding_pairs(group, params["embedding_threshold"])]
+
+    return {"shard": shard, "edges": edges, "skipped_buckets": skipped}
+
+
+class Checkpoint:
+    """Shard yang sudah selesai + edge-nya, agar job bisa dilanjutkan."""
+
+    def __init__(self, directory: str, run_fingerprint: str, fresh: bool = False):
+        self.directory = directory
+        self.state_path = os.path.join(directory, "state.json")
+        self.edges_path = os.path.join(directory, "edges.jsonl")
+        self.fingerprint = run_fingerprint
+        self.done: set[str] = set()
+        self.edges: set[tuple[int, int, str]] = set()
+        self.skipped_buckets = 0
+        os.makedirs(directory, exist_ok=True)
+
+        state = None
+        if not fresh and os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                state = json.load(f)
+        if state and state.get("fingerprint") == run_fingerprint:
+            self.done = set(state["done"])
+            self.skipped_buckets = state.get("skipped_buckets", 0)
+            if os.path.exists(self.edges_path):
+                with open(self.edges_path) as f:
+                    for line in f:
+                        record = json.loads(line)
+                        if record["shard"] in self.done:
+                            self.edges.update(tuple(edge) for edge in record["edges"])
+            logger.info(f"Melanjutkan dari checkpoint: {len(self.done)} shard sudah selesai.")
+        else:
+            # Katalog atau parameter berubah: mulai dari awal
+            if os.path.exists(self.edges_path):
+                os.remove(self.edges_path)
+            self._save_state()
+
+    def _save_state(self) -> None:
+        state = {"fingerprint": self.fingerprint, "done": sorted(self.done), "skipped_buckets": self.skipped_buckets}
+        write_bytes_atomic(json.dumps(state).encode(), self.state_path)
+
+    def record(self, result: dict) -> None:
+        # Edge ditulis dulu; jika proses mati sebelum state disimpan, shard
+        # diulang dan edge ganda dibuang oleh set
+        with open(self.edges_path, "a") as f:
+            f.write(json.dumps({"shard": result["shard"], "edges": result["edges"]}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.edges.update(tuple(edge) for edge in result["edges"])
+        self.done.add(result["shard"])
+        self.skipped_buckets += result["skipped_buckets"]
+        self._save_state()
+
+
+def build_clusters(count: int, edges) -> list[list[int]]:
+    union_find = UnionFind(count)
+    for a, b, _ in edges:
+        union_find.union(a, b)
+    members: dict[int, set[int]] = {}
+    for a, b, _ in edges:
+        for item in (a, b):
+            members.setdefault(union_find.find(item), set()).add(item)
+    clusters = [sorted(items) for items in members.values()]
+    return sorted(clusters, key=lambda items: (-len(items), items[0]))
+
+
+def write_report(path: str, catalog: dict, clusters: list[list[int]], edges, summary: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["cluster", "cluster_size", "artwork_id", "title", "image_url"])
+            for number, cluster in enumerate(clusters, start=1):
+                for i in cluster:
+                    writer.writerow([number, len(cluster), catalog["ids"][i], catalog["titles"][i], catalog["urls"][i]])
+        return
+
+    cluster_of = {i: number for number, cluster in enumerate(clusters, start=1) for i in cluster}
+    cluster_edges: dict[int, list] = {}
+    for a, b, reason in sorted(edges):
+        cluster_edges.setdefault(cluster_of[a], []).append(
+            {"a": catalog["ids"][a], "b": catalog["ids"][b], "reason": reason}
+        )
+    report = {
+        **summary,
+        "clusters": [
+            {
+                "cluster": number,
+                "size": len(cluster),
+                "artworks": [
+                    {"id": catalog["ids"][i], "title": catalog["titles"][i], "image_url": catalog["urls"][i]}
+                    for i in cluster
+                ],
+                "edges": cluster_edges.get(number, []),
+            }
+            for number, cluster in enumerate(clusters, start=1)
+        ],
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def run(
+    output: str,
+    checkpoint_dir: str,
+    workers: int | None = None,
+    fresh: bool = False,
+    include_embeddings: bool = True,
+    max_bucket: int = 2000,
+    lsh_tables: int = 8,
+    lsh_bits: int = 16,
+    seed: int = 0,
+) -> dict:
+    from app.core.config import settings
+    from app.utils.image_similarity import HASH_THRESHOLDS, MIN_SIMILAR_HASHES
+
+    started = time.perf_counter()
+    catalog = load_catalog(include_embeddings)
+    params = {
+        "hash_thresholds": [HASH_THRESHOLDS[kind] for kind in HASH_KINDS],
+        "min_similar_hashes": MIN_SIMILAR_HASHES,
+        "embedding_threshold": settings.EMBEDDING_THRESHOLD,
+        "max_bucket": max_bucket,
+        "lsh_tables": lsh_tables,
+        "lsh_bits": lsh_bits,
+        "seed": seed,
+        "embeddings": catalog["embeddings"] is not None,
+    }
+    logger.info(f"{len(catalog['ids'])} artwork dimuat ({int(catalog['has_embedding'].sum())} dengan embedding).")
+
+    _data.clear()
+    _data.update(catalog, params=params)
+    if catalog["embeddings"] is not None:
+        _data["signatures"] = _embedding_signatures(catalog["embeddings"], lsh_tables, lsh_bits, seed)
+
+    checkpoint = Checkpoint(checkpoint_dir, fingerprint(catalog, params), fresh=fresh)
+    pending = [shard for shard in build_shards(catalog, params) if shard not in checkpoint.done]
+    logger.info(f"{len(pending)} shard akan diproses.")
+
+    workers = workers or os.cpu_count() or 1
+    if pending and workers > 1:
+        # fork: worker mewarisi _data tanpa pickle
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            for result in pool.imap_unordered(process_shard, pending):
+                checkpoint.record(result)
+    else:
+        for shard in pending:
+            checkpoint.record(process_shard(shard))
+
+    clusters = build_clusters(len(catalog["ids"]), checkpoint.edges)
+    summary = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "artworks": len(catalog["ids"]),
+        "pairs": len({(a, b) for a, b, _ in checkpoint.edges}),
+        "clusters_found": len(clusters),
+        "skipped_buckets": checkpoint.skipped_buckets,
+        "params": params,
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+    }
+    write_report(output, catalog, clusters, checkpoint.edges, summary)
+    logger.info(f"{len(clusters)} cluster duplikat ditulis ke {output}.")
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cari cluster near-duplicate di seluruh katalog artwork.")
+    parser.add_argument("--output", default="reports/duplicate_clusters.json", help="file laporan .json atau .csv")
+    parser.add_argument("--checkpoint-dir", default="data/cluster_checkpoint")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses (default: jumlah core)")
+    parser.add_argument("--fresh", action="store_true", help="abaikan checkpoint dan mulai dari awal")
+    parser.add_argument("--no-embeddings", action="store_true", help="hanya pakai perceptual hash")
+    parser.add_argument("--max-bucket", type=int, default=2000, help="bucket lebih besar dari ini dilewati")
+    parser.add_argument("--lsh-tables", type=int, default=8)
+    parser.add_argument("--lsh-bits", type=int, default=16)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    summary = run(
+        output=args.output,
+        checkpoint_dir=args.checkpoint_dir,
+        workers=args.workers,
+        fresh=args.fresh,
+        include_embeddings=not args.no_embeddings,
+        max_bucket=args.max_bucket,
+        lsh_tables=args.lsh_tables,
+        lsh_bits=args.lsh_bits,
+    )
+    print(json.dumps({key: value for key, value in summary.items() if key != "params"}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Sender outbox email sebagai proses terpisah.
+
+Pemakaian:
+    python -m app.jobs.email_sender
+
+Dipakai jika sender di proses API dimatikan (EMAIL_SENDER_ENABLED=false).
+Beberapa sender boleh berjalan bersamaan; batch dibagi lewat SKIP LOCKED.
+SIGTERM/SIGINT menghentikan sender setelah batch yang sedang dikirim selesai.
+"""
+import asyncio
+import logging
+import signal
+
+logger = logging.getLogger(__name__)
+
+
+async def run() -> None:
+    from app.services.email_outbox import run_sender
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    logger.info("Sender email outbox berjalan.")
+    await run_sender(stop)
+    logger.info("Sender email outbox berhenti.")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
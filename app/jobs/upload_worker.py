@@ -0,0 +1,172 @@
+"""Worker antrean upload: memproses job dari tabel upload_jobs.
+
+Pemakaian:
+    python -m app.jobs.upload_worker [--pool-workers 0] [--once]
+
+Jalankan sebanyak yang dibutuhkan, terpisah dari proses API; job dibagi lewat
+SELECT ... FOR UPDATE SKIP LOCKED (lihat app.services.upload_queue). Secara
+default gambar diproses di thread worker ini sendiri (tanpa process pool),
+karena skala diatur dengan menambah proses worker. Selama job berjalan,
+heartbeat diperbarui tiap UPLOAD_JOB_HEARTBEAT_SECONDS agar tahap yang lama
+tidak dianggap macet dan diambil worker lain. SIGTERM/SIGINT menghentikan
+worker setelah job yang sedang berjalan selesai.
+
+Index katalog ditulis ke file yang sama dengan proses API (lihat
+HASH_INDEX_PATH dkk.); proses API memetakan ulang file begitu barisnya
+bertambah, sehingga artwork dari worker langsung ikut dicek duplikatnya.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import threading
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+
+logger = logging.getLogger(__name__)
+
+
+async def process_job(db, job) -> None:
+    from app.models.artwork import Artwork
+    from app.models.user import User
+    from app.services import upload_queue
+    from app.services.upload_service import create_artwork, reindex_artwork
+
+    # Percobaan sebelumnya sudah menyimpan artwork sebelum worker-nya mati;
+    # indexing-nya mungkin belum selesai, jadi diulang sebelum job ditutup
+    artwork = db.query(Artwork).filter(Artwork.id == job.artwork_id).first()
+    if artwork:
+        upload_queue.set_stage(db, job, "indexing")
+        try:
+            await reindex_artwork(artwork, await upload_queue.read_upload(job))
+        except Exception:
+            # Artwork sudah tersimpan; index yang kurang bisa dilengkapi job build_*_index
+            logger.exception(f"Indexing ulang artwork {artwork.id} (job {job.id}) gagal")
+        await upload_queue.finish(db, job, jsonable_encoder({
+            "message": "Artwork uploaded successfully with steganography",
+            "artwork_id": artwork.id,
+            "image_url": artwork.image_url,
+            "unique_key": artwork.unique_key,
+        }))
+        return
+
+    user = db.query(User).filter(User.id == job.owner_id).first()
+    if not user:
+        await upload_queue.fail(db, job, "Pemilik upload tidak ditemukan.", 404)
+        return
+
+    params = job.params
+    try:
+        content = await upload_queue.read_upload(job)
+        result = await create_artwork(
+            db,
+            user,
+            content,
+            params["filename"],
+            title=params["title"],
+            description=params.get("description"),
+            category=params.get("category"),
+            license_type=params.get("license_type", "FREE"),
+            price=params.get("price", 0.0),
+            watermark_creator_message=params.get("watermark_creator_message"),
+            content_sha256=params.get("sha256"),
+            artwork_id=job.artwork_id,
+            on_stage=lambda stage: upload_queue.set_stage(db, job, stage),
+        )
+    except HTTPException as e:
+        db.rollback()
+        await upload_queue.fail(db, job, str(e.detail), e.status_code)
+        return
+    except Exception as e:
+        logger.exception(f"Job upload {job.id} gagal")
+        db.rollback()
+        await upload_queue.fail(db, job, f"Upload gagal: {str(e)}", 500)
+        return
+    await upload_queue.finish(db, job, jsonable_encoder(result))
+
+
+def keep_alive(job_id, worker: str, interval: float, stop: threading.Event) -> None:
+    """Memperbarui heartbeat job berkala sampai `stop` di-set (atau job lepas dari worker ini).
+
+    Berjalan di thread sendiri agar tetap jalan walau event loop sedang
+    mengerjakan bagian sinkron create_artwork (misalnya query database).
+    """
+    from app.db.database import SessionLocal
+    from app.services import upload_queue
+
+    while not stop.wait(interval):
+        try:
+            with SessionLocal() as db:
+                if not upload_queue.heartbeat(db, job_id, worker):
+                    logger.warning(f"Job upload {job_id} tidak lagi dipegang worker {worker}; heartbeat berhenti.")
+                    return
+        except Exception as e:
+            logger.warning(f"Heartbeat job upload {job_id} gagal: {e}")
+
+
+async def run(once: bool = False, pool_workers: int = 0) -> int:
+    """Memproses job sampai dihentikan (atau antrean kosong jika `once`)."""
+    from app.core import process_pool
+    from app.core.config import settings
+    from app.db.database import SessionLocal
+    # Relasi model baru bisa dikonfigurasi jika semua model sudah terdaftar
+    from app.models import artwork, like, purchase, receipt, user  # noqa: F401
+    from app.services import upload_queue
+
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    process_pool.start_pool(pool_workers)
+    logger.info(f"Worker upload {name} berjalan.")
+    processed = 0
+    try:
+        while not stop.is_set():
+            with SessionLocal() as db:
+                job = await upload_queue.claim_next(
+                    db, name, settings.UPLOAD_JOB_STALE_SECONDS, settings.UPLOAD_JOB_MAX_ATTEMPTS
+                )
+                if job is not None:
+                    logger.info(f"Memproses job upload {job.id} (percobaan {job.attempts}).")
+                    beat_stop = threading.Event()
+                    threading.Thread(
+                        target=keep_alive,
+                        args=(job.id, name, settings.UPLOAD_JOB_HEARTBEAT_SECONDS, beat_stop),
+                        daemon=True,
+                    ).start()
+                    try:
+                        await process_job(db, job)
+                    finally:
+                        beat_stop.set()
+                    logger.info(f"Job upload {job.id} selesai: {job.status}.")
+                    processed += 1
+                    continue
+            if once:
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), settings.UPLOAD_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        process_pool.shutdown_pool()
+    logger.info(f"Worker upload {name} berhenti setelah {processed} job.")
+    return processed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker antrean upload artwork.")
+    parser.add_argument("--pool-workers", type=int, default=0, help="process pool untuk pekerjaan gambar (default: 0, di thread)")
+    parser.add_argument("--once", action="store_true", help="berhenti saat antrean kosong")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+    asyncio.run(run(once=args.once, pool_workers=args.pool_workers))
+
+
+if __name__ == "__main__":
+    main()
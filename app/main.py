@@ -1,13 +1,21 @@
 import os
+import asyncio
 import logging
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+from app.core.config import settings
 from app.db.database import Base, engine
 from app.api.routes import users, auth, uploads, explore, payments, extract, likes, artwork_me, verification
 from app.api.routes.artworks import router as artworks_router
-from app.api.routes import purchase
+from app.api.routes import purchase, system, media
+from app.core.process_pool import shutdown_pool
+from app.services.email_outbox import run_sender
+from app.services.orb_index import run_postings_merger
+from app.services.warmup import warm_up
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -15,7 +23,27 @@ load_dotenv()
 
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Index, worker CPU dan model dipanaskan di latar belakang agar startup cepat;
+    # statusnya bisa dicek di /api/system/ready
+    warmup_task = asyncio.create_task(warm_up())
+    # Email sertifikat/pembelian dikirim dari outbox, di luar request
+    sender_stop = asyncio.Event()
+    sender_task = asyncio.create_task(run_sender(sender_stop)) if settings.EMAIL_SENDER_ENABLED else None
+    # Ekor ORB index di-merge ke postings di sini, bukan saat upload
+    merger_stop = asyncio.Event()
+    merger_task = asyncio.create_task(run_postings_merger(merger_stop))
+    yield
+    warmup_task.cancel()
+    if sender_task:
+        sender_stop.set()
+        await sender_task
+    merger_stop.set()
+    await merger_task
+    shutdown_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -38,6 +66,20 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logger.info("Server FastAPI dimulai...")
 
+# Body yang jelas melebihi batas upload ditolak sebelum form multipart di-parse
+# (dan di-spool ke disk); batas per file tetap dicek saat file dibaca
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+        return JSONResponse(
+            {"detail": f"File terlalu besar; maksimal {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB."},
+            status_code=413,
+        )
+    return await call_next(request)
+
 # CORS
 origins = [
     "http://localhost:3000",
@@ -66,4 +108,10 @@ app.include_router(extract.router, prefix="/api/extract", tags=["Extract"])
 app.include_router(likes.router, prefix="/api/likes", tags=["Likes"])
 app.include_router(purchase.router, prefix="/api/my", tags=["Purchase"]) 
 app.include_router(verification.router, tags=["Verification"])
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.include_router(system.router, prefix="/api/system", tags=["System"])
+# File artwork/foto profil: dari direktori lokal, atau dialihkan ke bucket S3
+if settings.STORAGE_BACKEND == "local":
+    os.makedirs(settings.STORAGE_LOCAL_ROOT, exist_ok=True)
+    app.mount("/static", StaticFiles(directory=settings.STORAGE_LOCAL_ROOT), name="static")
+else:
+    app.include_router(media.router, tags=["Media"])
@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, UUID, String, Numeric, DateTime, func, ForeignKey, Text, CheckConstraint
+    Column, UUID, String, Numeric, DateTime, func, ForeignKey, Text, CheckConstraint, BigInteger
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy import Boolean
@@ -21,6 +21,13 @@ def generate_unique_key(title, username, filename):
 
     return f"{unique_id}_{title_clean}_{username_clean}{ext}"
 
+def compute_copyright_hash(unique_key: str) -> str:
+    """Hash hak cipta yang disisipkan ke LSB gambar: SHA-256 hex dari unique_key."""
+    return hashlib.sha256(unique_key.encode()).hexdigest()
+
+def _default_copyright_hash(context) -> str:
+    return compute_copyright_hash(context.get_current_parameters()["unique_key"])
+
 
 class Artwork(Base):
     __tablename__ = "artworks"
@@ -44,12 +51,30 @@ class Artwork(Base):
     is_sold = Column(Boolean, nullable=False, default=False, server_default='false')
     image_url = Column(Text, nullable=False)
     unique_key = Column(String(255), unique=True, nullable=False)
+    # compute_copyright_hash(unique_key); verifikasi mencari artwork lewat index ini
+    copyright_hash = Column(String(64), unique=True, index=True, nullable=False, default=_default_copyright_hash)
+    # SHA-256 file upload mentah dan file hasil watermark (nama blob di storage);
+    # dipakai untuk menolak upload ulang yang identik tanpa decode
+    content_sha256 = Column(String(64), unique=True, index=True, nullable=True)
+    image_sha256 = Column(String(64), unique=True, index=True, nullable=True)
 
     hash = Column(Text, nullable=False)
     hash_phash = Column(String, nullable=True)
     hash_dhash = Column(String, nullable=True)
     hash_whash = Column(String, nullable=True)
 
+    # Hash yang sama dalam bentuk BIGINT (uint64 disimpan sebagai int64 bertanda)
+    hash_bits = Column(BigInteger, nullable=True)
+    hash_phash_bits = Column(BigInteger, nullable=True)
+    hash_dhash_bits = Column(BigInteger, nullable=True)
+    hash_whash_bits = Column(BigInteger, nullable=True)
+
+    # Hash orientasi kanonik (compute_canonical_hashes), sama untuk semua rotasi/cermin
+    canonical_hash_bits = Column(BigInteger, nullable=True)
+    canonical_phash_bits = Column(BigInteger, nullable=True)
+    canonical_dhash_bits = Column(BigInteger, nullable=True)
+    canonical_whash_bits = Column(BigInteger, nullable=True)
+
     owner = relationship("User", back_populates="artworks")
     receipts = relationship("Receipt", back_populates="artwork")
     likes = relationship("Like", back_populates="artwork", cascade="all, delete")
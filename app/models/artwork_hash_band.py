@@ -0,0 +1,17 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, SmallInteger
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.database import Base
+
+
+class ArtworkHashBand(Base):
+    """Satu band 16-bit dari perceptual hash artwork (multi-index hashing)."""
+    __tablename__ = "artwork_hash_bands"
+
+    artwork_id = Column(UUID(as_uuid=True), ForeignKey("artworks.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(SmallInteger, primary_key=True)  # posisi di HASH_KINDS, + CANONICAL_KIND_OFFSET untuk hash kanonik
+    band = Column(SmallInteger, primary_key=True)
+    value = Column(Integer, nullable=False)  # 0..65535
+
+    __table_args__ = (
+        Index("ix_artwork_hash_bands_lookup", "kind", "band", "value"),
+    )
@@ -0,0 +1,27 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.database import Base
+import uuid
+
+
+class EmailOutbox(Base):
+    """Email yang menunggu dikirim sender latar belakang (lihat app.services.email_outbox)."""
+    __tablename__ = "email_outbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    to_email = Column(String(255), nullable=False)
+    # Kunci di EMAIL_TEMPLATES ("certificate", "purchase")
+    template = Column(String(32), nullable=False)
+    context = Column(JSON, nullable=False)
+    # pending -> sent / failed
+    status = Column(String(16), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    # Baris pending baru diambil sender setelah waktu ini (backoff dan lease pengiriman)
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
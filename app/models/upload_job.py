@@ -0,0 +1,36 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.database import Base
+import uuid
+
+
+class UploadJob(Base):
+    """Upload artwork yang diproses worker terpisah (lihat app.services.upload_queue)."""
+    __tablename__ = "upload_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # queued -> running -> done / failed
+    status = Column(String(16), nullable=False, default="queued")
+    stage = Column(String(32), nullable=False, default="queued")
+    # Field form upload (title, description, category, ...) dan key storage file mentah
+    params = Column(JSON, nullable=False)
+    upload_path = Column(Text, nullable=False)
+    # Id artwork ditentukan saat enqueue agar percobaan ulang tidak membuat artwork ganda
+    artwork_id = Column(UUID(as_uuid=True), nullable=False, default=uuid.uuid4)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    error_status = Column(Integer, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker = Column(String(255), nullable=True)
+
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    # Diperbarui berkala oleh worker dan setiap pergantian tahap; job running yang lama
+    # tidak berubah dianggap macet
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_upload_jobs_status_created", "status", "created_at"),
+    )
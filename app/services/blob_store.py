@@ -0,0 +1,45 @@
+"""Penyimpanan file artwork berdasarkan isi (content-addressed).
+
+Nama file adalah SHA-256 isinya, dan key dibagi menurut prefix digest
+(`watermarked/ab/cd/abcd...png`), sehingga tiap direktori tetap kecil berapa
+pun jumlah artwork-nya. Isi yang sama selalu berakhir di key yang sama dan
+tidak ditulis dua kali. File disimpan lewat app.storage (lokal atau S3).
+"""
+import hashlib
+import io
+
+from PIL import Image
+
+from app.storage import Storage
+
+# Dua tingkat direktori x 2 karakter hex = 65536 direktori daun
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+
+
+def blob_key(prefix: str, digest: str, extension: str) -> str:
+    shards = [digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_LEVELS)]
+    return "/".join([prefix.strip("/"), *shards, f"{digest}.{extension.lstrip('.').lower()}"])
+
+
+def encode_image(image: Image.Image, extension: str, **save_kwargs) -> tuple[bytes, str]:
+    """Encode `image` sesuai ekstensi; mengembalikan (bytes, digest sha256)."""
+    image_format = Image.registered_extensions().get(f".{extension.lstrip('.').lower()}")
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **save_kwargs)
+    data = buffer.getvalue()
+    return data, hashlib.sha256(data).hexdigest()
+
+
+async def put_blob(storage: Storage, prefix: str, data: bytes, digest: str, extension: str) -> tuple[str, bool]:
+    """Menyimpan `data` (digest sha256-nya `digest`); mengembalikan (key, created).
+
+    `created` False berarti file dengan isi yang sama sudah ada (milik artwork
+    lain), jadi pemanggil tidak boleh menghapusnya saat membatalkan upload.
+    """
+    key = blob_key(prefix, digest, extension)
+    if await storage.exists(key):
+        return key, False
+    image_format = Image.registered_extensions().get(f".{extension.lstrip('.').lower()}")
+    await storage.put(key, data, content_type=Image.MIME.get(image_format))
+    return key, True
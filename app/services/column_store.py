@@ -0,0 +1,191 @@
+"""File kolom append-only yang di-memory-map, dasar untuk index katalog.
+
+Setiap kolom adalah satu file `<path>/<nama>.bin` berisi baris berukuran tetap.
+Penulisan (append/rebuild) dilakukan di bawah file lock; pembaca di proses lain
+memetakan ulang file saat ukurannya bertambah.
+
+File tidak pernah diubah di tengah: artwork yang dihapus dicatat sebagai
+tombstone (`<path>/tombstones/`) dan barisnya dilewati oleh pencarian sampai
+index ditulis ulang.
+"""
+import fcntl
+import os
+import uuid
+from typing import Iterable
+
+import numpy as np
+
+
+class ColumnStore:
+    # nama kolom -> (dtype, shape per baris); kolom "ids" berisi UUID artwork
+    COLUMNS: dict[str, tuple] = {"ids": (np.uint8, (16,))}
+    # False untuk store yang tidak mendukung delete() (misalnya Tombstones sendiri)
+    TOMBSTONES = True
+
+    def __init__(self, path: str):
+        self.path = path  # direktori berisi satu file per kolom
+        self._count = -1
+        self._identity = None
+        self._columns: dict[str, np.ndarray] = {}
+        self._tombstones = Tombstones(os.path.join(path, "tombstones")) if self.TOMBSTONES else None
+        self._stones_key = None
+        self._stones: tuple[np.ndarray, np.ndarray] = (np.zeros(0, dtype="V16"), np.zeros(0, dtype=np.int64))
+        self._dead_key = None
+        self._dead_rows = np.zeros(0, dtype=bool)
+        self._map(0)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def file_identity(self):
+        """(inode, device) file ids; berubah jika index ditulis ulang (rebuild)."""
+        try:
+            stat = os.stat(self._file("ids"))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_dev
+
+    def _map(self, count: int) -> None:
+        self._identity = self.file_identity()
+        for name, (dtype, shape) in self.COLUMNS.items():
+            if count:
+                self._columns[name] = np.memmap(self._file(name), dtype=dtype, mode="r", shape=(count, *shape))
+            else:
+                self._columns[name] = np.zeros((0, *shape), dtype=dtype)
+        self._count = count
+
+    def _refresh(self) -> None:
+        """Memetakan ulang file jika bertambah (misalnya di-append worker lain) atau ditulis ulang."""
+        counts = []
+        for name, (dtype, shape) in self.COLUMNS.items():
+            path = self._file(name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            counts.append(size // (np.dtype(dtype).itemsize * int(np.prod(shape, dtype=int))))
+        # Baris yang baru sebagian tertulis di kolom lain diabaikan
+        count = min(counts)
+        if count != self._count or self.file_identity() != self._identity:
+            self._map(count)
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self._count
+
+    def _locked(self):
+        os.makedirs(self.path, exist_ok=True)
+        lock = open(os.path.join(self.path, ".lock"), "a")
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def _append(self, row: dict[str, bytes]) -> None:
+        """Menambahkan satu baris (bytes per kolom) di bawah file lock."""
+        self._append_many([row])
+
+    def _append_many(self, rows: list[dict[str, bytes]]) -> None:
+        """Menambahkan beberapa baris sekaligus di bawah satu file lock."""
+        if not rows:
+            return
+        with self._locked():
+            # ids ditulis terakhir agar pembaca tidak melihat baris yang belum lengkap
+            for name in [*(n for n in self.COLUMNS if n != "ids"), "ids"]:
+                with open(self._file(name), "ab") as f:
+                    f.write(b"".join(row[name] for row in rows))
+
+    def _rewrite(self, rows: Iterable[dict[str, bytes]]) -> int:
+        """Menulis ulang seluruh file dari iterable baris."""
+        count = 0
+        with self._locked():
+            files = {name: open(self._file(name) + ".tmp", "wb") for name in self.COLUMNS}
+            try:
+                for row in rows:
+                    for name, f in files.items():
+                        f.write(row[name])
+                    count += 1
+            finally:
+                for f in files.values():
+                    f.close()
+            # Posisi tombstone lama tidak berlaku untuk file baru
+            if self._tombstones is not None:
+                self._tombstones._rewrite([])
+            for name in self.COLUMNS:
+                os.replace(self._file(name) + ".tmp", self._file(name))
+        self._count = -1
+        return count
+
+    def delete(self, artwork_id) -> None:
+        """Menandai semua baris artwork saat ini sebagai terhapus (tombstone)."""
+        self._refresh()
+        self._tombstones._append({
+            "ids": uuid.UUID(str(artwork_id)).bytes,
+            "before": np.int64(self._count).tobytes(),
+        })
+
+    def _tombstone_limits(self) -> tuple[np.ndarray, np.ndarray]:
+        """(id terhapus terurut, batas posisi per id); di-cache sampai tombstone bertambah."""
+        stones = self._tombstones
+        if stones is None:
+            return self._stones
+        stones._refresh()
+        key = (stones._count, stones._identity)
+        if key != self._stones_key:
+            if stones._count:
+                stone_ids = np.ascontiguousarray(stones._columns["ids"]).view("V16").ravel()
+                order = np.argsort(stone_ids, kind="stable")
+                stone_ids, before = stone_ids[order], np.asarray(stones._columns["before"])[order]
+                unique_ids, starts = np.unique(stone_ids, return_index=True)
+                self._stones = (unique_ids, np.maximum.reduceat(before, starts))
+            else:
+                self._stones = (np.zeros(0, dtype="V16"), np.zeros(0, dtype=np.int64))
+            self._stones_key = key
+        return self._stones
+
+    def _dead(self, positions: np.ndarray) -> np.ndarray:
+        """Mask baris yang sudah di-tombstone."""
+        positions = np.asarray(positions, dtype=np.int64)
+        unique_ids, limits = self._tombstone_limits()
+        if not len(unique_ids) or not len(positions):
+            return np.zeros(len(positions), dtype=bool)
+        ids = np.ascontiguousarray(self._columns["ids"][positions]).view("V16").ravel()
+        found = np.minimum(np.searchsorted(unique_ids, ids), len(unique_ids) - 1)
+        return (unique_ids[found] == ids) & (positions < limits[found])
+
+    def _dead_mask(self) -> np.ndarray:
+        """_dead untuk seluruh baris (bool[N]); di-cache per isi index dan tombstone."""
+        self._refresh()
+        self._tombstone_limits()
+        key = (self._count, self._identity, self._stones_key)
+        if key != self._dead_key:
+            self._dead_rows = self._dead(np.arange(self._count))
+            self._dead_key = key
+        return self._dead_rows
+
+    def artwork_id(self, position: int) -> uuid.UUID:
+        return uuid.UUID(bytes=self._columns["ids"][position].tobytes())
+
+    def positions(self, artwork_ids) -> np.ndarray:
+        """Posisi baris terakhir untuk tiap id, -1 jika tidak ada di index."""
+        self._refresh()
+        query = np.frombuffer(b"".join(uuid.UUID(str(a)).bytes for a in artwork_ids), dtype="V16")
+        stored = np.ascontiguousarray(self._columns["ids"]).view("V16").ravel()
+        result = np.full(len(query), -1, dtype=np.int64)
+        if not len(stored) or not len(query):
+            return result
+        # Urutan stabil: baris yang lebih baru menang untuk id yang sama
+        order = np.argsort(stored, kind="stable")
+        sorted_ids = stored[order]
+        right = np.searchsorted(sorted_ids, query, side="right")
+        found = (right > 0) & (sorted_ids[np.maximum(right - 1, 0)] == query)
+        result[found] = order[right[found] - 1]
+        result[found] = np.where(self._dead(result[found]), -1, result[found])
+        return result
+
+    def contains(self, artwork_ids) -> np.ndarray:
+        return self.positions(artwork_ids) >= 0
+
+
+class Tombstones(ColumnStore):
+    # Baris artwork `ids` dengan posisi < `before` sudah dihapus
+    COLUMNS = {
+        "ids": (np.uint8, (16,)),
+        "before": (np.int64, ()),
+    }
+    TOMBSTONES = False
@@ -0,0 +1,248 @@
+"""Outbox email: route hanya menambah baris, pengiriman SMTP di luar request.
+
+enqueue_email() menambahkan baris `email_outbox` ke session pemanggil, jadi
+email ikut ter-commit bersama data yang memicunya (artwork baru, receipt
+lunas). run_sender() (task latar belakang di proses API, atau
+`python -m app.jobs.email_sender`) mengambil batch dengan
+`FOR UPDATE SKIP LOCKED`, merender template yang sudah dikompilasi dan
+mengirim semuanya lewat satu koneksi SMTP yang dipakai ulang. Pengiriman yang
+gagal dicoba lagi dengan backoff eksponensial sampai EMAIL_MAX_ATTEMPTS.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from functools import lru_cache
+
+from jinja2 import Environment, FileSystemLoader
+from sqlalchemy.orm import Session
+
+from app.models.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+# kunci -> (file template, subjek)
+EMAIL_TEMPLATES = {
+    "certificate": ("certificate_email.html", "Sertifikat Kepemilikan Karya Digital"),
+    "purchase": ("purchase_email.html", "Tanda Terima Pembelian Karya Digital"),
+}
+
+# Baris yang sedang dikirim tidak diambil sender lain selama ini; jika sender
+# mati di tengah batch, baris tersebut dicoba lagi setelahnya
+SEND_LEASE_SECONDS = 300
+
+# Template tidak berubah selama proses berjalan; tanpa auto_reload Jinja tidak
+# memeriksa mtime file setiap render
+_env = Environment(loader=FileSystemLoader("app/templates"), auto_reload=False)
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+def enqueue_email(db: Session, to_email: str, template: str, context: dict) -> EmailOutbox:
+    """Menambahkan email ke outbox; ikut tersimpan saat pemanggil commit."""
+    if template not in EMAIL_TEMPLATES:
+        raise ValueError(f"Template email tidak dikenal: {template}")
+    email = EmailOutbox(
+        to_email=to_email,
+        template=template,
+        context=context,
+        status=PENDING,
+        attempts=0,
+        next_attempt_at=_now(),
+    )
+    db.add(email)
+    return email
+
+
+@lru_cache(maxsize=None)
+def _template(name: str):
+    return _env.get_template(name)
+
+
+def render_email(email: EmailOutbox, sender: str) -> EmailMessage:
+    template_name, subject = EMAIL_TEMPLATES[email.template]
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = sender
+    message["To"] = email.to_email
+    message.set_content(_template(template_name).render(**email.context), subtype="html")
+    return message
+
+
+def retry_delay(attempts: int, base_seconds: float, max_seconds: float) -> float:
+    """Backoff eksponensial: base, 2*base, 4*base, ... dibatasi max_seconds."""
+    return min(max_seconds, base_seconds * 2 ** max(0, attempts - 1))
+
+
+def claim_batch(db: Session, limit: int) -> list[EmailOutbox]:
+    """Mengambil email yang jatuh tempo dan menyewanya selama SEND_LEASE_SECONDS."""
+    now = _now()
+    emails = (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.status == PENDING, EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at)
+        .with_for_update(skip_locked=True)
+        .limit(limit)
+        .all()
+    )
+    for email in emails:
+        email.attempts += 1
+        email.next_attempt_at = now + timedelta(seconds=SEND_LEASE_SECONDS)
+    db.commit()
+    return emails
+
+
+def record_results(db: Session, results: list[tuple[EmailOutbox, str | None]], max_attempts: int,
+                   base_seconds: float, max_seconds: float) -> None:
+    """Menandai email terkirim, atau menjadwalkan ulang / menggagalkannya."""
+    now = _now()
+    for email, error in results:
+        email = db.merge(email)  # baris dari session claim_batch yang sudah ditutup
+        if error is None:
+            email.status = SENT
+            email.sent_at = now
+            email.last_error = None
+        elif email.attempts >= max_attempts:
+            logger.error(f"Email {email.id} ke {email.to_email} gagal setelah {email.attempts} percobaan: {error}")
+            email.status = FAILED
+            email.last_error = error
+        else:
+            email.next_attempt_at = now + timedelta(seconds=retry_delay(email.attempts, base_seconds, max_seconds))
+            email.last_error = error
+    db.commit()
+
+
+class SmtpConnection:
+    """Satu koneksi SMTP (aiosmtplib) yang dipakai ulang antar batch.
+
+    Dibuka saat pertama dibutuhkan, dibuka ulang jika server memutusnya, dan
+    ditutup setelah idle lebih dari `idle_seconds`.
+    """
+
+    def __init__(self, idle_seconds: float = 60):
+        self.idle_seconds = idle_seconds
+        self._client = None
+        self._last_used = 0.0
+
+    async def _connect(self):
+        import aiosmtplib
+        from app.core.config import settings
+
+        client = aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            use_tls=settings.MAIL_SSL_TLS,
+            start_tls=settings.MAIL_STARTTLS,
+            timeout=settings.SMTP_TIMEOUT,
+        )
+        await client.connect()
+        try:
+            await client.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+        except Exception:
+            client.close()
+            raise
+        return client
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None and self._client.is_connected
+
+    async def send(self, message: EmailMessage) -> None:
+        for attempt in range(2):
+            if not self.connected:
+                self._client = await self._connect()
+            try:
+                await self._client.send_message(message)
+                self._last_used = asyncio.get_running_loop().time()
+                return
+            except Exception as e:
+                if not _is_disconnect(e):
+                    raise
+                # Koneksi lama sudah diputus server; coba sekali lagi dengan koneksi baru
+                await self.close()
+                if attempt:
+                    raise
+
+    async def close_if_idle(self) -> None:
+        if self._client is not None and asyncio.get_running_loop().time() - self._last_used > self.idle_seconds:
+            await self.close()
+
+    async def close(self) -> None:
+        client, self._client = self._client, None
+        if client is not None and client.is_connected:
+            try:
+                await client.quit()
+            except Exception:
+                client.close()
+
+
+def _is_disconnect(error: Exception) -> bool:
+    import aiosmtplib
+
+    return isinstance(error, (aiosmtplib.SMTPServerDisconnected, ConnectionError))
+
+
+async def send_batch(connection: SmtpConnection, emails: list[EmailOutbox], sender: str) -> list[tuple[EmailOutbox, str | None]]:
+    results = []
+    for email in emails:
+        try:
+            await connection.send(render_email(email, sender))
+            results.append((email, None))
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            logger.warning(f"Gagal mengirim email {email.id} ke {email.to_email}: {error}")
+            results.append((email, error))
+            if not connection.connected:
+                # Server SMTP tidak bisa dihubungi; sisa batch dijadwalkan ulang
+                # tanpa menunggu timeout koneksi satu per satu
+                results.extend((rest, error) for rest in emails[len(results):])
+                break
+    return results
+
+
+def _claim(limit: int) -> list[EmailOutbox]:
+    from app.db.database import SessionLocal
+
+    with SessionLocal(expire_on_commit=False) as db:
+        return claim_batch(db, limit)
+
+
+def _record(results: list[tuple[EmailOutbox, str | None]]) -> None:
+    from app.core.config import settings
+    from app.db.database import SessionLocal
+
+    with SessionLocal() as db:
+        record_results(db, results, settings.EMAIL_MAX_ATTEMPTS, settings.EMAIL_RETRY_BASE_SECONDS,
+                       settings.EMAIL_RETRY_MAX_SECONDS)
+
+
+async def run_sender(stop: asyncio.Event | None = None) -> None:
+    """Mengirim email dari outbox sampai `stop` di-set (atau task dibatalkan)."""
+    from app.core.config import settings
+
+    stop = stop or asyncio.Event()
+    connection = SmtpConnection()
+    try:
+        while not stop.is_set():
+            try:
+                emails = await asyncio.to_thread(_claim, settings.EMAIL_OUTBOX_BATCH_SIZE)
+                if emails:
+                    results = await send_batch(connection, emails, settings.MAIL_FROM)
+                    await asyncio.to_thread(_record, results)
+                    if len(emails) == settings.EMAIL_OUTBOX_BATCH_SIZE:
+                        continue  # masih ada antrean; langsung ambil batch berikutnya
+                await connection.close_if_idle()
+            except Exception:
+                logger.exception("Sender email outbox gagal memproses batch")
+            try:
+                await asyncio.wait_for(stop.wait(), settings.EMAIL_OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await connection.close()
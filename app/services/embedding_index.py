@@ -0,0 +1,86 @@
+"""Index embedding ResNet18 (512 dimensi, ter-normalisasi L2) per artwork.
+
+Vektor disimpan sebagai float16 di file kolom memory-mapped (lihat
+ColumnStore). Karena semua vektor ter-normalisasi, cosine similarity terhadap
+seluruh katalog cukup satu perkalian matriks-vektor.
+"""
+import time
+import uuid
+
+import numpy as np
+
+from app.services.column_store import ColumnStore
+
+EMBEDDING_DIM = 512
+
+# Baris float16 dikonversi ke float32 per blok agar memori sementara terbatas
+_SEARCH_CHUNK_ROWS = 65536
+
+
+def normalize(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+class EmbeddingIndex(ColumnStore):
+    COLUMNS = {
+        "ids": (np.uint8, (16,)),
+        "vectors": (np.float16, (EMBEDDING_DIM,)),
+    }
+
+    def add(self, artwork_id, embedding: np.ndarray) -> None:
+        self._append({
+            "ids": uuid.UUID(str(artwork_id)).bytes,
+            "vectors": normalize(embedding).astype(np.float16).tobytes(),
+        })
+
+    def scores(self, embedding: np.ndarray, deadline: float | None = None) -> np.ndarray:
+        """Cosine similarity query terhadap seluruh katalog (float32[N]).
+
+        -inf untuk artwork terhapus dan, jika `deadline` (time.perf_counter)
+        terlewati, untuk baris yang belum dipindai.
+        """
+        self._refresh()
+        query = normalize(embedding)
+        vectors = self._columns["vectors"]
+        result = np.full(self._count, -np.inf, dtype=np.float32)
+        for start in range(0, self._count, _SEARCH_CHUNK_ROWS):
+            if start and deadline is not None and time.perf_counter() > deadline:
+                break
+            block = vectors[start:start + _SEARCH_CHUNK_ROWS].astype(np.float32)
+            result[start:start + len(block)] = block @ query
+        result[self._dead_mask()] = -np.inf
+        return result
+
+    def search(
+        self, embedding: np.ndarray, threshold: float, top_k: int = 5, deadline: float | None = None
+    ) -> list[tuple[uuid.UUID, float]]:
+        """Artwork dengan similarity >= threshold, diurutkan dari yang paling mirip."""
+        if top_k <= 0:
+            return []
+        scores = self.scores(embedding, deadline=deadline)
+        hits = np.flatnonzero(scores >= threshold)
+        if len(hits) > top_k:
+            hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(self.artwork_id(i), float(scores[i])) for i in hits]
+
+    def similarity(self, artwork_id, embedding: np.ndarray) -> float | None:
+        """Similarity terhadap satu artwork, None jika artwork belum ada di index."""
+        position = int(self.positions([artwork_id])[0])
+        if position < 0:
+            return None
+        stored = self._columns["vectors"][position].astype(np.float32)
+        return float(stored @ normalize(embedding))
+
+
+_index: EmbeddingIndex | None = None
+
+
+def get_embedding_index() -> EmbeddingIndex:
+    global _index
+    if _index is None:
+        from app.core.config import settings
+        _index = EmbeddingIndex(settings.EMBEDDING_INDEX_PATH)
+    return _index
@@ -0,0 +1,189 @@
+"""Fitur visual per artwork untuk tahap SSIM/ORB.
+
+Thumbnail grayscale 256x256 dan deskriptor ORB dihitung sekali saat upload dan
+disimpan sebagai file biner kecil per artwork. Pengecekan duplikat dan
+verifikasi membaca file ini (dengan cache LRU) alih-alih men-decode ulang
+gambar katalog di static/.
+"""
+import logging
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.utils.files import write_bytes_atomic
+
+logger = logging.getLogger(__name__)
+
+THUMB_SIZE = 256
+ORB_DESCRIPTOR_BYTES = 32
+
+_MAGIC = b"SFEA"
+_VERSION = 1
+_HEADER = struct.Struct(">4sBHH")  # magic, versi, sisi thumbnail, jumlah deskriptor
+
+
+class VisualFeatures(NamedTuple):
+    thumb: np.ndarray  # uint8 (THUMB_SIZE, THUMB_SIZE)
+    descriptors: np.ndarray | None  # uint8 (N, 32), None jika tidak ada keypoint
+
+
+def orb_descriptors(gray: np.ndarray) -> np.ndarray | None:
+    _, descriptors = cv2.ORB_create().detectAndCompute(gray, None)
+    return descriptors
+
+
+def features_from_gray(gray: np.ndarray) -> VisualFeatures:
+    thumb = cv2.resize(gray, (THUMB_SIZE, THUMB_SIZE))
+    return VisualFeatures(thumb, orb_descriptors(thumb))
+
+
+def features_from_image(pil_image: Image.Image) -> VisualFeatures:
+    """Fitur sisi katalog dari gambar yang disimpan (setara cv2.imread grayscale)."""
+    gray = cv2.cvtColor(np.asarray(pil_image.convert("RGB")), cv2.COLOR_RGB2GRAY)
+    return features_from_gray(gray)
+
+
+def features_from_file(image_path: str) -> VisualFeatures | None:
+    gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None
+    return features_from_gray(gray)
+
+
+def features_from_bytes(data: bytes) -> VisualFeatures | None:
+    gray = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None
+    return features_from_gray(gray)
+
+
+def query_features(pil_image: Image.Image) -> VisualFeatures:
+    """Fitur sisi query (gambar yang diunggah); cukup dihitung sekali per request."""
+    resized = pil_image.resize((THUMB_SIZE, THUMB_SIZE))
+    thumb = np.asarray(resized.convert("L"))
+    gray = cv2.cvtColor(np.asarray(resized.convert("RGB")), cv2.COLOR_RGB2GRAY)
+    return VisualFeatures(thumb, orb_descriptors(gray))
+
+
+def encode_features(features: VisualFeatures) -> bytes:
+    descriptors = features.descriptors
+    count = 0 if descriptors is None else len(descriptors)
+    header = _HEADER.pack(_MAGIC, _VERSION, THUMB_SIZE, count)
+    body = np.ascontiguousarray(features.thumb, dtype=np.uint8).tobytes()
+    if count:
+        body += np.ascontiguousarray(descriptors, dtype=np.uint8).tobytes()
+    return header + body
+
+
+def decode_features(data: bytes) -> VisualFeatures:
+    if len(data) < _HEADER.size:
+        raise ValueError("File fitur terpotong")
+    magic, version, side, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Format file fitur tidak dikenal")
+    thumb_end = _HEADER.size + side * side
+    if len(data) != thumb_end + count * ORB_DESCRIPTOR_BYTES:
+        raise ValueError("Ukuran file fitur tidak sesuai header")
+    thumb = np.frombuffer(data, dtype=np.uint8, count=side * side, offset=_HEADER.size).reshape(side, side)
+    descriptors = None
+    if count:
+        descriptors = np.frombuffer(data, dtype=np.uint8, offset=thumb_end).reshape(count, ORB_DESCRIPTOR_BYTES)
+    return VisualFeatures(thumb, descriptors)
+
+
+class FeatureStore:
+    def __init__(self, path: str, cache_size: int = 1024):
+        self.path = path
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, VisualFeatures] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _file(self, artwork_id) -> str:
+        key = str(artwork_id)
+        return os.path.join(self.path, key[:2], f"{key}.feat")
+
+    def _remember(self, key: str, features: VisualFeatures) -> None:
+        with self._lock:
+            self._cache[key] = features
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def put(self, artwork_id, features: VisualFeatures) -> None:
+        path = self._file(artwork_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_bytes_atomic(encode_features(features), path)
+        self._remember(str(artwork_id), features)
+
+    def get(self, artwork_id, image_path: str | None = None, image_key: str | None = None) -> VisualFeatures | None:
+        """Fitur artwork dari cache/disk.
+
+        Artwork lama yang belum punya file fitur dihitung sekali dari file
+        lokal `image_path` atau objek `image_key` di storage (app.storage),
+        lalu disimpan, sehingga request berikutnya tidak perlu decode gambar
+        lagi. Memakai I/O blocking; jangan dipanggil dari event loop.
+        """
+        key = str(artwork_id)
+        with self._lock:
+            features = self._cache.get(key)
+            if features is not None:
+                self._cache.move_to_end(key)
+                return features
+
+        try:
+            with open(self._file(key), "rb") as f:
+                features = decode_features(f.read())
+        except FileNotFoundError:
+            features = None
+        except ValueError as e:
+            logger.warning(f"File fitur {key} rusak, dihitung ulang: {e}")
+            features = None
+
+        if features is None:
+            features = self._from_image(image_path, image_key)
+            if features is None:
+                return None
+            self.put(key, features)
+            return features
+
+        self._remember(key, features)
+        return features
+
+    @staticmethod
+    def _from_image(image_path: str | None, image_key: str | None) -> VisualFeatures | None:
+        if image_path:
+            return features_from_file(image_path) if os.path.exists(image_path) else None
+        if image_key:
+            from app.storage import get_storage
+
+            try:
+                return features_from_bytes(get_storage().read(image_key))
+            except FileNotFoundError:
+                return None
+        return None
+
+    def delete(self, artwork_id) -> None:
+        key = str(artwork_id)
+        with self._lock:
+            self._cache.pop(key, None)
+        try:
+            os.remove(self._file(key))
+        except FileNotFoundError:
+            pass
+
+
+_store: FeatureStore | None = None
+
+
+def get_feature_store() -> FeatureStore:
+    global _store
+    if _store is None:
+        from app.core.config import settings
+        _store = FeatureStore(settings.FEATURE_STORE_PATH, settings.FEATURE_CACHE_SIZE)
+    return _store
@@ -0,0 +1,242 @@
+"""Index perceptual hash (ahash/phash/dhash/whash) di memori untuk deteksi duplikat.
+
+Setiap jenis hash disimpan sebagai kolom uint64 di file append-only. File
+tersebut di-memory-map read-only, sehingga beberapa worker (uvicorn maupun
+process pool) berbagi page cache yang sama. Pencarian adalah XOR + popcount
+tervektorisasi terhadap seluruh katalog.
+"""
+import logging
+import time
+import uuid
+
+import numpy as np
+
+from app.services.column_store import ColumnStore
+
+logger = logging.getLogger(__name__)
+
+HASH_KINDS = ("ahash", "phash", "dhash", "whash")
+
+# Satu file per kolom (layout kolumnar): XOR + popcount per jenis hash membaca
+# memori yang bersebelahan, bukan field strided dari record
+_COLUMNS = {
+    "ids": (np.uint8, (16,)),
+    "valid": (np.uint8, ()),  # bitmask: hash mana yang terisi
+    **{kind: (np.uint64, ()) for kind in HASH_KINDS},
+}
+
+# Katalog dipindai per blok baris agar pencarian bisa berhenti di deadline
+_SEARCH_CHUNK_ROWS = 262144
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Jumlah bit 1 per elemen uint64."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    as_bytes = np.ascontiguousarray(values).view(np.uint8).reshape(values.shape + (8,))
+    return _POPCOUNT8[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+def hex_to_int(hex_hash: str | None) -> int | None:
+    if not hex_hash:
+        return None
+    return int(hex_hash, 16) & 0xFFFFFFFFFFFFFFFF
+
+
+def hamming_distance(hex1: str, hex2: str) -> int:
+    """Jarak Hamming sebenarnya (dalam bit) antara dua hash hex."""
+    return bin(hex_to_int(hex1) ^ hex_to_int(hex2)).count("1")
+
+
+# Multi-index hashing: hash 64-bit dipecah menjadi HASH_BANDS band 16-bit.
+# Jika jarak <= r (r < HASH_BANDS), minimal HASH_BANDS - r band identik,
+# sehingga pencarian radius kecil cukup dengan lookup equality per band.
+HASH_BANDS = 4
+BAND_BITS = 16
+
+# Band hash orientasi kanonik disimpan di tabel yang sama dengan kind + offset
+CANONICAL_KIND_OFFSET = len(HASH_KINDS)
+
+
+def to_signed64(value: int | None) -> int | None:
+    """uint64 -> int64, karena BIGINT di Postgres bertanda."""
+    if value is None:
+        return None
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def from_signed64(value: int | None) -> int | None:
+    if value is None:
+        return None
+    return value & 0xFFFFFFFFFFFFFFFF
+
+
+def hash_bands(value: int) -> list[int]:
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (BAND_BITS * band)) & mask for band in range(HASH_BANDS)]
+
+
+def required_band_matches(max_distance: int) -> int:
+    """Jumlah band identik minimum yang dijamin untuk jarak <= max_distance."""
+    if not 0 <= max_distance < HASH_BANDS:
+        raise ValueError(f"max_distance harus di antara 0 dan {HASH_BANDS - 1}")
+    return HASH_BANDS - max_distance
+
+
+def _encode(artwork_id, hashes: dict) -> dict:
+    """Satu baris index dalam bentuk bytes per kolom."""
+    row = {"ids": uuid.UUID(str(artwork_id)).bytes}
+    valid = 0
+    for i, kind in enumerate(HASH_KINDS):
+        value = hex_to_int(hashes.get(kind))
+        if value is not None:
+            valid |= 1 << i
+        row[kind] = np.uint64(value or 0).tobytes()
+    row["valid"] = bytes([valid])
+    return row
+
+
+class HashIndex(ColumnStore):
+    COLUMNS = _COLUMNS
+
+    def add(self, artwork_id, hashes: dict) -> None:
+        """Menambahkan satu artwork (append di bawah file lock)."""
+        self._append(_encode(artwork_id, hashes))
+
+    def rebuild(self, items) -> int:
+        """Menulis ulang seluruh index dari iterable (artwork_id, hashes)."""
+        return self._rewrite(_encode(artwork_id, hashes) for artwork_id, hashes in items)
+
+    def distances(self, hashes: dict, deadline: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Jarak bit per jenis hash untuk seluruh katalog.
+
+        Mengembalikan (distances[N, 4], valid[N, 4]); hash yang kosong di salah
+        satu sisi dan baris artwork yang sudah dihapus ditandai tidak valid.
+        Jika `deadline` (time.perf_counter) terlewati, baris yang belum dipindai
+        juga ditandai tidak valid.
+        """
+        self._refresh()
+        query = _encode(uuid.UUID(int=0), hashes)
+        query_valid = query["valid"][0]
+        values = [np.frombuffer(query[kind], dtype=np.uint64)[0] for kind in HASH_KINDS]
+        dist = np.zeros((self._count, len(HASH_KINDS)), dtype=np.uint8)
+        valid = np.zeros((self._count, len(HASH_KINDS)), dtype=bool)
+        for start in range(0, self._count, _SEARCH_CHUNK_ROWS):
+            if start and deadline is not None and time.perf_counter() > deadline:
+                break
+            rows = slice(start, start + _SEARCH_CHUNK_ROWS)
+            for i, kind in enumerate(HASH_KINDS):
+                dist[rows, i] = popcount64(self._columns[kind][rows] ^ values[i])
+                valid[rows, i] = (self._columns["valid"][rows] & (query_valid & (1 << i))) != 0
+        valid[self._dead_mask()] = False
+        return dist, valid
+
+    def search(
+        self, hashes: dict, max_distance: int = 2, min_matches: int = 2, deadline: float | None = None
+    ) -> list[uuid.UUID]:
+        """Artwork yang minimal `min_matches` jenis hash-nya berjarak <= `max_distance` bit.
+
+        Pemindaian berhenti di `deadline` (time.perf_counter) jika diberikan.
+        """
+        dist, valid = self.distances(hashes, deadline=deadline)
+        matches = ((dist <= max_distance) & valid).sum(axis=1)
+        return [self.artwork_id(i) for i in np.flatnonzero(matches >= min_matches)]
+
+
+_index: HashIndex | None = None
+_canonical_index: HashIndex | None = None
+
+
+def get_hash_index() -> HashIndex:
+    global _index
+    if _index is None:
+        from app.core.config import settings
+        _index = HashIndex(settings.HASH_INDEX_PATH)
+    return _index
+
+
+def get_canonical_hash_index() -> HashIndex:
+    """Index hash orientasi kanonik (lihat compute_canonical_hashes)."""
+    global _canonical_index
+    if _canonical_index is None:
+        from app.core.config import settings
+        _canonical_index = HashIndex(settings.CANONICAL_HASH_INDEX_PATH)
+    return _canonical_index
+
+
+def uses_memory_index() -> bool:
+    from app.core.config import settings
+    return settings.HASH_INDEX_BACKEND == "memory"
+
+
+def find_hash_duplicates(
+    hashes: dict,
+    max_distance: int = 2,
+    min_matches: int = 2,
+    canonical: bool = False,
+    deadline: float | None = None,
+) -> list[uuid.UUID]:
+    """Cari artwork mirip lewat backend yang dipilih (HASH_INDEX_BACKEND).
+
+    "memory" memindai file memory-mapped lokal; "database" memakai tabel band
+    di Postgres sehingga instance stateless tidak perlu memuat katalog.
+    `canonical=True` mencari hash orientasi kanonik. `deadline` hanya berlaku
+    untuk backend memory (satu query band tidak bisa dihentikan di tengah).
+    """
+    if uses_memory_index():
+        index = get_canonical_hash_index() if canonical else get_hash_index()
+        return index.search(hashes, max_distance=max_distance, min_matches=min_matches, deadline=deadline)
+
+    from app.crud.hash_crud import find_hash_candidates
+    from app.db.database import SessionLocal
+
+    with SessionLocal() as db:
+        return find_hash_candidates(
+            db, hashes, max_distance=max_distance, min_matches=min_matches, canonical=canonical
+        )
+
+
+def artwork_hashes(artwork) -> dict:
+    return {
+        "ahash": artwork.hash,
+        "phash": artwork.hash_phash,
+        "dhash": artwork.hash_dhash,
+        "whash": artwork.hash_whash,
+    }
+
+
+def bits_to_hashes(values) -> dict:
+    """Kolom BIGINT (urutan HASH_KINDS) -> dict hash hex."""
+    hashes = {}
+    for kind, value in zip(HASH_KINDS, values):
+        value = from_signed64(value)
+        hashes[kind] = None if value is None else format(value, "016x")
+    return hashes
+
+
+def sync_hash_index(db) -> None:
+    """Membangun ulang index dari tabel artworks jika jumlahnya tidak sinkron."""
+    from app.models.artwork import Artwork
+
+    if not uses_memory_index():
+        return
+    index = get_hash_index()
+    total = db.query(Artwork).count()
+    if total != len(index):
+        rows = db.query(Artwork.id, Artwork.hash, Artwork.hash_phash, Artwork.hash_dhash, Artwork.hash_whash)
+        count = index.rebuild((row.id, artwork_hashes(row)) for row in rows.yield_per(10000))
+        logger.info(f"Hash index dibangun ulang: {count} artwork.")
+
+    canonical_columns = (
+        Artwork.canonical_hash_bits,
+        Artwork.canonical_phash_bits,
+        Artwork.canonical_dhash_bits,
+        Artwork.canonical_whash_bits,
+    )
+    canonical = get_canonical_hash_index()
+    rows = db.query(Artwork.id, *canonical_columns).filter(Artwork.canonical_hash_bits.isnot(None))
+    if rows.count() != len(canonical):
+        count = canonical.rebuild((row.id, bits_to_hashes(row[1:])) for row in rows.yield_per(10000))
+        logger.info(f"Hash index kanonik dibangun ulang: {count} artwork.")
@@ -0,0 +1,129 @@
+"""Pekerjaan gambar CPU-bound yang dijalankan di process pool.
+
+Semua fungsi di sini top-level dan hanya menerima/mengembalikan data yang bisa
+di-pickle (bytes, str, dict, SimpleNamespace), bukan objek ORM atau session.
+"""
+import io
+from types import SimpleNamespace
+
+from PIL import Image
+
+from app.services.blob_store import encode_image
+from app.services.feature_store import features_from_image, get_feature_store, query_features
+from app.services.ingest import open_image
+from app.services.similarity import find_duplicate
+from app.services.tile_index import compute_tile_hashes, find_fragment_source
+from app.services.watermark import add_physical_watermark
+from app.steganography import embed_watermark_from_pil_image, extract_watermark_from_pil_image
+from app.utils.image_hashing import compute_canonical_hashes
+from app.utils.image_similarity import compute_all_hashes, compute_embedding, is_similar_image
+
+
+def decode_image(content: bytes) -> Image.Image:
+    """Decode ke RGB setelah format dan dimensi dicek dari header (ImageRejected jika ditolak)."""
+    return open_image(io.BytesIO(content)).convert("RGB")
+
+
+def artwork_snapshot(artwork) -> SimpleNamespace:
+    """Salinan atribut Artwork yang dibutuhkan is_similar_image / is_similar_visually."""
+    return SimpleNamespace(
+        id=str(artwork.id),
+        title=artwork.title,
+        image_url=artwork.image_url,
+        hash=getattr(artwork, "hash", None),
+        hash_phash=getattr(artwork, "hash_phash", None),
+        hash_dhash=getattr(artwork, "hash_dhash", None),
+        hash_whash=getattr(artwork, "hash_whash", None),
+    )
+
+
+def process_upload(
+    artwork_id: str,
+    content: bytes,
+    watermark_text: str,
+    copyright_hash: str,
+    user_message: str | None,
+    extension: str,
+) -> dict:
+    """Decode sekali, cek duplikat, lalu watermark + LSB + encode sesuai `extension`.
+
+    Cek duplikat memakai cascade hash -> embedding -> SSIM/ORB (lihat
+    app.services.similarity.find_duplicate); ringkasannya dikembalikan di
+    `similarity`. Jika duplikat ditemukan, gambar tidak di-watermark. Jika
+    tidak, bytes file hasil dan SHA-256-nya dikembalikan di `image_data` dan
+    `image_sha256` (disimpan pemanggil lewat blob_store.put_blob), dan fitur SSIM/ORB gambar hasil disimpan di feature store
+    dengan key `artwork_id`. Hash orientasi kanonik dikembalikan di
+    `canonical_hashes`, phash tile gambar hasil (yang dipublikasikan) di
+    `tile_hashes`, dan deskriptor ORB-nya di `orb_descriptors`.
+    """
+    pil_image = decode_image(content)
+    hashes = compute_all_hashes(pil_image)
+    canonical_hashes = compute_canonical_hashes(pil_image)
+
+    verdict = find_duplicate(pil_image, hashes, canonical_hashes)
+    embedding = verdict.pop("embedding")
+    result = {"hashes": hashes, "canonical_hashes": canonical_hashes, "embedding": embedding, "similarity": verdict}
+    if verdict["duplicate_of"]:
+        return {**result, "duplicate_of": verdict["duplicate_of"]}
+
+    watermarked = add_physical_watermark(pil_image, watermark_text)
+    stego_image = embed_watermark_from_pil_image(watermarked, copyright_hash, user_message)
+    image_data, image_sha256 = encode_image(stego_image, extension)
+    features = features_from_image(stego_image)
+    get_feature_store().put(artwork_id, features)
+    tile_hashes = compute_tile_hashes(stego_image)
+    return {
+        **result,
+        "duplicate_of": None,
+        "image_data": image_data,
+        "image_sha256": image_sha256,
+        "tile_hashes": tile_hashes,
+        "orb_descriptors": features.descriptors,
+    }
+
+
+def index_features(artwork_id: str, content: bytes, image_data: bytes) -> dict:
+    """Input add_to_indexes untuk artwork yang sudah tersimpan, tanpa cek duplikat.
+
+    Hash dan embedding dihitung dari bytes upload asli `content` seperti di
+    process_upload; tile dan deskriptor ORB dari gambar hasil `image_data`
+    (fitur diambil dari feature store jika sudah ada).
+    """
+    pil_image = decode_image(content)
+    stego_image = decode_image(image_data)
+    features = get_feature_store().get(artwork_id)
+    if features is None:
+        features = features_from_image(stego_image)
+        get_feature_store().put(artwork_id, features)
+    return {
+        "hashes": compute_all_hashes(pil_image),
+        "canonical_hashes": compute_canonical_hashes(pil_image),
+        "embedding": compute_embedding(pil_image),
+        "tile_hashes": compute_tile_hashes(stego_image),
+        "orb_descriptors": features.descriptors,
+    }
+
+
+def verify_image(content: bytes) -> dict:
+    """Decode sekali; ekstraksi LSB dan input cek kemiripan memakai gambar yang sama di memori.
+
+    Tanpa watermark: {"watermark": None, "fragments": [...]} (lihat tile_index).
+    Dengan watermark: {"watermark", "query"}; route mencari artwork pemiliknya
+    lewat index copyright_hash lalu meneruskan `query` ke match_artwork.
+    """
+    pil_image = decode_image(content)
+    watermark = extract_watermark_from_pil_image(pil_image)
+    if not watermark:
+        return {"watermark": None, "fragments": find_fragment_source(pil_image)}
+
+    query = {
+        "hashes": compute_all_hashes(pil_image),
+        "embedding": compute_embedding(pil_image),
+        "features": query_features(pil_image),
+    }
+    return {"watermark": watermark, "query": query}
+
+
+def match_artwork(query: dict, candidate: SimpleNamespace) -> bool:
+    """Cek kemiripan hasil verify_image terhadap artwork_snapshot, tanpa decode ulang."""
+    return is_similar_image(query["hashes"], query["embedding"], query["features"], candidate)
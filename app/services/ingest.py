@@ -0,0 +1,113 @@
+"""Penerimaan file gambar upload dengan batas ukuran, sebelum decode penuh.
+
+File dibaca per chunk ke SpooledTemporaryFile (di memori sampai
+UPLOAD_SPOOL_BYTES, lalu pindah ke disk) sambil dihitung SHA-256-nya, dan
+ditolak begitu melewati MAX_UPLOAD_BYTES. Setelah itu hanya header gambar
+yang dibaca (Image.open bersifat lazy) untuk memeriksa format dan dimensi,
+sehingga file non-gambar dan decompression bomb ditolak sebelum piksel apa
+pun di-decode.
+"""
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from fastapi import UploadFile
+from PIL import Image, UnidentifiedImageError
+
+CHUNK_BYTES = 1024 * 1024
+ALLOWED_FORMATS = {"PNG", "JPEG", "WEBP", "BMP", "GIF", "TIFF"}
+
+
+class ImageRejected(Exception):
+    """Upload ditolak sebelum diproses; `status_code` 400 atau 413.
+
+    Bukan HTTPException agar tetap bisa di-pickle dari worker process pool.
+    """
+
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail, status_code)
+        self.detail = detail
+        self.status_code = status_code
+
+
+def check_image_header(image: Image.Image) -> None:
+    """Menolak format yang tidak didukung dan gambar yang terlalu besar (hanya header)."""
+    from app.core.config import settings
+
+    if image.format not in ALLOWED_FORMATS:
+        raise ImageRejected(f"Format gambar {image.format} tidak didukung.")
+    width, height = image.size
+    if width <= 0 or height <= 0:
+        raise ImageRejected("Dimensi gambar tidak valid.")
+    if width * height > settings.MAX_IMAGE_PIXELS:
+        raise ImageRejected(
+            f"Gambar terlalu besar ({width}x{height}); maksimal {settings.MAX_IMAGE_PIXELS} piksel.",
+            status_code=413,
+        )
+
+
+def open_image(source: BinaryIO) -> Image.Image:
+    """Image.open + check_image_header; piksel belum di-decode."""
+    from app.core.config import settings
+
+    # Batas bawaan PIL ikut disesuaikan (DecompressionBombError di atas 2x nilai ini)
+    Image.MAX_IMAGE_PIXELS = settings.MAX_IMAGE_PIXELS
+    try:
+        image = Image.open(source)
+    except Image.DecompressionBombError:
+        raise ImageRejected(f"Gambar terlalu besar; maksimal {settings.MAX_IMAGE_PIXELS} piksel.", status_code=413)
+    except UnidentifiedImageError:
+        raise ImageRejected("File bukan gambar yang valid.")
+    check_image_header(image)
+    return image
+
+
+@dataclass
+class ReceivedImage:
+    file: tempfile.SpooledTemporaryFile
+    size: int
+    sha256: str  # digest bytes mentah, dihitung sambil streaming
+    format: str
+    width: int
+    height: int
+
+    def read(self) -> bytes:
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+async def receive_image(upload: UploadFile) -> ReceivedImage:
+    """Menyalin upload per chunk dengan batas MAX_UPLOAD_BYTES lalu memeriksa header.
+
+    Pemanggil wajib memanggil close() pada hasilnya.
+    """
+    from app.core.config import settings
+
+    limit = settings.MAX_UPLOAD_BYTES
+    too_large = ImageRejected(f"File terlalu besar; maksimal {limit // (1024 * 1024)} MB.", status_code=413)
+    if upload.size is not None and upload.size > limit:
+        raise too_large
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_SPOOL_BYTES)
+    try:
+        size = 0
+        digest = hashlib.sha256()
+        while chunk := await upload.read(CHUNK_BYTES):
+            size += len(chunk)
+            if size > limit:
+                raise too_large
+            digest.update(chunk)
+            spooled.write(chunk)
+        if not size:
+            raise ImageRejected("File gambar kosong.")
+
+        spooled.seek(0)
+        image = open_image(spooled)
+        return ReceivedImage(spooled, size, digest.hexdigest(), image.format, image.width, image.height)
+    except BaseException:
+        spooled.close()
+        raise
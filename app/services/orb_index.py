@@ -0,0 +1,312 @@
+"""Index deskriptor ORB seluruh katalog dengan multi-probe LSH.
+
+Deskriptor ORB (256 bit) setiap artwork disimpan di file kolom memory-mapped
+(lihat ColumnStore). Untuk lookup, setiap tabel LSH mengambil sampel
+ORB_LSH_BITS bit tetap dari deskriptor sebagai key; key seluruh baris disimpan
+terurut di file postings (`keys_<t>.bin` + `order_<t>.bin`) yang juga
+di-memory-map sehingga dibagi semua proses. Query mem-probe key-nya sendiri
+dan semua key berjarak 1 bit di setiap tabel (searchsorted), lalu jarak
+Hamming sebenarnya diverifikasi.
+
+Kecocokan dihitung seperti BFMatcher(crossCheck=True): pasangan deskriptor
+query/katalog yang saling terdekat per artwork dan berjarak < ORB_MAX_DISTANCE.
+Skor artwork = jumlah pasangan / max(jumlah deskriptor query, jumlah deskriptor
+artwork), sama dengan orb_similarity.
+
+Baris baru (ekor) di-append tanpa menyusun ulang postings; ekor diindeks di
+memori per proses sampai di-merge oleh task latar belakang API
+(run_postings_merger) atau job offline, tidak pernah oleh request. Artwork yang dihapus
+dicatat sebagai tombstone dan baru dibuang fisik saat compact().
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from app.services.column_store import ColumnStore
+from app.services.feature_store import ORB_DESCRIPTOR_BYTES
+from app.services.hash_index import popcount64
+from app.utils.files import write_bytes_atomic
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTOR_BITS = ORB_DESCRIPTOR_BYTES * 8
+_LSH_SEED = 0x0B5EED
+# Postings disusun ulang jika ekor melebihi ini (atau 1/8 index)
+_MAX_TAIL_ROWS = 20000
+_KEY_CHUNK_ROWS = 65536
+
+
+def _postings_for(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(keys, kind="stable").astype(np.uint32)
+    return keys[order], order
+
+
+def _probe(sorted_keys: np.ndarray, order: np.ndarray, probes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(indeks baris probe, posisi baris katalog) untuk setiap key yang sama."""
+    left = np.searchsorted(sorted_keys, probes, side="left")
+    right = np.searchsorted(sorted_keys, probes, side="right")
+    lengths = right - left
+    total = int(lengths.sum())
+    if not total:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    probe_index = np.repeat(np.arange(len(probes)), lengths)
+    # left[i], left[i] + 1, ..., right[i] - 1 untuk setiap probe
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return probe_index, order[np.repeat(left, lengths) + offsets].astype(np.int64)
+
+
+class OrbIndex(ColumnStore):
+    COLUMNS = {
+        "ids": (np.uint8, (16,)),
+        "descriptors": (np.uint8, (ORB_DESCRIPTOR_BYTES,)),
+        "totals": (np.uint16, ()),  # jumlah deskriptor artwork pemilik baris
+    }
+
+    def __init__(self, path: str, tables: int = 8, bits: int = 16):
+        super().__init__(path)
+        if not 1 <= bits <= 32:
+            raise ValueError("bits harus di antara 1 dan 32")
+        self.tables = tables
+        self.bits = bits
+        rng = np.random.default_rng(_LSH_SEED)
+        self._bit_positions = np.stack([rng.choice(DESCRIPTOR_BITS, bits, replace=False) for _ in range(tables)])
+        self._lock = threading.Lock()
+        self._postings: list[tuple[np.ndarray, np.ndarray]] = []
+        self._postings_rows = 0
+        self._postings_meta = None
+        self._tail: tuple[tuple[int, int] | None, list[tuple[np.ndarray, np.ndarray]]] = (None, [])
+
+    def _keys(self, descriptors: np.ndarray) -> np.ndarray:
+        """Key LSH per tabel, uint32[N, tables] (dihitung per blok agar memori terbatas)."""
+        weights = (1 << np.arange(self.bits, dtype=np.uint64))
+        keys = np.empty((len(descriptors), self.tables), dtype=np.uint32)
+        for start in range(0, len(descriptors), _KEY_CHUNK_ROWS):
+            bits = np.unpackbits(np.asarray(descriptors[start:start + _KEY_CHUNK_ROWS], dtype=np.uint8), axis=1)
+            for table, positions in enumerate(self._bit_positions):
+                keys[start:start + len(bits), table] = bits[:, positions].astype(np.uint64) @ weights
+        return keys
+
+    def add(self, artwork_id, descriptors: np.ndarray | None) -> None:
+        if descriptors is None or not len(descriptors):
+            return
+        artwork_bytes = uuid.UUID(str(artwork_id)).bytes
+        total = np.uint16(min(len(descriptors), np.iinfo(np.uint16).max)).tobytes()
+        self._append_many([
+            {"ids": artwork_bytes, "descriptors": np.ascontiguousarray(row, dtype=np.uint8).tobytes(), "totals": total}
+            for row in descriptors
+        ])
+
+    def merge_tail(self) -> bool:
+        """Menyusun ulang postings jika ekor sudah terlalu besar; True jika disusun."""
+        self._refresh()
+        if self._count - self._stored_postings_rows() <= max(_MAX_TAIL_ROWS, self._count // 8):
+            return False
+        self.build_postings()
+        return True
+
+    def rebuild(self, items) -> int:
+        """Menulis ulang index dari iterable (artwork_id, descriptors); mengembalikan jumlah baris."""
+        def rows():
+            for artwork_id, descriptors in items:
+                if descriptors is None or not len(descriptors):
+                    continue
+                artwork_bytes = uuid.UUID(str(artwork_id)).bytes
+                total = np.uint16(min(len(descriptors), np.iinfo(np.uint16).max)).tobytes()
+                for row in descriptors:
+                    yield {"ids": artwork_bytes, "descriptors": np.ascontiguousarray(row, dtype=np.uint8).tobytes(), "totals": total}
+
+        count = self._rewrite(rows())
+        self.build_postings()
+        return count
+
+    def compact(self) -> int:
+        """Membuang baris yang sudah di-tombstone lalu menyusun ulang postings."""
+        self._refresh()
+        alive = np.flatnonzero(~self._dead_mask())
+        ids, descriptors, totals = (self._columns[name] for name in ("ids", "descriptors", "totals"))
+        count = self._rewrite(
+            {"ids": ids[i].tobytes(), "descriptors": descriptors[i].tobytes(), "totals": totals[i].tobytes()}
+            for i in alive
+        )
+        self.build_postings()
+        return count
+
+    def build_postings(self) -> None:
+        """Menyusun file postings terurut untuk seluruh baris saat ini."""
+        with self._locked():
+            self._refresh()
+            keys = self._keys(self._columns["descriptors"]) if self._count else np.zeros((0, self.tables), np.uint32)
+            for table in range(self.tables):
+                sorted_keys, order = _postings_for(keys[:, table])
+                write_bytes_atomic(sorted_keys.tobytes(), os.path.join(self.path, f"keys_{table}.bin"))
+                write_bytes_atomic(order.tobytes(), os.path.join(self.path, f"order_{table}.bin"))
+            meta = {"rows": self._count, "tables": self.tables, "bits": self.bits, "seed": _LSH_SEED}
+            write_bytes_atomic(json.dumps(meta).encode(), os.path.join(self.path, "postings.json"))
+        logger.info(f"Postings ORB disusun ulang: {self._count} deskriptor.")
+
+    def warm_up(self) -> None:
+        """Memuat (atau menyusun) postings sebelum request pertama."""
+        with self._lock:
+            self._refresh()
+            self._load_postings(build=True)
+
+    def _stored_postings_rows(self) -> int:
+        try:
+            with open(os.path.join(self.path, "postings.json")) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return 0
+        if (meta["tables"], meta["bits"], meta["seed"]) != (self.tables, self.bits, _LSH_SEED):
+            return 0
+        return meta["rows"]
+
+    def _load_postings(self, build: bool = False) -> tuple[list[tuple[np.ndarray, np.ndarray]], int]:
+        """Postings memory-mapped.
+
+        Dengan `build`, postings disusun dulu jika belum ada atau parameternya
+        berbeda; tanpa itu (jalur search) seluruh baris diperlakukan sebagai ekor.
+        """
+        meta_path = os.path.join(self.path, "postings.json")
+        try:
+            stat = os.stat(meta_path)
+            identity = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            identity = None
+        if identity is not None and identity == self._postings_meta:
+            return self._postings, self._postings_rows
+
+        rows = self._stored_postings_rows() if identity is not None else 0
+        if build and (identity is None or (rows == 0 and self._count)):
+            self.build_postings()
+            return self._load_postings()
+        self._postings = []
+        for table in range(self.tables):
+            keys = np.memmap(os.path.join(self.path, f"keys_{table}.bin"), dtype=np.uint32, mode="r") if rows else np.zeros(0, np.uint32)
+            order = np.memmap(os.path.join(self.path, f"order_{table}.bin"), dtype=np.uint32, mode="r") if rows else np.zeros(0, np.uint32)
+            self._postings.append((keys, order))
+        self._postings_rows = rows
+        self._postings_meta = identity
+        return self._postings, rows
+
+    def _tail_postings(self, start: int) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Postings di memori untuk baris [start, count) yang belum ada di file."""
+        if self._tail[0] != (start, self._count):
+            keys = self._keys(self._columns["descriptors"][start:self._count]) if self._count > start else np.zeros((0, self.tables), np.uint32)
+            postings = []
+            for table in range(self.tables):
+                sorted_keys, order = _postings_for(keys[:, table])
+                postings.append((sorted_keys, order + np.uint32(start)))
+            self._tail = ((start, self._count), postings)
+        return self._tail[1]
+
+    def search(
+        self,
+        descriptors: np.ndarray | None,
+        max_distance: int = 60,
+        top_k: int = 8,
+        deadline: float | None = None,
+    ) -> list[tuple[uuid.UUID, float, int]]:
+        """(artwork_id, skor, jumlah pasangan) dengan skor tertinggi di seluruh katalog.
+
+        Jika `deadline` (time.perf_counter) terlewati, tabel LSH yang tersisa
+        tidak di-probe (tabel pertama selalu di-probe).
+        """
+        if descriptors is None or not len(descriptors) or top_k <= 0:
+            return []
+        with self._lock:
+            self._refresh()
+            if not self._count:
+                return []
+            postings, rows = self._load_postings()
+            rows = min(rows, self._count)
+            tail = self._tail_postings(rows)
+
+        query = np.ascontiguousarray(descriptors, dtype=np.uint8)
+        keys = self._keys(query)
+        flips = np.concatenate([[0], 1 << np.arange(self.bits, dtype=np.uint64)]).astype(np.uint32)
+
+        query_index, positions = [], []
+        for table in range(self.tables):
+            if table and deadline is not None and time.perf_counter() > deadline:
+                break
+            probes = (keys[:, table][:, None] ^ flips[None, :]).ravel()
+            for sorted_keys, order in (postings[table], tail[table]):
+                probe_index, found = _probe(sorted_keys, order, probes)
+                query_index.append(probe_index // len(flips))
+                positions.append(found)
+        query_index = np.concatenate(query_index)
+        positions = np.concatenate(positions)
+        # Postings lama bisa menunjuk ke luar file yang baru di-compact proses lain
+        in_range = positions < self._count
+        query_index, positions = query_index[in_range], positions[in_range]
+        if not len(positions):
+            return []
+
+        pairs = np.unique(query_index * self._count + positions)
+        query_index, positions = pairs // self._count, pairs % self._count
+        stored = np.ascontiguousarray(self._columns["descriptors"][positions]).view(np.uint64)
+        distances = popcount64(stored ^ query.view(np.uint64)[query_index]).sum(axis=1, dtype=np.int32)
+        close = distances < max_distance
+        query_index, positions, distances = query_index[close], positions[close], distances[close]
+        alive = ~self._dead(positions)
+        query_index, positions, distances = query_index[alive], positions[alive], distances[alive]
+        if not len(positions):
+            return []
+
+        artwork_ids, artwork = np.unique(
+            np.ascontiguousarray(self._columns["ids"][positions]).view("V16").ravel(), return_inverse=True
+        )
+        # Saling terdekat (crossCheck): terbaik per (query, artwork), lalu terbaik per baris katalog
+        order = np.lexsort((distances, artwork, query_index))
+        query_index, positions, distances, artwork = (a[order] for a in (query_index, positions, distances, artwork))
+        _, first = np.unique(query_index * len(artwork_ids) + artwork, return_index=True)
+        query_index, positions, distances, artwork = (a[first] for a in (query_index, positions, distances, artwork))
+        order = np.lexsort((distances, positions))
+        _, first = np.unique(positions[order], return_index=True)
+        matched = order[first]
+
+        votes = np.bincount(artwork[matched], minlength=len(artwork_ids))
+        totals = np.zeros(len(artwork_ids), dtype=np.int64)
+        totals[artwork[matched]] = self._columns["totals"][positions[matched]]
+        scores = votes / np.maximum(len(query), totals)
+
+        best = np.argsort(-scores, kind="stable")[:top_k]
+        return [
+            (uuid.UUID(bytes=artwork_ids[i].tobytes()), float(scores[i]), int(votes[i]))
+            for i in best if votes[i]
+        ]
+
+
+async def run_postings_merger(stop: asyncio.Event | None = None) -> None:
+    """Me-merge ekor ORB index ke postings secara berkala sampai `stop` di-set."""
+    from app.core.config import settings
+
+    stop = stop or asyncio.Event()
+    while True:
+        # Tunggu dulu: saat startup postings sudah disusun oleh warm_up
+        try:
+            await asyncio.wait_for(stop.wait(), settings.ORB_POSTINGS_MERGE_SECONDS)
+            return
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await asyncio.to_thread(get_orb_index().merge_tail)
+        except Exception:
+            logger.exception("Merge postings ORB gagal")
+
+
+_index: OrbIndex | None = None
+
+
+def get_orb_index() -> OrbIndex:
+    global _index
+    if _index is None:
+        from app.core.config import settings
+        _index = OrbIndex(settings.ORB_INDEX_PATH, settings.ORB_LSH_TABLES, settings.ORB_LSH_BITS)
+    return _index
@@ -0,0 +1,263 @@
+"""Deteksi duplikat bertahap (cascade) dengan early exit.
+
+Tahap global yang murah memutuskan sendiri jika hasilnya jelas, sekaligus
+menyusun shortlist; hanya shortlist yang masuk tahap SSIM/ORB yang mahal.
+
+- hash      : hash index. Duplikat jika >= MIN_SIMILAR_HASHES hash berjarak
+              <= HASH_THRESHOLDS; top-K jarak hash terkecil masuk shortlist.
+              Jika tidak ada, satu probe tambahan ke index hash orientasi
+              kanonik menangkap salinan yang diputar 90/180/270 atau dicermin
+              (stage "orientation").
+- tile      : tile index. Duplikat jika gambar adalah potongan (kuadran/tile)
+              artwork lain; `region` menunjukkan bagian yang dipotong.
+- embedding : cosine similarity ResNet18 terhadap seluruh katalog. Duplikat
+              jika >= EMBEDDING_THRESHOLD; top-K skor tertinggi masuk shortlist.
+- orb       : vote deskriptor ORB terhadap seluruh katalog lewat ORB index.
+              Duplikat jika skor > ORB_THRESHOLD; top-K skor masuk shortlist.
+- rerank    : SSIM/ORB terhadap fitur tersimpan, hanya untuk shortlist.
+
+Setiap tahap punya batas kandidat dan batas waktu (SIMILARITY_<TAHAP>_*).
+Tahap global memindai index per blok (baris, hash query, atau tabel LSH) dan
+berhenti di deadline-nya dengan hasil sebagian; rerank (paralel di thread
+pool) membatalkan kandidat yang belum dinilai. Tahap yang melewati batas
+waktu dicatat di `over_budget`.
+
+Index tidak langsung bersih saat artwork dihapus, jadi id yang akan
+memutuskan duplikat selalu dicek dulu ke tabel artworks (satu query IN);
+id yang sudah tidak ada dilewati.
+"""
+import logging
+import time
+import uuid
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from app.services.embedding_index import get_embedding_index
+from app.services.feature_store import query_features
+from app.services.hash_index import HASH_BANDS, HASH_KINDS, find_hash_duplicates, get_hash_index, uses_memory_index
+from app.services.orb_index import get_orb_index
+from app.services.tile_index import find_fragment_source
+from app.utils.image_similarity import (
+    HASH_THRESHOLDS,
+    MIN_SIMILAR_HASHES,
+    ORB_MAX_DISTANCE,
+    ORB_THRESHOLD,
+    compute_embedding,
+    embedding_threshold,
+    find_first_similar,
+)
+
+logger = logging.getLogger(__name__)
+
+class StageBudget(NamedTuple):
+    max_candidates: int
+    budget_ms: float
+
+
+def stage_budgets() -> dict[str, StageBudget]:
+    from app.core.config import settings
+
+    return {
+        "hash": StageBudget(settings.SIMILARITY_HASH_TOP_K, settings.SIMILARITY_HASH_BUDGET_MS),
+        "tile": StageBudget(settings.SIMILARITY_TILE_TOP_K, settings.SIMILARITY_TILE_BUDGET_MS),
+        "embedding": StageBudget(settings.SIMILARITY_EMBEDDING_TOP_K, settings.SIMILARITY_EMBEDDING_BUDGET_MS),
+        "orb": StageBudget(settings.SIMILARITY_ORB_TOP_K, settings.SIMILARITY_ORB_BUDGET_MS),
+        "rerank": StageBudget(settings.SIMILARITY_RERANK_MAX_CANDIDATES, settings.SIMILARITY_RERANK_BUDGET_MS),
+    }
+
+
+def _hash_stage(hashes: dict, top_k: int, deadline: float | None = None) -> tuple[list[str], list[str]]:
+    """(id kandidat duplikat, terdekat lebih dulu; shortlist id berdasarkan jarak hash)."""
+    if not uses_memory_index():
+        from app.crud.hash_crud import find_hash_candidates
+        from app.db.database import SessionLocal
+
+        matches = find_hash_duplicates(
+            hashes, max_distance=max(HASH_THRESHOLDS.values()), min_matches=MIN_SIMILAR_HASHES
+        )
+        if matches:
+            return [str(artwork_id) for artwork_id in matches], []
+        # Satu band identik = jarak <= HASH_BANDS - 1 pada minimal satu jenis hash
+        with SessionLocal() as db:
+            nearest = find_hash_candidates(db, hashes, max_distance=HASH_BANDS - 1, min_matches=1)
+        return [], [str(artwork_id) for artwork_id in nearest[:top_k]]
+
+    index = get_hash_index()
+    dist, valid = index.distances(hashes, deadline=deadline)
+    if not len(dist):
+        return [], []
+
+    thresholds = np.array([HASH_THRESHOLDS[kind] for kind in HASH_KINDS], dtype=np.uint8)
+    close = ((dist <= thresholds) & valid).sum(axis=1)
+    # Hash yang kosong dihitung sebagai jarak maksimum (64 bit)
+    total = np.where(valid, dist, 64).sum(axis=1, dtype=np.int32)
+
+    duplicates = np.flatnonzero(close >= MIN_SIMILAR_HASHES)
+    if len(duplicates):
+        duplicates = duplicates[np.argsort(total[duplicates], kind="stable")]
+        return [str(index.artwork_id(i)) for i in duplicates], []
+
+    # Baris tanpa hash yang bisa dibandingkan (termasuk artwork terhapus) dilewati
+    rows = np.flatnonzero(valid.any(axis=1))
+    k = min(top_k, len(rows))
+    if k <= 0:
+        return [], []
+    nearest = rows[np.argpartition(total[rows], k - 1)[:k]]
+    nearest = nearest[np.argsort(total[nearest], kind="stable")]
+    return [], [str(index.artwork_id(i)) for i in nearest]
+
+
+def _live_ids(artwork_ids: list[str]) -> set[str]:
+    """Id yang masih ada di tabel artworks (satu query IN)."""
+    if not artwork_ids:
+        return set()
+    from app.db.database import SessionLocal
+    from app.models.artwork import Artwork
+
+    with SessionLocal() as db:
+        rows = (
+            db.query(Artwork.id)
+            .filter(Artwork.id.in_([uuid.UUID(artwork_id) for artwork_id in dict.fromkeys(artwork_ids)]))
+            .all()
+        )
+    return {str(row.id) for row in rows}
+
+
+def _first_live(artwork_ids: list[str]) -> str | None:
+    """Id pertama (urutan dipertahankan) yang artwork-nya masih ada."""
+    live = _live_ids(artwork_ids)
+    return next((artwork_id for artwork_id in artwork_ids if artwork_id in live), None)
+
+
+def _load_candidates(artwork_ids: list[str]) -> list:
+    """Snapshot (id, judul, path gambar) untuk shortlist, urutan dipertahankan."""
+    if not artwork_ids:
+        return []
+    from app.db.database import SessionLocal
+    from app.models.artwork import Artwork
+    from app.services.image_tasks import artwork_snapshot
+
+    with SessionLocal() as db:
+        rows = (
+            db.query(Artwork.id, Artwork.title, Artwork.image_url)
+            .filter(Artwork.id.in_([uuid.UUID(artwork_id) for artwork_id in artwork_ids]))
+            .all()
+        )
+    by_id = {str(row.id): artwork_snapshot(row) for row in rows}
+    return [by_id[artwork_id] for artwork_id in artwork_ids if artwork_id in by_id]
+
+
+def find_duplicate(pil_image: Image.Image, hashes: dict, canonical_hashes: dict | None = None) -> dict:
+    """Menjalankan cascade untuk gambar yang diunggah.
+
+    Mengembalikan dict berisi `duplicate_of` (id atau None), `stage` yang
+    memutuskan, `embedding` (untuk disimpan di embedding index), waktu per
+    tahap dalam ms, jumlah kandidat per tahap, dan tahap yang melewati batas
+    waktu. Jika diputuskan di tahap tile, `region` berisi bagian artwork yang
+    dipotong.
+    """
+    budgets = stage_budgets()
+    result = {
+        "duplicate_of": None,
+        "stage": None,
+        "embedding": None,
+        "timings_ms": {},
+        "candidates": {},
+        "over_budget": [],
+    }
+
+    def finish(stage: str, started: float) -> None:
+        elapsed = (time.perf_counter() - started) * 1000
+        result["timings_ms"][stage] = round(elapsed, 2)
+        if elapsed > budgets[stage].budget_ms:
+            result["over_budget"].append(stage)
+
+    def deadline(stage: str, started: float) -> float:
+        return started + budgets[stage].budget_ms / 1000
+
+    def decide(stage: str, artwork_id: str) -> dict:
+        result["duplicate_of"] = artwork_id
+        result["stage"] = stage
+        logger.info(f"Duplikat terdeteksi di tahap {stage}: {artwork_id} ({result['timings_ms']})")
+        return result
+
+    # Tahap 1: hash
+    started = time.perf_counter()
+    duplicates, hash_shortlist = _hash_stage(hashes, budgets["hash"].max_candidates, deadline("hash", started))
+    duplicate, stage = _first_live(duplicates), "hash"
+    if not duplicate and canonical_hashes:
+        matches = find_hash_duplicates(
+            canonical_hashes,
+            max_distance=max(HASH_THRESHOLDS.values()),
+            min_matches=MIN_SIMILAR_HASHES,
+            canonical=True,
+            deadline=deadline("hash", started),
+        )
+        duplicate, stage = _first_live([str(artwork_id) for artwork_id in matches]), "orientation"
+    result["candidates"]["hash"] = len(hash_shortlist)
+    finish("hash", started)
+    if duplicate:
+        return decide(stage, duplicate)
+
+    # Tahap 2: potongan artwork lain
+    started = time.perf_counter()
+    fragments = find_fragment_source(pil_image, deadline=deadline("tile", started))
+    live = _live_ids([fragment["artwork_id"] for fragment in fragments])
+    fragments = [fragment for fragment in fragments if fragment["artwork_id"] in live]
+    result["candidates"]["tile"] = len(fragments)
+    finish("tile", started)
+    if fragments:
+        result["region"] = fragments[0]["region"]
+        return decide("tile", fragments[0]["artwork_id"])
+
+    # Tahap 3: embedding
+    started = time.perf_counter()
+    embedding_shortlist = []
+    embedding = compute_embedding(pil_image)
+    result["embedding"] = embedding
+    if embedding is not None:
+        top = get_embedding_index().search(
+            embedding,
+            threshold=-1.0,
+            top_k=budgets["embedding"].max_candidates,
+            deadline=deadline("embedding", started),
+        )
+        duplicate = _first_live([str(artwork_id) for artwork_id, score in top if score >= embedding_threshold()])
+        if duplicate:
+            finish("embedding", started)
+            return decide("embedding", duplicate)
+        embedding_shortlist = [str(artwork_id) for artwork_id, _ in top]
+    result["candidates"]["embedding"] = len(embedding_shortlist)
+    finish("embedding", started)
+
+    # Tahap 4: ORB terhadap seluruh katalog
+    started = time.perf_counter()
+    features = query_features(pil_image)
+    top = get_orb_index().search(
+        features.descriptors,
+        ORB_MAX_DISTANCE,
+        top_k=budgets["orb"].max_candidates,
+        deadline=deadline("orb", started),
+    )
+    duplicate = _first_live([str(artwork_id) for artwork_id, score, _ in top if score > ORB_THRESHOLD])
+    result["candidates"]["orb"] = len(top)
+    finish("orb", started)
+    if duplicate:
+        return decide("orb", duplicate)
+    orb_shortlist = [str(artwork_id) for artwork_id, _, _ in top]
+
+    # Tahap 5: SSIM/ORB untuk shortlist gabungan (tanpa duplikat id)
+    started = time.perf_counter()
+    shortlist = list(dict.fromkeys(embedding_shortlist + orb_shortlist + hash_shortlist))
+    shortlist = shortlist[:budgets["rerank"].max_candidates]
+    match, checked = None, 0
+    candidates = _load_candidates(shortlist)
+    if candidates:
+        match, checked = find_first_similar(features, candidates, deadline=deadline("rerank", started))
+    result["candidates"]["rerank"] = checked
+    finish("rerank", started)
+    if match is not None:
+        return decide("rerank", match.id)
+    return result
@@ -0,0 +1,221 @@
+"""Inverted index phash per tile untuk mendeteksi potongan (crop/split) artwork.
+
+Setiap artwork dipecah menjadi grid TILE_GRIDS (2x2 dan 4x4, total 20 tile) dan
+phash tiap tile disimpan di file kolom memory-mapped (lihat ColumnStore). Tile
+yang hampir polos dilewati karena phash-nya tidak informatif.
+
+Query berupa phash gambar utuh + phash grid 2x2-nya. Potongan satu kuadran
+cocok dengan satu tile 2x2 (gambar utuh) dan empat tile 4x4 (grid query).
+Lookup memakai band 16-bit seperti hash index: setiap band punya array nilai
+terurut sehingga satu lookup adalah searchsorted (sublinear), lalu jarak
+sebenarnya diverifikasi. Baris yang baru di-append (ekor) dipindai langsung
+sampai cukup banyak untuk diurutkan ulang.
+"""
+import threading
+import time
+import uuid
+
+import numpy as np
+from PIL import Image
+
+from app.services.column_store import ColumnStore
+from app.services.hash_index import BAND_BITS, HASH_BANDS, popcount64
+from app.utils.image_hashing import phash_value
+
+TILE_GRIDS = (2, 4)
+# Tile dengan simpangan baku piksel di bawah ini dianggap polos
+FLAT_TILE_STD = 4.0
+# Ekor yang belum terurut dipindai linear sampai sebesar ini (atau 1/8 index)
+_MAX_TAIL_ROWS = 4096
+
+
+# Nomor tile -> (grid, baris, kolom)
+TILES = [(grid, row, col) for grid in TILE_GRIDS for row in range(grid) for col in range(grid)]
+
+
+def tile_box(size: tuple[int, int], tile: int) -> tuple[int, int, int, int]:
+    width, height = size
+    grid, row, col = TILES[tile]
+    return col * width // grid, row * height // grid, (col + 1) * width // grid, (row + 1) * height // grid
+
+
+def tile_region(tile: int) -> dict:
+    """Posisi tile dalam artwork, sebagai pecahan lebar/tinggi (0..1)."""
+    grid, row, col = TILES[tile]
+    return {"left": col / grid, "top": row / grid, "right": (col + 1) / grid, "bottom": (row + 1) / grid}
+
+
+def _tile_hashes(gray: Image.Image, tiles) -> list[tuple[int, int]]:
+    pixels = np.asarray(gray)
+    result = []
+    for tile in tiles:
+        left, top, right, bottom = tile_box(gray.size, tile)
+        if right - left < 2 or bottom - top < 2 or pixels[top:bottom, left:right].std() < FLAT_TILE_STD:
+            continue
+        result.append((tile, phash_value(gray.crop((left, top, right, bottom)))))
+    return result
+
+
+def compute_tile_hashes(pil_image: Image.Image) -> list[tuple[int, int]]:
+    """(nomor tile, phash) untuk seluruh tile artwork yang tidak polos."""
+    return _tile_hashes(pil_image.convert("L"), range(len(TILES)))
+
+
+def fragment_query_hashes(pil_image: Image.Image) -> list[int]:
+    """phash gambar utuh + grid 2x2 gambar query."""
+    gray = pil_image.convert("L")
+    hashes = [phash_value(gray)] if np.asarray(gray).std() >= FLAT_TILE_STD else []
+    first_grid = [tile for tile, (grid, _, _) in enumerate(TILES) if grid == TILE_GRIDS[0]]
+    return hashes + [value for _, value in _tile_hashes(gray, first_grid)]
+
+
+class TileIndex(ColumnStore):
+    COLUMNS = {
+        "ids": (np.uint8, (16,)),
+        "tile": (np.uint8, ()),
+        "phash": (np.uint64, ()),
+    }
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._postings_lock = threading.Lock()
+        self._sorted_count = 0
+        self._sorted_file = None
+        self._bands: list[tuple[np.ndarray, np.ndarray]] = []
+
+    def add(self, artwork_id, tile_hashes) -> None:
+        artwork_bytes = uuid.UUID(str(artwork_id)).bytes
+        self._append_many([
+            {"ids": artwork_bytes, "tile": bytes([tile]), "phash": np.uint64(value).tobytes()}
+            for tile, value in tile_hashes
+        ])
+
+    def rebuild(self, items) -> int:
+        """Menulis ulang index dari iterable (artwork_id, tile_hashes); mengembalikan jumlah tile."""
+        rows = (
+            {"ids": uuid.UUID(str(artwork_id)).bytes, "tile": bytes([tile]), "phash": np.uint64(value).tobytes()}
+            for artwork_id, tile_hashes in items
+            for tile, value in tile_hashes
+        )
+        return self._rewrite(rows)
+
+    def _postings(self) -> tuple[list[tuple[np.ndarray, np.ndarray]], int]:
+        """(nilai band terurut + posisi baris per band, jumlah baris yang terurut)."""
+        self._refresh()
+        with self._postings_lock:
+            identity = self._identity
+            tail = self._count - self._sorted_count
+            rewritten = identity != self._sorted_file or tail < 0
+            if rewritten or tail > max(_MAX_TAIL_ROWS, self._count // 8):
+                values = self._columns["phash"]
+                mask = np.uint64((1 << BAND_BITS) - 1)
+                self._bands = []
+                for band in range(HASH_BANDS):
+                    band_values = ((values >> np.uint64(BAND_BITS * band)) & mask).astype(np.uint16)
+                    order = np.argsort(band_values, kind="stable")
+                    self._bands.append((band_values[order], order))
+                self._sorted_count = self._count
+                self._sorted_file = identity
+            return self._bands, self._sorted_count
+
+    def search(
+        self, query_hashes: list[int], max_distance: int = 3, deadline: float | None = None
+    ) -> list[tuple[int, int, int]]:
+        """(indeks query, posisi baris, jarak) untuk setiap tile berjarak <= max_distance.
+
+        Lookup band menjamin semua tile dengan jarak < HASH_BANDS ditemukan.
+        Hash query yang tersisa saat `deadline` (time.perf_counter) terlewati
+        tidak dicari.
+        """
+        bands, sorted_count = self._postings()
+        values = self._columns["phash"][:self._count]
+        dead = self._dead_mask()
+        matches = []
+        for query_no, query in enumerate(query_hashes):
+            if query_no and deadline is not None and time.perf_counter() > deadline:
+                break
+            candidates = [np.arange(sorted_count, self._count)]
+            for band, (band_values, order) in enumerate(bands):
+                key = np.uint16((query >> (BAND_BITS * band)) & ((1 << BAND_BITS) - 1))
+                left = np.searchsorted(band_values, key, side="left")
+                right = np.searchsorted(band_values, key, side="right")
+                candidates.append(order[left:right])
+            positions = np.unique(np.concatenate(candidates))
+            positions = positions[~dead[positions]]
+            if not len(positions):
+                continue
+            distances = popcount64(values[positions] ^ np.uint64(query))
+            close = distances <= max_distance
+            matches.extend(
+                (query_no, int(position), int(distance))
+                for position, distance in zip(positions[close], distances[close])
+            )
+        return matches
+
+    def find_fragment(
+        self,
+        pil_image: Image.Image,
+        max_distance: int = 3,
+        min_matches: int = 2,
+        top_k: int = 5,
+        deadline: float | None = None,
+    ) -> list[dict]:
+        """Artwork yang kemungkinan menjadi sumber potongan `pil_image`.
+
+        Setiap hasil berisi `artwork_id`, `matches` (jumlah hash query yang
+        cocok), `distance` (jumlah jarak terbaik per hash query) dan `region`
+        (gabungan tile yang cocok, pecahan 0..1). Diurutkan dari yang paling
+        meyakinkan.
+        """
+        query_hashes = fragment_query_hashes(pil_image)
+        if len(query_hashes) < min_matches:
+            return []
+
+        best: dict[uuid.UUID, dict[int, tuple[int, int]]] = {}
+        for query_no, position, distance in self.search(query_hashes, max_distance, deadline=deadline):
+            per_query = best.setdefault(self.artwork_id(position), {})
+            if query_no not in per_query or distance < per_query[query_no][0]:
+                per_query[query_no] = (distance, int(self._columns["tile"][position]))
+
+        results = []
+        for artwork_id, per_query in best.items():
+            if len(per_query) < min_matches:
+                continue
+            regions = [tile_region(tile) for _, tile in per_query.values()]
+            results.append({
+                "artwork_id": str(artwork_id),
+                "matches": len(per_query),
+                "distance": sum(distance for distance, _ in per_query.values()),
+                "region": {
+                    "left": min(r["left"] for r in regions),
+                    "top": min(r["top"] for r in regions),
+                    "right": max(r["right"] for r in regions),
+                    "bottom": max(r["bottom"] for r in regions),
+                },
+            })
+        results.sort(key=lambda r: (-r["matches"], r["distance"]))
+        return results[:top_k]
+
+
+_index: TileIndex | None = None
+
+
+def get_tile_index() -> TileIndex:
+    global _index
+    if _index is None:
+        from app.core.config import settings
+        _index = TileIndex(settings.TILE_INDEX_PATH)
+    return _index
+
+
+def find_fragment_source(pil_image: Image.Image, deadline: float | None = None) -> list[dict]:
+    """find_fragment dengan parameter dari settings."""
+    from app.core.config import settings
+
+    return get_tile_index().find_fragment(
+        pil_image,
+        max_distance=settings.TILE_MAX_DISTANCE,
+        min_matches=settings.TILE_MIN_MATCHES,
+        top_k=settings.SIMILARITY_TILE_TOP_K,
+        deadline=deadline,
+    )
@@ -0,0 +1,179 @@
+"""Antrean job upload di tabel Postgres, tanpa broker eksternal.
+
+Route menyimpan file mentah (belum diberi watermark) di storage privat
+(app.storage.get_private_storage, key di bawah UPLOAD_PREFIX) yang tidak pernah
+dilayani /static tetapi bisa dibaca worker di node lain, lalu menambah baris
+`upload_jobs` berstatus "queued". Worker (app.jobs.upload_worker, proses
+terpisah) mengambil job dengan `SELECT ... FOR UPDATE SKIP LOCKED` sehingga beberapa worker bisa
+berjalan bersamaan tanpa mengambil job yang sama. Job "running" yang
+heartbeat-nya lebih tua dari UPLOAD_JOB_STALE_SECONDS (worker mati di tengah
+jalan) diambil ulang sampai UPLOAD_JOB_MAX_ATTEMPTS kali.
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import BinaryIO
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.models.upload_job import UploadJob
+from app.storage import get_private_storage
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+UPLOAD_PREFIX = "upload_jobs"
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+async def enqueue(db: Session, owner_id, source: BinaryIO, params: dict) -> UploadJob:
+    """Menyalin file upload ke storage privat dan menambahkan job ke antrean."""
+    job_id = uuid.uuid4()
+    upload_key = f"{UPLOAD_PREFIX}/{job_id.hex}.upload"
+    source.seek(0)
+    await get_private_storage().put_stream(upload_key, source)
+
+    job = UploadJob(
+        id=job_id,
+        owner_id=owner_id,
+        status=QUEUED,
+        stage=QUEUED,
+        params=params,
+        upload_path=upload_key,
+        artwork_id=uuid.uuid4(),
+        attempts=0,
+        # Jam yang sama dengan heartbeat/finished_at, dan presisi mikrodetik untuk urutan FIFO
+        created_at=_now(),
+    )
+    try:
+        db.add(job)
+        db.commit()
+    except Exception:
+        db.rollback()
+        await get_private_storage().delete(upload_key)
+        raise
+    db.refresh(job)
+    return job
+
+
+async def claim_next(db: Session, worker: str, stale_seconds: float, max_attempts: int) -> UploadJob | None:
+    """Mengambil job tertua yang siap dikerjakan dan menandainya "running".
+
+    Job macet yang sudah dicoba max_attempts kali ditandai "failed" dan
+    dilewati.
+    """
+    while True:
+        stale_before = _now() - timedelta(seconds=stale_seconds)
+        job = (
+            db.query(UploadJob)
+            .filter(or_(
+                UploadJob.status == QUEUED,
+                and_(UploadJob.status == RUNNING, UploadJob.heartbeat_at < stale_before),
+            ))
+            .order_by(UploadJob.created_at, UploadJob.id)
+            .with_for_update(skip_locked=True)
+            .limit(1)
+            .first()
+        )
+        if job is None:
+            db.commit()
+            return None
+
+        now = _now()
+        if job.attempts >= max_attempts:
+            logger.warning(f"Job upload {job.id} macet setelah {job.attempts} percobaan; ditandai gagal.")
+            job.status = FAILED
+            job.stage = FAILED
+            job.error = "Worker berhenti sebelum upload selesai diproses."
+            job.error_status = 500
+            job.finished_at = now
+            db.commit()
+            await remove_upload(job)
+            continue
+
+        if job.status == RUNNING:
+            logger.warning(f"Job upload {job.id} dari worker {job.worker} diambil ulang.")
+        job.status = RUNNING
+        job.stage = "starting"
+        job.worker = worker
+        job.attempts += 1
+        job.started_at = now
+        job.heartbeat_at = now
+        db.commit()
+        return job
+
+
+def set_stage(db: Session, job: UploadJob, stage: str) -> None:
+    job.stage = stage
+    job.heartbeat_at = _now()
+    db.commit()
+
+
+def heartbeat(db: Session, job_id, worker: str) -> bool:
+    """Memperbarui heartbeat job yang masih dipegang `worker`.
+
+    Dipanggil berkala dengan session sendiri (bukan session pemrosesan job,
+    yang bisa sedang berada di tengah transaksi). False jika job sudah selesai
+    atau diambil worker lain.
+    """
+    updated = (
+        db.query(UploadJob)
+        .filter(UploadJob.id == job_id, UploadJob.worker == worker, UploadJob.status == RUNNING)
+        .update({UploadJob.heartbeat_at: _now()}, synchronize_session=False)
+    )
+    db.commit()
+    return bool(updated)
+
+
+async def finish(db: Session, job: UploadJob, result: dict) -> None:
+    job.status = DONE
+    job.stage = DONE
+    job.result = result
+    job.error = None
+    job.error_status = None
+    job.finished_at = _now()
+    db.commit()
+    await remove_upload(job)
+
+
+async def fail(db: Session, job: UploadJob, error: str, error_status: int = 500) -> None:
+    job.status = FAILED
+    job.stage = FAILED
+    job.error = error
+    job.error_status = error_status
+    job.finished_at = _now()
+    db.commit()
+    await remove_upload(job)
+
+
+async def read_upload(job: UploadJob) -> bytes:
+    """Isi file mentah job dari storage."""
+    return await get_private_storage().get(job.upload_path)
+
+
+async def remove_upload(job: UploadJob) -> None:
+    if job.upload_path:
+        await get_private_storage().delete(job.upload_path)
+
+
+def job_status(job: UploadJob) -> dict:
+    """Body respons endpoint status job."""
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "result": job.result,
+        "error": job.error,
+    }
@@ -0,0 +1,245 @@
+"""Proses upload artwork, dipakai route upload langsung maupun worker antrean.
+
+Tahapannya: decode + cek duplikat + watermark + LSB (process pool), simpan file
+hasil ke storage (app.storage) dan ke database (bersama email sertifikat di outbox), lalu tambahkan ke index
+katalog. Penolakan (lisensi tidak valid, gambar ditolak, duplikat) dilaporkan
+sebagai HTTPException agar route bisa meneruskannya apa adanya dan worker bisa
+mencatat status + pesannya.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from typing import Callable
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.process_pool import run_in_pool
+from app.crud.artwork_crud import get_artwork_by_digest
+from app.crud.hash_crud import set_artwork_hashes
+from app.models.artwork import Artwork, compute_copyright_hash, generate_unique_key
+from app.models.user import User
+from app.services.email_outbox import enqueue_email
+from app.services.embedding_index import get_embedding_index
+from app.services.feature_store import get_feature_store
+from app.services.hash_index import get_canonical_hash_index, get_hash_index, uses_memory_index
+from app.services.blob_store import put_blob
+from app.services.image_tasks import index_features, process_upload
+from app.services.ingest import ImageRejected
+from app.services.orb_index import get_orb_index
+from app.services.tile_index import get_tile_index
+from app.steganography import xor_encrypt_decrypt
+from app.storage import get_storage, key_from_url, static_url
+
+logger = logging.getLogger(__name__)
+
+WATERMARKED_PREFIX = "watermarked"
+BASE_URL = "http://localhost:8000"
+DUPLICATE_DETAIL = "Gambar Ditemukan mirip atau sudah pernah diunggap (terdeteksi duplikat)."
+
+
+def reject_exact_duplicate(db: Session, content_sha256: str) -> None:
+    """Menolak upload yang byte-nya identik dengan artwork yang sudah ada (lookup index, tanpa decode)."""
+    if get_artwork_by_digest(db, content_sha256):
+        raise HTTPException(status_code=400, detail=DUPLICATE_DETAIL)
+
+
+def validate_license(license_type: str, price: float) -> tuple[str, float]:
+    license_type = license_type.upper()
+    if license_type not in ["FREE", "PAID"]:
+        raise HTTPException(status_code=400, detail="Tipe lisensi tidak valid.")
+
+    if license_type == "FREE":
+        price = 0.0
+    elif license_type == "PAID":
+        if price <= 0.0:
+            raise HTTPException(status_code=400, detail="Harga harus diisi jika lisensi berbayar.")
+    return license_type, price
+
+
+def add_to_indexes(artwork_id, hashes: dict, canonical_hashes: dict, embedding, tile_hashes, orb_descriptors) -> None:
+    """Menambahkan artwork ke semua index katalog (blocking; panggil lewat asyncio.to_thread).
+
+    Postings ORB tidak disusun ulang di sini; ekornya di-merge oleh task latar
+    belakang (lihat app.services.orb_index.run_postings_merger).
+    """
+    if uses_memory_index():
+        get_hash_index().add(artwork_id, hashes)
+        get_canonical_hash_index().add(artwork_id, canonical_hashes)
+    if embedding is not None:
+        get_embedding_index().add(artwork_id, embedding)
+    get_tile_index().add(artwork_id, tile_hashes)
+    get_orb_index().add(artwork_id, orb_descriptors)
+
+
+async def reindex_artwork(artwork: Artwork, content: bytes) -> None:
+    """Mengulang tahap indexing untuk artwork yang sudah tersimpan dari bytes upload aslinya.
+
+    Dipakai worker antrean jika percobaan sebelumnya mati setelah commit tapi
+    sebelum indexing selesai. Index katalog menerima artwork yang sudah ada.
+    """
+    image_data = await get_storage().get(key_from_url(artwork.image_url))
+    features = await run_in_pool(index_features, str(artwork.id), content, image_data)
+    await asyncio.to_thread(
+        add_to_indexes, artwork.id, features["hashes"], features["canonical_hashes"],
+        features["embedding"], features["tile_hashes"], features["orb_descriptors"],
+    )
+
+
+def remove_from_indexes(artwork_id) -> None:
+    """Menghapus artwork dari semua index katalog dan feature store (setelah baris DB-nya dihapus)."""
+    if uses_memory_index():
+        get_hash_index().delete(artwork_id)
+        get_canonical_hash_index().delete(artwork_id)
+    get_embedding_index().delete(artwork_id)
+    get_tile_index().delete(artwork_id)
+    get_orb_index().delete(artwork_id)
+    get_feature_store().delete(artwork_id)
+
+
+async def create_artwork(
+    db: Session,
+    user: User,
+    content: bytes,
+    filename: str,
+    title: str,
+    description: str | None = None,
+    category: str | None = None,
+    license_type: str = "FREE",
+    price: float = 0.0,
+    watermark_creator_message: str | None = None,
+    content_sha256: str | None = None,
+    artwork_id: uuid.UUID | None = None,
+    on_stage: Callable[[str], None] | None = None,
+) -> dict:
+    """Membuat artwork dari bytes upload; mengembalikan body respons upload.
+
+    `content_sha256` adalah digest bytes upload jika sudah dihitung saat
+    streaming. `on_stage` dipanggil setiap kali pindah tahap ("processing",
+    "saving", "indexing").
+    """
+    def stage(name: str) -> None:
+        if on_stage:
+            on_stage(name)
+
+    artwork_id = artwork_id or uuid.uuid4()
+    license_type, price = validate_license(license_type, price)
+    content_sha256 = content_sha256 or hashlib.sha256(content).hexdigest()
+    reject_exact_duplicate(db, content_sha256)
+    stored_key = None
+    features_saved = False
+
+    try:
+        user_id_str = str(user.id)
+        unique_key = generate_unique_key(user_id_str, title, filename)
+        _, file_extension = os.path.splitext(filename)
+        file_extension = file_extension.lstrip(".").lower()
+
+        watermark_text = f"by {user.username}"
+        watermark_hak_cipta = compute_copyright_hash(unique_key)
+        artwork_secret_code_for_watermark = None
+        encrypted = None
+
+        if watermark_creator_message:
+            artwork_secret_code_for_watermark = uuid.uuid4().hex[:8]
+            encrypted = xor_encrypt_decrypt(watermark_creator_message, artwork_secret_code_for_watermark)
+
+        # Decode, cek duplikat (cascade hash -> embedding -> SSIM/ORB), watermark
+        # dan LSB berjalan di process pool
+        stage("processing")
+        try:
+            result = await run_in_pool(
+                process_upload,
+                str(artwork_id),
+                content,
+                watermark_text,
+                watermark_hak_cipta,
+                encrypted,
+                file_extension,
+            )
+        except ImageRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        logger.info(f"Cek duplikat upload {artwork_id}: {result['similarity']}")
+        if result["duplicate_of"]:
+            raise HTTPException(status_code=400, detail=DUPLICATE_DETAIL)
+        features_saved = True
+        uploaded_hashes = result["hashes"]
+
+        stage("saving")
+        # Key blob store: watermarked/ab/cd/<sha256>.<ext>
+        image_key, created = await put_blob(
+            get_storage(), WATERMARKED_PREFIX, result["image_data"], result["image_sha256"], file_extension,
+        )
+        # File blob yang sudah ada milik artwork lain; jangan dihapus saat gagal
+        stored_key = image_key if created else None
+        image_url_db = static_url(image_key)
+        image_url_full = f"{BASE_URL}{image_url_db}"
+
+        artwork = Artwork(
+            id=artwork_id,
+            owner_id=user.id,
+            title=title,
+            description=description,
+            category=category,
+            license_type=license_type,
+            price=price,
+            image_url=image_url_db,
+            unique_key=unique_key,
+            copyright_hash=watermark_hak_cipta,
+            content_sha256=content_sha256,
+            image_sha256=result["image_sha256"],
+            hash=uploaded_hashes["ahash"],
+            hash_phash=uploaded_hashes["phash"],
+            hash_dhash=uploaded_hashes["dhash"],
+            hash_whash=uploaded_hashes["whash"],
+            artwork_secret_code=artwork_secret_code_for_watermark
+        )
+        db.add(artwork)
+        set_artwork_hashes(db, artwork, uploaded_hashes, result["canonical_hashes"])
+        # Email sertifikat ikut ter-commit bersama artwork; dikirim sender outbox
+        enqueue_email(db, user.email, "certificate", {
+            "title": title,
+            "category": category or "-",
+            "description": description or "-",
+            "unique_key": unique_key,
+            "buyer_code": artwork_secret_code_for_watermark if artwork_secret_code_for_watermark else "N/A",
+            "image_url": image_url_full
+        })
+        try:
+            db.commit()
+        except IntegrityError:
+            # Upload identik lain ter-commit lebih dulu (unique index digest)
+            db.rollback()
+            if get_artwork_by_digest(db, result["image_sha256"]):
+                stored_key = None  # blob yang sama sudah milik artwork tersebut
+                raise HTTPException(status_code=400, detail=DUPLICATE_DETAIL)
+            if get_artwork_by_digest(db, content_sha256):
+                raise HTTPException(status_code=400, detail=DUPLICATE_DETAIL)
+            raise
+        db.refresh(artwork)
+        stored_key = None  # sudah tercatat di database, jangan dihapus
+        features_saved = False
+
+        stage("indexing")
+        await asyncio.to_thread(
+            add_to_indexes, artwork.id, uploaded_hashes, result["canonical_hashes"],
+            result["embedding"], result["tile_hashes"], result["orb_descriptors"],
+        )
+
+        return {
+            "message": "Artwork uploaded successfully with steganography",
+            "artwork_id": artwork.id,
+            "image_url": image_url_db,
+            "unique_key": unique_key,
+            "copyright_hash": watermark_hak_cipta,
+            "buyer_secret_code": artwork_secret_code_for_watermark
+        }
+    except Exception:
+        if stored_key:
+            await get_storage().delete(stored_key)
+        if features_saved:
+            get_feature_store().delete(artwork_id)
+        raise
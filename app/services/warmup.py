@@ -0,0 +1,67 @@
+"""Warm-up index dan model di latar belakang setelah startup.
+
+Server sudah menerima request sebelum warm-up selesai; status tiap komponen
+dilaporkan lewat readiness() (endpoint /api/system/ready) agar load balancer
+bisa menunggu sampai semuanya siap.
+"""
+import asyncio
+import logging
+
+from app.core import process_pool
+from app.services.embedding_index import get_embedding_index
+from app.services.hash_index import sync_hash_index
+from app.services.orb_index import get_orb_index
+from app.utils.image_similarity import neural_similarity_enabled, warm_up_models
+
+logger = logging.getLogger(__name__)
+
+READY_STATES = ("ready", "disabled")
+
+_status = {
+    "hash_index": "pending",
+    "embedding_index": "pending",
+    "orb_index": "pending",
+    "cpu_pool": "pending",
+    "models": "pending",
+}
+
+
+def _load_hash_index() -> None:
+    from app.db.database import SessionLocal
+
+    with SessionLocal() as db:
+        sync_hash_index(db)
+
+
+def _load_embedding_index() -> None:
+    len(get_embedding_index())
+
+
+async def _step(name: str, run) -> None:
+    try:
+        await run()
+        _status[name] = "ready"
+    except Exception as e:
+        logger.exception(f"Warm-up {name} gagal")
+        _status[name] = f"error: {e}"
+
+
+async def warm_up() -> None:
+    await _step("hash_index", lambda: asyncio.to_thread(_load_hash_index))
+    await _step("embedding_index", lambda: asyncio.to_thread(_load_embedding_index))
+    await _step("orb_index", lambda: asyncio.to_thread(get_orb_index().warm_up))
+    await _step("cpu_pool", process_pool.ensure_pool)
+
+    if not neural_similarity_enabled():
+        _status["models"] = "disabled"
+        return
+    # Worker pool sudah memuat model di initializer; ini memastikan berhasil
+    # (atau memuatnya di proses ini jika pool berjalan dalam mode thread)
+    await _step("models", lambda: process_pool.run_in_pool(warm_up_models))
+
+
+def readiness() -> dict:
+    return {
+        "ready": all(state in READY_STATES for state in _status.values()),
+        "components": dict(_status),
+    }
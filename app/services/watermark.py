@@ -0,0 +1,160 @@
+"""Watermark teks yang terlihat (pojok + diagonal tengah) di atas artwork.
+
+Teks yang sama (username, font, ukuran) selalu menghasilkan piksel yang sama,
+jadi glyph dirender sekali menjadi sprite (outline + isi, dan varian diagonal
+yang sudah diputar) dan disimpan di LRU cache per proses. Setiap penempatan
+sprite lalu di-blend ke gambar dengan NumPy hanya pada area yang tertutup
+sprite, bukan menggambar ulang teks 9 kali per posisi.
+
+Sprite menyimpan warna premultiplied dan alpha. Untuk teks pojok, alpha adalah
+cakupan glyph: ImageDraw di gambar opak menimpa piksel sesuai cakupan glyph
+(alpha ink hanya masuk ke kanal alpha, yang dibuang saat konversi ke RGB),
+jadi hasil blend sama dengan menggambar langsung ke gambar.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+SPRITE_CACHE_SIZE = 256
+
+OUTLINE_WIDTH = 2
+TEXT_COLOR = (255, 255, 255, 180)
+OUTLINE_COLOR = (0, 0, 0, 200)
+DIAGONAL_TEXT_COLOR = (255, 255, 255, 80)
+DIAGONAL_OUTLINE_COLOR = (0, 0, 0, 100)
+DIAGONAL_PADDING = 20
+
+
+@dataclass(frozen=True)
+class TextSprite:
+    color: np.ndarray  # (h, w, 3) float32, premultiplied, 0..255
+    alpha: np.ndarray  # (h, w) float32, 0..1
+    # Posisi pojok kiri atas sprite relatif terhadap posisi teks di draw.text
+    offset: tuple[int, int]
+    # Ukuran bbox teks (tanpa outline), dipakai untuk menghitung posisi
+    text_size: tuple[int, int]
+
+
+@lru_cache(maxsize=32)
+def load_font(font_path: str, font_size: int) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.truetype(font_path, font_size)
+    except IOError:
+        return ImageFont.load_default()
+
+
+def _outline_offsets(width: int) -> list[tuple[int, int]]:
+    if not width:
+        return []
+    return [(dx, dy) for dy in (-width, 0, width) for dx in (-width, 0, width) if (dx, dy) != (0, 0)]
+
+
+@lru_cache(maxsize=SPRITE_CACHE_SIZE)
+def text_sprite(text: str, font_path: str, font_size: int, fill: tuple, outline: tuple | None = None,
+                outline_width: int = 0) -> TextSprite:
+    """Sprite teks (dengan outline opsional) seperti jika digambar langsung dengan ImageDraw.text."""
+    font = load_font(font_path, font_size)
+    left, top, right, bottom = ImageDraw.Draw(Image.new("L", (1, 1))).textbbox((0, 0), text, font=font)
+    pad = outline_width
+    size = (right - left + 2 * pad, bottom - top + 2 * pad)
+    origin = (pad - left, pad - top)
+
+    passes = [((origin[0] + dx, origin[1] + dy), outline) for dx, dy in _outline_offsets(outline_width)] if outline else []
+    passes.append((origin, fill))
+
+    # Setiap pass menimpa piksel sesuai cakupan glyph (seperti ImageDraw di
+    # gambar opak); warna dan cakupan diakumulasi dalam bentuk premultiplied
+    color = np.zeros((size[1], size[0], 3), dtype=np.float32)
+    alpha = np.zeros((size[1], size[0]), dtype=np.float32)
+    for position, ink in passes:
+        mask = Image.new("L", size, 0)
+        ImageDraw.Draw(mask).text(position, text, font=font, fill=255)
+        coverage = np.asarray(mask, dtype=np.float32) / 255.0
+        color = np.asarray(ink[:3], dtype=np.float32) * coverage[..., None] + color * (1.0 - coverage[..., None])
+        alpha = coverage + alpha * (1.0 - coverage)
+
+    color.setflags(write=False)
+    alpha.setflags(write=False)
+    return TextSprite(color, alpha, (left - pad, top - pad), (right - left, bottom - top))
+
+
+@lru_cache(maxsize=SPRITE_CACHE_SIZE)
+def diagonal_sprite(text: str, font_path: str, font_size: int) -> TextSprite:
+    """Teks semi-transparan berputar 45 derajat untuk bagian tengah gambar."""
+    font = load_font(font_path, font_size)
+    draw = ImageDraw.Draw(Image.new("L", (1, 1)))
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    text_width, text_height = right - left, bottom - top
+
+    layer = Image.new("RGBA", (text_width + 2 * DIAGONAL_PADDING, text_height + 2 * DIAGONAL_PADDING), (0, 0, 0, 0))
+    layer_draw = ImageDraw.Draw(layer)
+    for dx, dy in _outline_offsets(OUTLINE_WIDTH):
+        layer_draw.text((DIAGONAL_PADDING + dx, DIAGONAL_PADDING + dy), text, font=font, fill=DIAGONAL_OUTLINE_COLOR)
+    layer_draw.text((DIAGONAL_PADDING, DIAGONAL_PADDING), text, font=font, fill=DIAGONAL_TEXT_COLOR)
+
+    # Di sini alpha ink memang dipakai: layer ditempel dengan dirinya sebagai mask
+    rotated = layer.rotate(45, expand=1)
+    pixels = np.asarray(rotated, dtype=np.float32)
+    alpha = pixels[..., 3] / 255.0
+    color = pixels[..., :3] * alpha[..., None]
+    color.setflags(write=False)
+    alpha.setflags(write=False)
+    return TextSprite(color, alpha, (-(rotated.width // 2), -(rotated.height // 2)), (text_width, text_height))
+
+
+def blend_sprite(pixels: np.ndarray, sprite: TextSprite, position: tuple[int, int]) -> None:
+    """Alpha-blend sprite ke array RGB uint8 (in place) pada posisi teks; bagian di luar gambar dipotong."""
+    x, y = position[0] + sprite.offset[0], position[1] + sprite.offset[1]
+    sprite_height, sprite_width = sprite.alpha.shape
+    height, width = pixels.shape[:2]
+    left, top = max(x, 0), max(y, 0)
+    right, bottom = min(x + sprite_width, width), min(y + sprite_height, height)
+    if right <= left or bottom <= top:
+        return
+
+    source = (slice(top - y, bottom - y), slice(left - x, right - x))
+    region = pixels[top:bottom, left:right]
+    blended = sprite.color[source] + region * (1.0 - sprite.alpha[source][..., None])
+    region[...] = np.clip(np.rint(blended), 0, 255).astype(np.uint8)
+
+
+def draw_text_sprites(image_obj: Image.Image, placements) -> Image.Image:
+    """Salinan RGB `image_obj` dengan setiap (sprite, posisi) di-blend berurutan."""
+    pixels = np.array(image_obj.convert("RGB"))
+    for sprite, position in placements:
+        blend_sprite(pixels, sprite, position)
+    return Image.fromarray(pixels)
+
+
+def add_physical_watermark(image_obj, text, font_path="arial.ttf", font_size=None):
+    width, height = image_obj.size
+
+    # Auto-calculate font size based on image dimensions if not provided
+    if font_size is None:
+        font_size = max(24, min(width, height) // 25)  # Responsive font size
+
+    # Teks dengan outline gelap agar kontras di latar apa pun
+    sprite = text_sprite(text, font_path, font_size, TEXT_COLOR, OUTLINE_COLOR, OUTLINE_WIDTH)
+    text_width, text_height = sprite.text_size
+
+    # Better positioned watermarks with more padding
+    padding = max(20, min(width, height) // 30)
+
+    positions = [
+        # Top corners
+        (padding, padding),
+        (width - text_width - padding, padding),
+        # Bottom corners
+        (padding, height - text_height - padding),
+        (width - text_width - padding, height - text_height - padding),
+        # Center positions for better coverage
+        (width//2 - text_width//2, padding),  # Top center
+        (width//2 - text_width//2, height - text_height - padding),  # Bottom center
+    ]
+
+    placements = [(sprite, position) for position in positions]
+    # Subtle diagonal watermark in the center
+    placements.append((diagonal_sprite(text, font_path, font_size), (width // 2, height // 2)))
+    return draw_text_sprites(image_obj, placements)
@@ -1,5 +1,10 @@
 import os
 import base64
+import struct
+import zlib
+from typing import Callable
+import numpy as np
+import PIL
 from PIL import Image
 
 
@@ -27,118 +32,351 @@ def xor_decrypt_base64(encoded_data: str, key: str) -> str:
     encrypted = base64.b64decode(encoded_data).decode()
     return xor_encrypt_decrypt(encrypted, key)
 
-def embed_message_lsb(image_path: str, message: str) -> str:
-    img = Image.open(image_path).convert("RGB")
-    width, height = img.size
+END_MARKER = "<END>"
+
+# Jumlah byte yang dibaca per iterasi saat mencari terminator
+_SCAN_CHUNK_BYTES = 64 * 1024
+
+
+def _message_bits(text: str) -> np.ndarray:
+    """Bit pesan sebagai array uint8 (0/1), identik dengan text_to_binary."""
+    try:
+        data = text.encode("latin-1")
+    except UnicodeEncodeError:
+        # format(ord(c), '08b') menghasilkan lebih dari 8 bit untuk karakter > U+00FF
+        return np.frombuffer(text_to_binary(text).encode("ascii"), dtype=np.uint8) - ord("0")
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+
+def _write_lsb(channels: np.ndarray, bits: np.ndarray) -> None:
+    """Menulis bit ke LSB hanya pada elemen yang dibutuhkan payload (in-place)."""
+    n = bits.size
+    channels[:n] = (channels[:n] & 0xFE) | bits
+
+
+def _read_lsb_bytes(channels: np.ndarray, start: int, count: int) -> bytes:
+    """Membaca `count` byte dari LSB mulai dari byte ke-`start`."""
+    bits = channels[start * 8:(start + count) * 8] & 1
+    return np.packbits(bits).tobytes()
+
 
-    full_message_data = message + "<END>"
-    binary_data = text_to_binary(full_message_data)
-    data_index = 0
+def _scan_until_marker(channels: np.ndarray, marker: bytes) -> tuple[bytes, bool]:
+    """Membaca LSB per blok sampai `marker` ditemukan, tanpa mengurai seluruh gambar."""
+    total = channels.size // 8
+    data = bytearray()
+    pos = 0
+    while pos < total:
+        count = min(_SCAN_CHUNK_BYTES, total - pos)
+        data += _read_lsb_bytes(channels, pos, count)
+        idx = data.find(marker, max(0, pos - len(marker) + 1))
+        if idx != -1:
+            return bytes(data[:idx]), True
+        pos += count
+    return bytes(data), False
+
+
+def _embed_bits(image: Image.Image, bits: np.ndarray) -> Image.Image:
+    """Menulis bit ke LSB kanal RGB dan mengembalikan image RGB baru."""
+    img = image if image.mode == "RGB" else image.convert("RGB")
+    width, height = img.size
 
     capacity_bits = width * height * 3
-    if len(binary_data) > capacity_bits:
-        raise ValueError(f"Message is too long ({len(binary_data)} bits) for image capacity ({capacity_bits} bits).")
-
-    pixels = list(img.getdata())
-    modified_pixels = []
-
-    for pixel in pixels:
-        r, g, b = pixel
-        r_bin = list(format(r, '08b'))
-        g_bin = list(format(g, '08b'))
-        b_bin = list(format(b, '08b'))
-
-        if data_index < len(binary_data):
-            r_bin[-1] = binary_data[data_index]
-            data_index += 1
-        if data_index < len(binary_data):
-            g_bin[-1] = binary_data[data_index]
-            data_index += 1
-        if data_index < len(binary_data):
-            b_bin[-1] = binary_data[data_index]
-            data_index += 1
-
-        modified_pixels.append((
-            int(''.join(r_bin), 2),
-            int(''.join(g_bin), 2),
-            int(''.join(b_bin), 2)
-        ))
-
-    modified_pixels += pixels[len(modified_pixels):]
-
-    modified_img = Image.new(img.mode, img.size)
-    modified_img.putdata(modified_pixels)
+    if bits.size > capacity_bits:
+        raise ValueError(f"Message is too long ({bits.size} bits) for image capacity ({capacity_bits} bits).")
+
+    pixels = np.array(img, dtype=np.uint8)
+    _write_lsb(pixels.reshape(-1), bits)
+    return Image.fromarray(pixels)
+
 
+def _stego_path(image_path: str) -> str:
     base_name, ext = os.path.splitext(image_path)
-    stego_image_path = f"{base_name}_stego{ext}"
+    return f"{base_name}_stego{ext}"
+
+
+def embed_message_lsb(image_path: str, message: str) -> str:
+    img = Image.open(image_path)
+    modified_img = _embed_bits(img, _message_bits(message + END_MARKER))
+
+    stego_image_path = _stego_path(image_path)
     modified_img.save(stego_image_path)
 
     return stego_image_path
 
 def extract_message_lsb(stego_image_path: str) -> str:
     img = Image.open(stego_image_path).convert("RGB")
-    pixels = list(img.getdata())
-
-    bits = []
-    for r, g, b in pixels:
-        bits.append(format(r, '08b')[-1])
-        bits.append(format(g, '08b')[-1])
-        bits.append(format(b, '08b')[-1])
+    channels = np.asarray(img).reshape(-1)
 
-    chars = []
-    for i in range(0, len(bits), 8):
-        byte = ''.join(bits[i:i+8])
-        if len(byte) < 8:
-            continue
-        char = chr(int(byte, 2))
-        chars.append(char)
-        if ''.join(chars[-5:]) == "<END>":  
-            break
-
-    return ''.join(chars).replace("<END>", "")
+    data, _ = _scan_until_marker(channels, END_MARKER.encode("latin-1"))
+    return data.decode("latin-1")
 
 def embed_message_lsb_from_pil_image(image: Image.Image, message: str) -> Image.Image:
     """Menyisipkan pesan ke dalam image dengan metode LSB"""
-    encoded = image.copy()
-    width, height = encoded.size
+    pixels = np.array(image, dtype=np.uint8)
     message += chr(0)  # menambahkan karakter terminator
-    message_bits = ''.join([format(ord(char), '08b') for char in message])
-
-    data_index = 0
-    pixels = encoded.load()
+    message_bits = _message_bits(message)
 
-    for y in range(height):
-        for x in range(width):
-            if data_index < len(message_bits):
-                r, g, b = pixels[x, y]
-                r = (r & ~1) | int(message_bits[data_index])
-                pixels[x, y] = (r, g, b)
-                data_index += 1
-            else:
-                return encoded
-    return encoded
+    # Hanya kanal merah yang dipakai; pesan yang melebihi kapasitas dipotong
+    red = pixels.reshape(-1, pixels.shape[-1])[:, 0]
+    _write_lsb(red, message_bits[:red.size])
+    return Image.fromarray(pixels)
 
 
 def extract_message_lsb_from_pil_image(image: Image.Image) -> str:
     """Mengambil pesan dari image dengan metode LSB"""
-    pixels = image.load()
-    width, height = image.size
-    bits = []
-    for y in range(height):
-        for x in range(width):
-            r, g, b = pixels[x, y]
-            bits.append(str(r & 1))
-
-    message = ""
-    for i in range(0, len(bits), 8):
-        byte = bits[i:i+8]
-        char = chr(int("".join(byte), 2))
-        if char == chr(0):  # terminator
-            break
-        message += char
+    pixels = np.asarray(image)
+    red = pixels.reshape(-1, pixels.shape[-1])[:, 0]
+
+    data, found = _scan_until_marker(red, b"\x00")  # terminator
+    message = data.decode("latin-1")
+    tail_bits = red.size % 8
+    if not found and tail_bits:
+        tail = int("".join(str(b) for b in red[-tail_bits:] & 1), 2)
+        if tail:
+            message += chr(tail)
     return message
 
 
+# ======================
+# Kontainer watermark biner (versi 1)
+# ======================
+# Header: magic | versi | flags | panjang payload | CRC32 payload
+WATERMARK_MAGIC = b"\x89SWM"
+WATERMARK_VERSION = 1
+MAX_WATERMARK_BYTES = 64 * 1024
+_LEGACY_FIRST_WINDOW = 1024
+
+_HEADER = struct.Struct(">4sBBII")
+_RECORD = struct.Struct(">BH")
+
+FLAG_ZLIB = 0x01
+
+RECORD_COPYRIGHT = 0x01  # SHA-256 mentah (32 byte)
+RECORD_USER_MESSAGE = 0x02  # pesan kreator terenkripsi, UTF-8
+
+LEGACY_PREFIX = "COPYRIGHT:"
+LEGACY_USER_MESSAGE = "<USER_MESSAGE>"
+
+
+def pack_watermark(copyright_hash: str, user_message: str | None = None) -> bytes:
+    """Menyusun payload watermark biner: header tetap + record TLV (opsional zlib)."""
+    records = [(RECORD_COPYRIGHT, bytes.fromhex(copyright_hash))]
+    if user_message:
+        records.append((RECORD_USER_MESSAGE, user_message.encode("utf-8", "surrogatepass")))
+
+    body = b"".join(_RECORD.pack(tag, len(value)) + value for tag, value in records)
+    flags = 0
+    compressed = zlib.compress(body, 9)
+    if len(compressed) < len(body):
+        body, flags = compressed, flags | FLAG_ZLIB
+
+    if len(body) > MAX_WATERMARK_BYTES:
+        raise ValueError(f"Watermark payload is too long ({len(body)} bytes).")
+    header = _HEADER.pack(WATERMARK_MAGIC, WATERMARK_VERSION, flags, len(body), zlib.crc32(body))
+    return header + body
+
+
+def _parse_header(header: bytes) -> tuple[int, int, int]:
+    magic, version, flags, length, crc = _HEADER.unpack(header)
+    if magic != WATERMARK_MAGIC:
+        raise ValueError("Bukan kontainer watermark.")
+    if version != WATERMARK_VERSION:
+        raise ValueError(f"Versi watermark tidak didukung: {version}")
+    if length > MAX_WATERMARK_BYTES:
+        raise ValueError(f"Panjang payload tidak valid: {length}")
+    return flags, length, crc
+
+
+def _parse_body(body: bytes, flags: int, crc: int) -> dict:
+    if zlib.crc32(body) != crc:
+        raise ValueError("CRC watermark tidak cocok.")
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    result = {"version": WATERMARK_VERSION, "copyright_hash": None, "user_message": None}
+    pos = 0
+    while pos + _RECORD.size <= len(body):
+        tag, size = _RECORD.unpack_from(body, pos)
+        pos += _RECORD.size
+        value = body[pos:pos + size]
+        pos += size
+        if tag == RECORD_COPYRIGHT:
+            result["copyright_hash"] = value.hex()
+        elif tag == RECORD_USER_MESSAGE:
+            result["user_message"] = value.decode("utf-8", "surrogatepass")
+        # record dengan tag yang tidak dikenal dilewati agar kompatibel ke depan
+
+    if result["copyright_hash"] is None:
+        raise ValueError("Record COPYRIGHT tidak ditemukan.")
+    return result
+
+
+def unpack_watermark(data: bytes) -> dict:
+    """Kebalikan dari pack_watermark. Melempar ValueError jika data rusak."""
+    flags, length, crc = _parse_header(data[:_HEADER.size])
+    body = data[_HEADER.size:_HEADER.size + length]
+    if len(body) != length:
+        raise ValueError("Payload watermark terpotong.")
+    return _parse_body(body, flags, crc)
+
+
+def parse_legacy_message(message: str) -> dict:
+    """Mengurai format lama "COPYRIGHT:<hash><USER_MESSAGE><pesan>"."""
+    parts = message.split(LEGACY_USER_MESSAGE)
+    return {
+        "version": 0,
+        "copyright_hash": parts[0].replace(LEGACY_PREFIX, "").strip(),
+        "user_message": parts[1] if len(parts) > 1 else None,
+    }
+
+
+def _read_watermark(load_channels: Callable[[int], np.ndarray]) -> dict | None:
+    """Membaca watermark dari LSB: header dulu, lalu tepat `length` byte.
+
+    `load_channels(n)` mengembalikan kanal RGB datar yang memuat minimal `n`
+    byte LSB pertama (atau seluruh gambar jika lebih kecil).
+    """
+    channels = load_channels(_HEADER.size)
+    if channels.size // 8 < _HEADER.size:
+        return None
+
+    header = _read_lsb_bytes(channels, 0, _HEADER.size)
+    if header.startswith(WATERMARK_MAGIC):
+        try:
+            flags, length, crc = _parse_header(header)
+            channels = load_channels(_HEADER.size + length)
+            if channels.size // 8 < _HEADER.size + length:
+                return None
+            return _parse_body(_read_lsb_bytes(channels, _HEADER.size, length), flags, crc)
+        except (ValueError, zlib.error):
+            return None
+
+    # File lama: hanya di-scan sampai <END> jika diawali "COPYRIGHT:",
+    # dengan jendela yang diperbesar bertahap hingga MAX_WATERMARK_BYTES
+    if header.startswith(LEGACY_PREFIX.encode("latin-1")):
+        limit = _LEGACY_FIRST_WINDOW
+        while True:
+            channels = load_channels(limit)
+            data, found = _scan_until_marker(channels[:limit * 8], END_MARKER.encode("latin-1"))
+            if found:
+                return parse_legacy_message(data.decode("latin-1"))
+            if channels.size // 8 < limit or limit >= MAX_WATERMARK_BYTES:
+                return None
+            limit = min(limit * 8, MAX_WATERMARK_BYTES)
+    return None
+
+
+# Decode sebagian memakai atribut internal ImageFile (_size, tile, load_end);
+# hanya diaktifkan untuk versi Pillow yang sudah diuji, selain itu decode penuh
+PARTIAL_DECODE_PILLOW_MAJORS = range(9, 13)
+
+
+def _pillow_major() -> int:
+    return int(PIL.__version__.split(".")[0])
+
+
+def _supports_partial_decode(img: Image.Image) -> bool:
+    # PNG non-interlaced diurai baris demi baris dari atas, sehingga decoder
+    # bisa dihentikan setelah baris yang dibutuhkan
+    return (
+        _pillow_major() in PARTIAL_DECODE_PILLOW_MAJORS
+        and img.format == "PNG"
+        and not img.info.get("interlace")
+        and len(img.tile) == 1
+        and img.tile[0][0] == "zip"
+        and hasattr(img, "_size")
+    )
+
+
+def _open(source) -> Image.Image:
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return Image.open(source)
+
+
+def _decode_all_rows(source) -> np.ndarray:
+    with _open(source) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def _decode_leading_rows(source, rows: int) -> np.ndarray:
+    """Mengurai hanya `rows` baris teratas sebagai array RGB (minimal `rows` baris).
+
+    Jika internal Pillow tidak sesuai dugaan, seluruh gambar di-decode.
+    """
+    try:
+        with _open(source) as img:
+            width, height = img.size
+            rows = max(1, min(rows, height))
+            tile = img.tile[0]
+            img._size = (width, rows)
+            img.tile = [(tile[0], (0, 0, width, rows), *tile[2:])]
+            # load_end membaca sisa chunk IDAT sampai akhir file; tidak diperlukan di sini
+            img.load_end = lambda: None
+            return np.asarray(img.convert("RGB"))[:rows]
+    except (AttributeError, TypeError, ValueError, IndexError):
+        return _decode_all_rows(source)
+
+
+def _strip_loader(source) -> Callable[[int], np.ndarray]:
+    """Loader kanal yang hanya mengurai strip baris teratas dari file/stream.
+
+    Strip yang sudah di-decode disimpan dan dipakai ulang; format tanpa decode
+    sebagian (JPEG, BMP, PNG interlaced, ...) di-decode penuh sekali saja.
+    """
+    with _open(source) as img:
+        width, height = img.size
+        partial = _supports_partial_decode(img)
+    decoded = None
+
+    def load_channels(nbytes: int) -> np.ndarray:
+        nonlocal decoded
+        rows = max(1, min(-(-nbytes * 8 // (width * 3)), height))
+        if decoded is None or len(decoded) < rows:
+            decoded = _decode_leading_rows(source, rows) if partial else _decode_all_rows(source)
+        return decoded[:rows].reshape(-1)
+
+    return load_channels
+
+
+def embed_watermark_from_pil_image(image: Image.Image, copyright_hash: str, user_message: str | None = None) -> Image.Image:
+    """Menyisipkan kontainer watermark biner ke RGB LSB, sepenuhnya di memori."""
+    payload = np.frombuffer(pack_watermark(copyright_hash, user_message), dtype=np.uint8)
+    return _embed_bits(image, np.unpackbits(payload))
+
+
+def embed_watermark(image_path: str, copyright_hash: str, user_message: str | None = None) -> str:
+    """Versi berbasis path dari embed_watermark_from_pil_image; menyimpan file *_stego."""
+    stego_image = embed_watermark_from_pil_image(Image.open(image_path), copyright_hash, user_message)
+    stego_image_path = _stego_path(image_path)
+    stego_image.save(stego_image_path)
+    return stego_image_path
+
+
+def extract_watermark(stego_image_path: str) -> dict | None:
+    """Mengambil watermark (format biner maupun format lama). None jika tidak ada.
+
+    Hanya strip baris teratas yang memuat payload yang diurai; `stego_image_path`
+    boleh berupa path atau file object biner.
+    """
+    return _read_watermark(_strip_loader(stego_image_path))
+
+
+def extract_watermark_from_pil_image(image: Image.Image) -> dict | None:
+    """extract_watermark untuk gambar yang sudah di-decode, tanpa file atau encode ulang.
+
+    Hanya strip baris teratas yang disalin ke array; sisa gambar tidak disentuh.
+    """
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    width, height = rgb.size
+
+    def load_channels(nbytes: int) -> np.ndarray:
+        rows = max(1, min(-(-nbytes * 8 // (width * 3)), height))
+        return np.asarray(rgb.crop((0, 0, width, rows))).reshape(-1)
+
+    return _read_watermark(load_channels)
+
+
 def rotate_image(image: Image.Image, angle: int) -> Image.Image:
     """Rotasi image dengan sudut tertentu (0, 90, 180, 270)"""
     return image.rotate(angle, expand=True)
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""Penyimpanan file bersama untuk semua node API dan worker.
+
+STORAGE_BACKEND memilih driver: "local" (direktori STORAGE_LOCAL_ROOT, dilayani
+mount /static) atau "s3" (bucket S3-compatible; /static/<key> dialihkan ke URL
+objeknya). URL yang disimpan di database selalu berbentuk /static/<key>,
+sehingga tetap valid ketika backend diganti.
+
+get_private_storage() memakai driver yang sama untuk file yang tidak pernah
+dilayani /static (direktori di luar STORAGE_LOCAL_ROOT atau bucket privat).
+"""
+import os
+from urllib.parse import unquote, urlparse
+
+from app.storage.base import Storage, normalize_key
+from app.storage.local import LocalStorage
+from app.storage.s3 import S3Storage, create_s3_client
+
+STATIC_URL_PREFIX = "/static/"
+
+_storage: Storage | None = None
+_private_storage: Storage | None = None
+
+
+def _create_storage(local_root: str, bucket: str | None, public_base_url: str | None) -> Storage:
+    from app.core.config import settings
+    if settings.STORAGE_BACKEND == "s3":
+        client = create_s3_client(
+            settings.S3_ENDPOINT_URL, settings.S3_REGION, settings.S3_ACCESS_KEY_ID, settings.S3_SECRET_ACCESS_KEY,
+        )
+        return S3Storage(
+            client,
+            bucket,
+            prefix=settings.S3_PREFIX,
+            public_base_url=public_base_url,
+            url_expire_seconds=settings.STORAGE_URL_EXPIRE_SECONDS,
+            part_bytes=settings.S3_MULTIPART_PART_BYTES,
+        )
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(local_root)
+    raise ValueError(f"STORAGE_BACKEND tidak dikenal: {settings.STORAGE_BACKEND}")
+
+
+def get_storage() -> Storage:
+    """Storage publik: artwork hasil watermark dan foto profil (dilayani /static)."""
+    global _storage
+    if _storage is None:
+        from app.core.config import settings
+        _storage = _create_storage(settings.STORAGE_LOCAL_ROOT, settings.S3_BUCKET, settings.S3_PUBLIC_BASE_URL)
+    return _storage
+
+
+def get_private_storage() -> Storage:
+    """Storage yang tidak pernah dilayani /static, untuk upload mentah antrean."""
+    global _private_storage
+    if _private_storage is None:
+        from app.core.config import settings
+        if settings.STORAGE_BACKEND == "s3" and (
+            not settings.S3_PRIVATE_BUCKET or settings.S3_PRIVATE_BUCKET == settings.S3_BUCKET
+        ):
+            raise ValueError("S3_PRIVATE_BUCKET wajib diisi dengan bucket selain S3_BUCKET.")
+        if settings.STORAGE_BACKEND == "local" and _is_within(
+            settings.PRIVATE_STORAGE_LOCAL_ROOT, settings.STORAGE_LOCAL_ROOT
+        ):
+            raise ValueError("PRIVATE_STORAGE_LOCAL_ROOT tidak boleh berada di dalam STORAGE_LOCAL_ROOT.")
+        _private_storage = _create_storage(settings.PRIVATE_STORAGE_LOCAL_ROOT, settings.S3_PRIVATE_BUCKET, None)
+    return _private_storage
+
+
+def _is_within(path: str, root: str) -> bool:
+    path, root = os.path.realpath(path), os.path.realpath(root)
+    return os.path.commonpath([path, root]) == root
+
+
+def static_url(key: str) -> str:
+    """Path /static/<key> yang disimpan di database."""
+    return STATIC_URL_PREFIX + normalize_key(key)
+
+
+def key_from_url(url: str) -> str | None:
+    """Kebalikan static_url; menerima path maupun URL lengkap. None jika bukan /static/."""
+    path = unquote(urlparse(url).path)
+    if not path.startswith(STATIC_URL_PREFIX):
+        return None
+    return normalize_key(path[len(STATIC_URL_PREFIX):])
+
@@ -0,0 +1,53 @@
+"""Antarmuka penyimpanan file (artwork hasil watermark, foto profil).
+
+Semua operasi async sehingga route tidak memblokir event loop: driver lokal
+menjalankan I/O file di thread, driver S3 memanggil boto3 di thread. Kode yang
+sudah berjalan di luar event loop (process pool, thread rerank) memakai
+read() yang blocking. Key
+berupa path relatif dengan "/" (mis. "watermarked/ab/cd/<sha256>.png").
+"""
+import posixpath
+from abc import ABC, abstractmethod
+from typing import BinaryIO
+
+CHUNK_BYTES = 1024 * 1024
+
+
+def normalize_key(key: str) -> str:
+    """Menolak key kosong, absolut, atau yang keluar dari root (`..`)."""
+    key = key.replace("\\", "/")
+    normalized = posixpath.normpath(key)
+    if key.startswith("/") or normalized == "." or normalized == ".." or normalized.startswith("../"):
+        raise ValueError(f"Key storage tidak valid: {key!r}")
+    return normalized
+
+
+class Storage(ABC):
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        """Menulis `data` ke `key` (menimpa); pembaca tidak melihat isi setengah jadi."""
+
+    @abstractmethod
+    async def put_stream(self, key: str, source: BinaryIO, content_type: str | None = None) -> int:
+        """Menyalin file object per chunk ke `key`; mengembalikan jumlah byte."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """Isi `key`; FileNotFoundError jika tidak ada."""
+
+    @abstractmethod
+    def read(self, key: str) -> bytes:
+        """Versi blocking get(); jangan dipanggil dari event loop."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Menghapus `key`; tidak error jika sudah tidak ada."""
+
+    @abstractmethod
+    def url(self, key: str, expires_in: int | None = None) -> str:
+        """URL untuk mengunduh `key` (path statis, URL publik, atau presigned URL)."""
@@ -0,0 +1,54 @@
+"""Driver storage di filesystem lokal (default, direktori static/)."""
+import asyncio
+import os
+from typing import BinaryIO
+
+from app.storage.base import Storage, normalize_key
+from app.utils.files import write_bytes_atomic, write_stream_atomic
+
+
+class LocalStorage(Storage):
+
+    def __init__(self, root: str, base_url: str = "/static"):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, *normalize_key(key).split("/"))
+
+    def _prepare(self, key: str) -> str:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def _put_stream(self, key: str, source: BinaryIO) -> int:
+        path = write_stream_atomic(source, self._prepare(key))
+        return os.path.getsize(path)
+
+    def _delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def read(self, key: str) -> bytes:
+        with open(self.path(key), "rb") as f:
+            return f.read()
+
+    async def put(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        await asyncio.to_thread(lambda: write_bytes_atomic(data, self._prepare(key)))
+
+    async def put_stream(self, key: str, source: BinaryIO, content_type: str | None = None) -> int:
+        return await asyncio.to_thread(self._put_stream, key, source)
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(self.read, key)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self.path(key))
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    def url(self, key: str, expires_in: int | None = None) -> str:
+        return f"{self.base_url}/{normalize_key(key)}"
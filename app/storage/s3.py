@@ -0,0 +1,130 @@
+"""Driver storage S3-compatible (AWS S3, MinIO, R2, ...) lewat boto3.
+
+boto3 hanya dibutuhkan jika STORAGE_BACKEND=s3 dan diimpor saat client dibuat.
+Client boto3 thread-safe dan sinkron, jadi setiap panggilan dijalankan di
+thread. File besar diunggah per part (multipart upload) tanpa dibaca utuh ke
+memori; part yang sudah terunggah dibatalkan jika upload gagal.
+"""
+import asyncio
+from typing import BinaryIO
+
+from app.storage.base import Storage, normalize_key
+
+# Batas minimum ukuran part multipart S3 (kecuali part terakhir)
+MIN_PART_BYTES = 5 * 1024 * 1024
+
+
+def create_s3_client(endpoint_url: str | None, region: str | None, access_key_id: str | None, secret_access_key: str | None):
+    import boto3
+
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint_url or None,
+        region_name=region or None,
+        aws_access_key_id=access_key_id or None,
+        aws_secret_access_key=secret_access_key or None,
+    )
+
+
+def _is_missing(error: Exception) -> bool:
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class S3Storage(Storage):
+
+    def __init__(
+        self,
+        client,
+        bucket: str,
+        prefix: str = "",
+        public_base_url: str | None = None,
+        url_expire_seconds: int = 3600,
+        part_bytes: int = 8 * 1024 * 1024,
+    ):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.public_base_url = public_base_url.rstrip("/") if public_base_url else None
+        self.url_expire_seconds = url_expire_seconds
+        self.part_bytes = max(part_bytes, MIN_PART_BYTES)
+
+    def object_key(self, key: str) -> str:
+        key = normalize_key(key)
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _put(self, key: str, data: bytes, content_type: str | None) -> None:
+        extra = {"ContentType": content_type} if content_type else {}
+        self.client.put_object(Bucket=self.bucket, Key=self.object_key(key), Body=data, **extra)
+
+    def _put_stream(self, key: str, source: BinaryIO, content_type: str | None) -> int:
+        part = source.read(self.part_bytes)
+        if len(part) < self.part_bytes:
+            self._put(key, part, content_type)
+            return len(part)
+
+        object_key = self.object_key(key)
+        extra = {"ContentType": content_type} if content_type else {}
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=object_key, **extra)["UploadId"]
+        parts, size = [], 0
+        try:
+            while part:
+                number = len(parts) + 1
+                response = self.client.upload_part(
+                    Bucket=self.bucket, Key=object_key, UploadId=upload_id, PartNumber=number, Body=part,
+                )
+                parts.append({"ETag": response["ETag"], "PartNumber": number})
+                size += len(part)
+                part = source.read(self.part_bytes)
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=object_key, UploadId=upload_id, MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=object_key, UploadId=upload_id)
+            raise
+        return size
+
+    def read(self, key: str) -> bytes:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))
+        except Exception as e:
+            if _is_missing(e):
+                raise FileNotFoundError(key) from e
+            raise
+        return response["Body"].read()
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+        except Exception as e:
+            if _is_missing(e):
+                return False
+            raise
+        return True
+
+    async def put(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        await asyncio.to_thread(self._put, key, data, content_type)
+
+    async def put_stream(self, key: str, source: BinaryIO, content_type: str | None = None) -> int:
+        return await asyncio.to_thread(self._put_stream, key, source, content_type)
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(self.read, key)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._exists, key)
+
+    async def delete(self, key: str) -> None:
+        # DeleteObject S3 idempoten: key yang tidak ada tetap sukses
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=self.object_key(key))
+
+    def url(self, key: str, expires_in: int | None = None) -> str:
+        """URL publik jika bucket/CDN publik (S3_PUBLIC_BASE_URL), selain itu presigned GET."""
+        object_key = self.object_key(key)
+        if self.public_base_url:
+            return f"{self.public_base_url}/{object_key}"
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": object_key},
+            ExpiresIn=expires_in or self.url_expire_seconds,
+        )
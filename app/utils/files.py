@@ -0,0 +1,38 @@
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Callable
+
+
+def _write_atomic(path: str, write: Callable[[BinaryIO], None]) -> str:
+    """Menulis ke file sementara di direktori tujuan lalu os.replace ke `path`.
+
+    File sementara berada di direktori yang sama (rename atomik dalam satu
+    filesystem) dan diberi prefix titik, sehingga pembaca tidak pernah melihat
+    file yang setengah tertulis.
+    """
+    directory = os.path.dirname(path) or "."
+    _, ext = os.path.splitext(path)
+
+    fd, temp_path = tempfile.mkstemp(prefix=".", suffix=ext, dir=directory)
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path
+
+
+def write_bytes_atomic(data: bytes, path: str) -> str:
+    return _write_atomic(path, lambda f: f.write(data))
+
+
+def write_stream_atomic(source: BinaryIO, path: str, chunk_bytes: int = 1024 * 1024) -> str:
+    """Menyalin file object per chunk (tanpa membaca utuh ke memori)."""
+    return _write_atomic(path, lambda f: shutil.copyfileobj(source, f, chunk_bytes))
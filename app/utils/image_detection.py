@@ -3,14 +3,7 @@ from PIL import Image
 import numpy as np
 import cv2
 from skimage.metrics import structural_similarity as ssim
-
-def compute_all_hashes(pil_image):
-    return {
-        "ahash": str(imagehash.average_hash(pil_image)),
-        "phash": str(imagehash.phash(pil_image)),
-        "dhash": str(imagehash.dhash(pil_image)),
-        "whash": str(imagehash.whash(pil_image)),
-    }
+from app.utils.image_hashing import compute_all_hashes
 
 def is_similar_by_hash(uploaded_hashes, artwork):
     threshold = 2
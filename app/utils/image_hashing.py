@@ -0,0 +1,142 @@
+"""Perceptual hash (ahash/phash/dhash/whash) dalam satu kali jalan.
+
+Hasilnya bit-identik dengan imagehash.average_hash/phash/dhash/whash (hash_size
+8) yang dipakai untuk mengisi kolom hash di database, tetapi:
+
+- konversi grayscale hanya dilakukan sekali untuk keempat hash;
+- whash tidak menjalankan tiga transformasi wavelet pada gambar besar. Dengan
+  Haar, membuang LL level maksimum sama dengan mengurangi rata-rata global, dan
+  LL level k adalah jumlah blok 2^k x 2^k. Keduanya dihitung eksak dengan
+  integer; pywt hanya dipakai jika dua nilai tengah kembar (median ambigu).
+
+Setiap resize tetap dilakukan dari gambar grayscale penuh, karena resize
+bertingkat (piramida) menghasilkan piksel yang berbeda dari imagehash.
+
+compute_canonical_hashes menghasilkan hash yang sama untuk kedelapan orientasi
+(rotasi 90/180/270 dan cermin, grup D4) sebuah gambar. Gambar diperkecil sekali
+ke thumbnail persegi, lalu dipilih orientasi yang momen intensitasnya
+(mx, my) memenuhi mx >= my >= 0 sebelum keempat hash dihitung. Hash ini tidak
+kompatibel dengan imagehash dan hanya dibandingkan dengan sesamanya.
+"""
+import numpy as np
+import scipy.fftpack
+from PIL import Image
+
+HASH_SIZE = 8
+_PHASH_SIZE = HASH_SIZE * 4
+_RESAMPLE = Image.Resampling.LANCZOS
+CANONICAL_SIZE = 128
+
+
+def _to_hex(bits: np.ndarray) -> str:
+    # Sama dengan str(ImageHash): bit row-major, MSB lebih dulu
+    return np.packbits(bits.ravel()).tobytes().hex()
+
+
+def _average_hash(gray: Image.Image) -> np.ndarray:
+    pixels = np.asarray(gray.resize((HASH_SIZE, HASH_SIZE), _RESAMPLE))
+    return pixels > np.mean(pixels)
+
+
+def _phash(gray: Image.Image) -> np.ndarray:
+    pixels = np.asarray(gray.resize((_PHASH_SIZE, _PHASH_SIZE), _RESAMPLE))
+    dct = scipy.fftpack.dct(scipy.fftpack.dct(pixels, axis=0), axis=1)
+    low = dct[:HASH_SIZE, :HASH_SIZE]
+    return low > np.median(low)
+
+
+def phash_value(gray: Image.Image) -> int:
+    """phash satu gambar grayscale sebagai integer 64-bit."""
+    return int(_to_hex(_phash(gray)), 16)
+
+
+def _dhash(gray: Image.Image) -> np.ndarray:
+    pixels = np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), _RESAMPLE))
+    return pixels[:, 1:] > pixels[:, :-1]
+
+
+def whash_scale(size: tuple[int, int]) -> int:
+    """Sisi gambar kerja whash, sama dengan image_scale default imagehash."""
+    return max(2 ** int(np.log2(min(size))), HASH_SIZE)
+
+
+def _whash_pywt(pixels: np.ndarray, scale: int) -> np.ndarray:
+    """Jalur asli imagehash.whash (mode haar, remove_max_haar_ll)."""
+    import pywt
+
+    ll_max_level = int(np.log2(scale))
+    dwt_level = ll_max_level - int(np.log2(HASH_SIZE))
+    pixels = pixels / 255.
+    coeffs = list(pywt.wavedec2(pixels, "haar", level=ll_max_level))
+    coeffs[0] *= 0
+    pixels = pywt.waverec2(coeffs, "haar")
+    low = pywt.wavedec2(pixels, "haar", level=dwt_level)[0]
+    return low > np.median(low)
+
+
+def _whash(gray: Image.Image) -> np.ndarray:
+    scale = whash_scale(gray.size)
+    pixels = np.asarray(gray.resize((scale, scale), _RESAMPLE))
+    block = scale // HASH_SIZE
+
+    # LL(k) setelah rata-rata global dibuang, dikali konstanta positif:
+    # jumlah_blok * N - total * luas_blok (eksak, tanpa pembulatan float)
+    sums = pixels.reshape(HASH_SIZE, block, HASH_SIZE, block).sum(axis=(1, 3), dtype=np.int64)
+    centered = sums * (scale * scale) - int(pixels.sum(dtype=np.int64)) * (block * block)
+
+    ordered = np.sort(centered, axis=None)
+    lower, upper = ordered[ordered.size // 2 - 1], ordered[ordered.size // 2]
+    if lower == upper:
+        # Nilai kembar di median: urutannya di imagehash ditentukan galat float pywt
+        return _whash_pywt(pixels, scale)
+    return 2 * centered > lower + upper
+
+
+def compute_all_hashes(pil_image: Image.Image) -> dict:
+    gray = pil_image.convert("L")
+    return {
+        "ahash": _to_hex(_average_hash(gray)),
+        "phash": _to_hex(_phash(gray)),
+        "dhash": _to_hex(_dhash(gray)),
+        "whash": _to_hex(_whash(gray)),
+    }
+
+
+def d4_variants(pixels: np.ndarray) -> list[np.ndarray]:
+    """Kedelapan orientasi (rotasi 0/90/180/270, dengan dan tanpa cermin)."""
+    return [np.rot90(flipped, k) for flipped in (pixels, pixels[:, ::-1]) for k in range(4)]
+
+
+def canonical_orientation(pixels: np.ndarray) -> np.ndarray:
+    """Orientasi D4 dengan pusat massa intensitas di kanan atas diagonal.
+
+    Momen (mx, my) dihitung relatif terhadap pusat dan rata-rata gambar; setiap
+    orientasi hanya menukar dan/atau membalik tanda keduanya, sehingga orientasi
+    dengan (mx, my) terbesar secara leksikografis unik untuk gambar yang tidak
+    simetris.
+    """
+    centered = pixels.astype(np.float64) - pixels.mean()
+    coords = np.arange(pixels.shape[0], dtype=np.float64) - (pixels.shape[0] - 1) / 2
+    mx = float(centered.sum(axis=0) @ coords)
+    my = float(centered.sum(axis=1) @ coords)
+    # Setiap orientasi hanya memetakan (mx, my) ke (+-mx, +-my) atau (+-my, +-mx)
+    # pada urutan yang sama dengan d4_variants
+    moments = []
+    for x, y in ((mx, my), (-mx, my)):
+        for _ in range(4):
+            moments.append((x, y))
+            x, y = y, -x  # np.rot90: berlawanan arah jarum jam
+    best = max(range(len(moments)), key=lambda i: (moments[i], -i))
+    return d4_variants(pixels)[best]
+
+
+def compute_canonical_hashes(pil_image: Image.Image) -> dict:
+    """Hash yang tidak berubah terhadap rotasi 90 derajat dan cermin."""
+    thumb = np.asarray(pil_image.convert("L").resize((CANONICAL_SIZE, CANONICAL_SIZE), _RESAMPLE))
+    gray = Image.fromarray(np.ascontiguousarray(canonical_orientation(thumb)))
+    return {
+        "ahash": _to_hex(_average_hash(gray)),
+        "phash": _to_hex(_phash(gray)),
+        "dhash": _to_hex(_dhash(gray)),
+        "whash": _to_hex(_whash(gray)),
+    }
@@ -1,100 +1,127 @@
-import os
 import imagehash
 from PIL import Image
 import numpy as np
 import cv2
 from skimage.metrics import structural_similarity as ssim
 import logging
-import torch
-import torchvision.transforms as transforms
-from torchvision.models import resnet18, ResNet18_Weights
-from imagehash import average_hash, phash, dhash, whash
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from app.services.feature_store import (
+    VisualFeatures,
+    get_feature_store,
+    query_features,
+)
+from app.services.embedding_index import get_embedding_index, normalize
+from app.services.hash_index import hamming_distance
+from app.storage import key_from_url
+from app.utils.image_hashing import compute_all_hashes
 
-model = resnet18(weights=None)
+# Model ResNet18 dimuat saat pertama dipakai (atau lewat warm_up_models),
+# bukan saat import, agar cold start hanya membayar import FastAPI
+_restnet_model = None
+_transforms = None
+_model_lock = threading.Lock()
 
-_restnet_model = resnet18(weights=ResNet18_Weights.DEFAULT)
-_restnet_model.eval()
+# Thread pool bersama untuk rerank SSIM/ORB; keduanya menghabiskan waktu di
+# kode native (skimage/numpy, OpenCV) yang melepas GIL
+_rerank_executor = None
+_rerank_lock = threading.Lock()
 
+logger = logging.getLogger(__name__)
 
-_transforms = transforms.Compose([
-    transforms.Resize((224, 224)),
-    transforms.ToTensor(),
-    transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-])
+def neural_similarity_enabled() -> bool:
+    from app.core.config import settings
+    return settings.NEURAL_SIMILARITY_ENABLED
 
-logger = logging.getLogger(__name__)
 
-def compute_all_hashes(pil_image: Image.Image) -> dict:
-    return {
-        "ahash": str(average_hash(pil_image)),
-        "phash": str(phash(pil_image)),
-        "dhash": str(dhash(pil_image)),
-        "whash": str(whash(pil_image))
-    }
+def models_loaded() -> bool:
+    return _restnet_model is not None
 
-def hamming_dist(h1, h2):
-    return sum(c1 != c2 for c1, c2 in zip(h1, h2))
 
+def get_embedding_model():
+    """(model, transforms) ResNet18; torch/torchvision diimport di sini."""
+    global _restnet_model, _transforms
+    if _restnet_model is None:
+        with _model_lock:
+            if _restnet_model is None:
+                import torch
+                import torchvision.transforms as transforms
+                from torchvision.models import resnet18, ResNet18_Weights
 
-def is_similar_by_hash(hash1: str, hash2: str, threshold: int = 5) -> bool:
-    return sum(c1 != c2 for c1, c2 in zip(hash1, hash2)) <= threshold
+                model = resnet18(weights=ResNet18_Weights.DEFAULT)
+                model.fc = torch.nn.Identity()  # keluaran avgpool 512-d sebagai embedding
+                model.eval()
+                _transforms = transforms.Compose([
+                    transforms.Resize((224, 224)),
+                    transforms.ToTensor(),
+                    transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+                ])
+                _restnet_model = model
+                logger.info("Model ResNet18 dimuat.")
+    return _restnet_model, _transforms
 
-    for key in thresholds.keys():
-        db_hash = getattr(artwork_db, f"hash_{key}" if key != "ahash" else "hash")
-        if db_hash:
-            dist = hamming_dist(uploaded_hashes[key], db_hash)
-            if dist <= thresholds[key]:
-                return True
-    return False
 
-def is_similar_by_ssim(pil_image: Image.Image, image_path: str, threshold: float = 0.92) -> bool:
-    try:
-        img1 = np.array(pil_image.resize((256, 256)).convert("L"))
-        img2 = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        img2 = cv2.resize(img2, (256, 256))
-        from skimage.metrics import structural_similarity as ssim
-        score, _ = ssim(img1, img2, full=True)
-        return score > threshold
-    except:
-        return False
+def warm_up_models() -> None:
+    if neural_similarity_enabled():
+        get_embedding_model()
 
-def is_similar_by_orb(pil_image: Image.Image, image_path: str, threshold: float = 0.3) -> bool:
-    try:
-        orb = cv2.ORB_create()
-        img1 = cv2.cvtColor(np.array(pil_image.resize((256, 256))), cv2.COLOR_RGB2GRAY)
-        img2 = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        img2 = cv2.resize(img2, (256, 256))
 
-        kp1, des1 = orb.detectAndCompute(img1, None)
-        kp2, des2 = orb.detectAndCompute(img2, None)
+def compute_embedding(pil_image: Image.Image) -> np.ndarray | None:
+    """Embedding ResNet18 512-d ter-normalisasi L2 (float32).
 
-        if des1 is None or des2 is None or len(kp1) == 0 or len(kp2) == 0:
-            return False
+    None jika jalur neural dinonaktifkan (NEURAL_SIMILARITY_ENABLED=false).
+    """
+    if not neural_similarity_enabled():
+        return None
+    import torch
 
-        bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
-        matches = bf.match(des1, des2)
-        matches = sorted(matches, key=lambda x: x.distance)
+    model, transform = get_embedding_model()
+    tensor = transform(pil_image.convert("RGB")).unsqueeze(0)
+    with torch.no_grad():
+        embedding = model(tensor)[0].numpy()
+    return normalize(embedding)
 
-        good_matches = [m for m in matches if m.distance < 60]
-        similarity = len(good_matches) / max(len(kp1), len(kp2))
 
-        return similarity > threshold
-    except Exception as e:
-        logger.warning(f"ORB error: {e}")
-        return False
+def embedding_threshold() -> float:
+    from app.core.config import settings
+    return settings.EMBEDDING_THRESHOLD
 
 
+def hamming_dist(h1, h2):
+    # Jarak dalam bit, bukan jumlah karakter hex yang berbeda
+    return hamming_distance(h1, h2)
+
+
+SSIM_THRESHOLD = 0.92
+ORB_THRESHOLD = 0.3
+ORB_MAX_DISTANCE = 60
+
+
+def ssim_score(thumb1: np.ndarray, thumb2: np.ndarray) -> float:
+    score, _ = ssim(thumb1, thumb2, full=True)
+    return score
+
+
+def orb_similarity(des1, des2) -> float:
+    # Satu deskriptor per keypoint, jadi len(des) == len(kp)
+    if des1 is None or des2 is None or len(des1) == 0 or len(des2) == 0:
+        return 0.0
     bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
     matches = bf.match(des1, des2)
-    matches = sorted(matches, key=lambda x: x.distance)
+    good_matches = [m for m in matches if m.distance < ORB_MAX_DISTANCE]
+    return len(good_matches) / max(len(des1), len(des2))
 
-    good_matches = [m for m in matches if m.distance < 60]
-    similarity = len(good_matches) / max(len(kp1), len(kp2))
 
-    return similarity > threshold
+# Ambang dalam bit (hash 64 bit). Sengaja lebih ketat dari aturan lama (2 karakter
+# hex, bisa sampai 8 bit): index band (hash_index.HASH_BANDS) hanya menjamin
+# kandidat untuk jarak <= HASH_BANDS - 1 bit
+HASH_THRESHOLDS = {"ahash": 2, "phash": 2, "dhash": 2, "whash": 2}
+MIN_SIMILAR_HASHES = 2
 
-def is_similar_image(uploaded_hashes: dict, pil_image: Image.Image, artwork_db) -> bool:
-    thresholds = {"ahash": 2, "phash": 2, "dhash": 2, "whash": 2}
+
+def is_similar_by_hashes(uploaded_hashes: dict, artwork_db) -> bool:
+    thresholds = HASH_THRESHOLDS
     similar_hash_count = 0
 
     for key, threshold in thresholds.items():
@@ -104,18 +131,147 @@ def is_similar_image(uploaded_hashes: dict, pil_image: Image.Image, artwork_db)
             if dist <= threshold:
                 similar_hash_count += 1
 
-    if similar_hash_count >= 2:
+    if similar_hash_count >= MIN_SIMILAR_HASHES:
         logger.info(f"Deteksi duplikat via HASH: {artwork_db.title}")
         return True
+    return False
+
+
+def is_similar_visually(query: Image.Image | VisualFeatures, artwork_db) -> bool:
+    """Deteksi visual (SSIM atau ORB) terhadap fitur tersimpan artwork_db.
+
+    `query` sebaiknya hasil query_features() agar fitur gambar yang diunggah
+    dihitung sekali untuk semua kandidat. Gambar katalog hanya dibaca jika
+    artwork belum punya file fitur (sekali, lalu disimpan).
+    """
+    if isinstance(query, Image.Image):
+        query = query_features(query)
+
+    # Gambar katalog dibaca lewat storage (lokal maupun S3), bukan dari disk node ini
+    stored = get_feature_store().get(artwork_db.id, image_key=key_from_url(artwork_db.image_url))
+    if stored is None:
+        return False
 
-    # Deteksi visual (SSIM atau ORB)
-    db_img_path = os.path.join("static", artwork_db.image_url.lstrip("/static/"))
-    if os.path.exists(db_img_path):
-        if is_similar_by_ssim(pil_image, db_img_path):
+    try:
+        if ssim_score(query.thumb, stored.thumb) > SSIM_THRESHOLD:
             logger.info(f"Deteksi duplikat via SSIM: {artwork_db.title}")
             return True
-        if is_similar_by_orb(pil_image, db_img_path):
+    except Exception as e:
+        logger.warning(f"SSIM error: {e}")
+    try:
+        if orb_similarity(query.descriptors, stored.descriptors) > ORB_THRESHOLD:
             logger.info(f"Deteksi duplikat via ORB: {artwork_db.title}")
             return True
+    except Exception as e:
+        logger.warning(f"ORB error: {e}")
+
+    return False
+
 
+def is_similar_by_embedding(embedding: np.ndarray, artwork_db) -> bool | None:
+    """Cosine similarity terhadap embedding tersimpan; None jika belum ter-index."""
+    score = get_embedding_index().similarity(artwork_db.id, embedding)
+    if score is None:
+        return None
+    if score >= embedding_threshold():
+        logger.info(f"Deteksi duplikat via embedding ({score:.3f}): {artwork_db.title}")
+        return True
     return False
+
+
+def _get_rerank_executor() -> ThreadPoolExecutor:
+    global _rerank_executor
+    if _rerank_executor is None:
+        with _rerank_lock:
+            if _rerank_executor is None:
+                from app.core.config import settings
+                _rerank_executor = ThreadPoolExecutor(
+                    max_workers=settings.SIMILARITY_RERANK_THREADS, thread_name_prefix="rerank"
+                )
+    return _rerank_executor
+
+
+def find_first_similar(
+    query: Image.Image | VisualFeatures,
+    candidates: list,
+    max_concurrency: int | None = None,
+    deadline: float | None = None,
+) -> tuple[object | None, int]:
+    """Kandidat pertama yang mirip secara visual, dinilai paralel di thread pool.
+
+    Paling banyak `max_concurrency` kandidat dari satu request berjalan
+    bersamaan (default SIMILARITY_RERANK_CONCURRENCY). Begitu satu kandidat
+    melewati threshold, atau `deadline` (time.perf_counter) terlewati, kandidat
+    yang belum mulai dibatalkan. Mengembalikan (kandidat atau None, jumlah
+    kandidat yang selesai dinilai).
+    """
+    if isinstance(query, Image.Image):
+        query = query_features(query)
+    if max_concurrency is None:
+        from app.core.config import settings
+        max_concurrency = settings.SIMILARITY_RERANK_CONCURRENCY
+    max_concurrency = max(1, max_concurrency)
+
+    executor = _get_rerank_executor()
+    stop = threading.Event()
+    remaining = iter(candidates)
+    in_flight = {}
+
+    def expired() -> bool:
+        return deadline is not None and time.perf_counter() > deadline
+
+    def score(candidate) -> bool | None:
+        # Task yang sudah antre tapi belum mulai saat stop di-set tidak dikerjakan
+        if stop.is_set() or expired():
+            return None
+        return is_similar_visually(query, candidate)
+
+    def submit_next() -> bool:
+        if stop.is_set() or expired():
+            return False
+        candidate = next(remaining, None)
+        if candidate is None:
+            return False
+        in_flight[executor.submit(score, candidate)] = candidate
+        return True
+
+    match, checked = None, 0
+    while len(in_flight) < max_concurrency and submit_next():
+        pass
+    while in_flight and match is None:
+        timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            candidate = in_flight.pop(future)
+            try:
+                similar = future.result()
+            except Exception as e:
+                logger.warning(f"Rerank {getattr(candidate, 'id', '?')} gagal: {e}")
+                continue
+            if similar is None:
+                continue
+            checked += 1
+            if similar and match is None:
+                match = candidate
+        if match is None:
+            while len(in_flight) < max_concurrency and submit_next():
+                pass
+
+    stop.set()
+    for future in in_flight:
+        future.cancel()
+    return match, checked
+
+
+def is_similar_image(uploaded_hashes: dict, embedding: np.ndarray | None, query: VisualFeatures, artwork_db) -> bool:
+    """Cek kemiripan terhadap artwork_db dari input yang sudah dihitung (hash, embedding, query_features)."""
+    if is_similar_by_hashes(uploaded_hashes, artwork_db):
+        return True
+    if embedding is not None:
+        similar = is_similar_by_embedding(embedding, artwork_db)
+        if similar is not None:
+            return similar
+    # Artwork lama tanpa embedding (atau jalur neural nonaktif): kembali ke SSIM/ORB
+    return is_similar_visually(query, artwork_db)
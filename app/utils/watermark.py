@@ -1,26 +1,14 @@
 # app/utils/watermark.py
 
-from PIL import Image, ImageDraw, ImageFont
-import os
+from app.services.watermark import draw_text_sprites, text_sprite
 
-def add_physical_watermark(image_obj, text, font_path="arial.ttf", font_size=30):
-    watermarked_image = image_obj.copy().convert("RGBA")
-    width, height = watermarked_image.size
-    draw = ImageDraw.Draw(watermarked_image)
-
-    try:
-        if os.path.exists(font_path):
-            font = ImageFont.truetype(font_path, font_size)
-        else:
-            font = ImageFont.load_default()
-    except IOError:
-        font = ImageFont.load_default()
+TEXT_COLOR = (255, 255, 255, 128)
 
-    text_color = (255, 255, 255, 128)
-
-    text_bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = text_bbox[2] - text_bbox[0]
-    text_height = text_bbox[3] - text_bbox[1]
+def add_physical_watermark(image_obj, text, font_path="arial.ttf", font_size=30):
+    # Sprite teks di-cache dan di-blend oleh engine yang sama dengan app.services.watermark
+    sprite = text_sprite(text, font_path, font_size, TEXT_COLOR)
+    width, height = image_obj.size
+    text_width, text_height = sprite.text_size
 
     positions = [
         (10, 10),                                           # Pojok kiri atas
@@ -29,7 +17,4 @@ def add_physical_watermark(image_obj, text, font_path="arial.ttf", font_size=30)
         (width - text_width - 10, height - text_height - 10) # Pojok kanan bawah
     ]
 
-    for position in positions:
-        draw.text(position, text, font=font, fill=text_color)
-    
-    return watermarked_image.convert("RGB")
\ No newline at end of file
+    return draw_text_sprites(image_obj, [(sprite, position) for position in positions])
\ No newline at end of file
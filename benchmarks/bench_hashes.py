@@ -0,0 +1,58 @@
+"""Micro-benchmark compute_all_hashes: imagehash (4 panggilan) vs hasher gabungan.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_hashes [--repeat 5]
+"""
+import argparse
+import time
+
+import imagehash
+import numpy as np
+from PIL import Image, ImageFilter
+
+from app.utils.image_hashing import compute_all_hashes
+
+SIZES = [(1280, 720), (1920, 1080), (4000, 3000), (6000, 4000)]
+
+
+def imagehash_all(pil_image: Image.Image) -> dict:
+    return {
+        "ahash": str(imagehash.average_hash(pil_image)),
+        "phash": str(imagehash.phash(pil_image)),
+        "dhash": str(imagehash.dhash(pil_image)),
+        "whash": str(imagehash.whash(pil_image)),
+    }
+
+
+def make_image(size: tuple[int, int], seed: int = 0) -> Image.Image:
+    width, height = size
+    rng = np.random.default_rng(seed)
+    small = Image.fromarray(rng.integers(0, 256, (height // 16, width // 16, 3), dtype=np.uint8))
+    return small.resize(size, Image.Resampling.BICUBIC).filter(ImageFilter.GaussianBlur(2))
+
+
+def best_of(fn, image: Image.Image, repeat: int) -> tuple[float, dict]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(image)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'ukuran':>12} {'imagehash ms':>13} {'gabungan ms':>12} {'speedup':>8}  identik")
+    for size in SIZES:
+        image = make_image(size)
+        baseline, expected = best_of(imagehash_all, image, args.repeat)
+        fused, actual = best_of(compute_all_hashes, image, args.repeat)
+        label = f"{size[0]}x{size[1]}"
+        print(f"{label:>12} {baseline * 1000:13.1f} {fused * 1000:12.1f} {baseline / fused:7.2f}x  {actual == expected}")
+
+
+if __name__ == "__main__":
+    main()
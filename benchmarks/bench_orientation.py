@@ -0,0 +1,114 @@
+"""Benchmark deteksi salinan yang diputar/dicermin: probe index per query.
+
+Katalog berisi gambar acak + beberapa gambar "asli". Setiap query adalah salah
+satu dari delapan orientasi D4 gambar asli (disimpan ulang sebagai JPEG).
+Dibandingkan:
+
+- biasa      : satu probe ke index hash biasa;
+- brute force: hash setiap orientasi query sampai ketemu, hingga delapan probe;
+- kanonik    : probe index biasa + satu probe index hash kanonik.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_orientation [--catalog 20000] [--originals 8]
+"""
+import argparse
+import io
+import tempfile
+import time
+import uuid
+
+import numpy as np
+from PIL import Image
+
+from app.services.hash_index import HASH_KINDS, HashIndex
+from app.utils.image_hashing import compute_all_hashes, compute_canonical_hashes
+from app.utils.image_similarity import HASH_THRESHOLDS, MIN_SIMILAR_HASHES
+from benchmarks.bench_hashes import make_image
+
+D4 = [
+    None,
+    Image.Transpose.ROTATE_90,
+    Image.Transpose.ROTATE_180,
+    Image.Transpose.ROTATE_270,
+    Image.Transpose.FLIP_LEFT_RIGHT,
+    Image.Transpose.FLIP_TOP_BOTTOM,
+    Image.Transpose.TRANSPOSE,
+    Image.Transpose.TRANSVERSE,
+]
+MAX_DISTANCE = max(HASH_THRESHOLDS.values())
+
+
+def transform(image: Image.Image, op) -> Image.Image:
+    image = image if op is None else image.transpose(op)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return Image.open(buffer).convert("RGB")
+
+
+def random_hashes(rng: np.random.Generator) -> dict:
+    return {kind: format(int(rng.integers(0, 2 ** 63)) << 1, "016x") for kind in HASH_KINDS}
+
+
+def probe(index: HashIndex, hashes: dict) -> bool:
+    return bool(index.search(hashes, max_distance=MAX_DISTANCE, min_matches=MIN_SIMILAR_HASHES))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--catalog", type=int, default=20000, help="jumlah artwork acak di index")
+    parser.add_argument("--originals", type=int, default=8, help="jumlah gambar asli")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    originals = [make_image((960, 640), seed=seed) for seed in range(args.originals)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = HashIndex(f"{tmp}/hash_index")
+        canonical = HashIndex(f"{tmp}/hash_index_canonical")
+        fillers = [(uuid.uuid4(), random_hashes(rng)) for _ in range(args.catalog)]
+        index.rebuild(fillers + [(uuid.uuid4(), compute_all_hashes(image)) for image in originals])
+        canonical.rebuild(
+            [(artwork_id, random_hashes(rng)) for artwork_id, _ in fillers]
+            + [(uuid.uuid4(), compute_canonical_hashes(image)) for image in originals]
+        )
+
+        catalog_size = len(index)
+        queries = [transform(image, op) for image in originals for op in D4]
+        stats = {name: {"found": 0, "probes": 0, "seconds": 0.0} for name in ("biasa", "brute force", "kanonik")}
+
+        def record(name: str, found: bool, probes: int, started: float) -> None:
+            stats[name]["found"] += found
+            stats[name]["probes"] += probes
+            stats[name]["seconds"] += time.perf_counter() - started
+
+        for query in queries:
+            started = time.perf_counter()
+            record("biasa", probe(index, compute_all_hashes(query)), 1, started)
+
+            started = time.perf_counter()
+            probes, found = 0, False
+            for op in D4:
+                probes += 1
+                found = probe(index, compute_all_hashes(query if op is None else query.transpose(op)))
+                if found:
+                    break
+            record("brute force", found, probes, started)
+
+            started = time.perf_counter()
+            probes, found = 1, probe(index, compute_all_hashes(query))
+            if not found:
+                probes += 1
+                found = probe(canonical, compute_canonical_hashes(query))
+            record("kanonik", found, probes, started)
+
+    print(f"katalog {catalog_size} artwork, {len(queries)} query (8 orientasi x {args.originals} gambar)")
+    print(f"{'strategi':>12} {'terdeteksi':>11} {'probe/query':>12} {'ms/query':>9}")
+    for name, stat in stats.items():
+        print(
+            f"{name:>12} {stat['found']:>5}/{len(queries):<5} {stat['probes'] / len(queries):12.2f} "
+            f"{stat['seconds'] * 1000 / len(queries):9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings wajib diisi saat app.db.database diimpor; tes ini memakai SQLite sendiri
+for name, value in {
+    "DATABASE_URL": "sqlite://", "SECRET_KEY": "test", "MAIL_USERNAME": "test", "MAIL_PASSWORD": "test",
+    "MAIL_FROM": "test@example.com", "MAIL_PORT": "25", "MAIL_SERVER": "localhost",
+}.items():
+    os.environ.setdefault(name, value)
+
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.artwork_crud import get_artwork_by_digest, get_artwork_with_owner_by_copyright_hash
+from app.models import artwork, like, purchase, receipt, user  # noqa: F401
+from app.services.blob_store import blob_key, encode_image, put_blob
+from app.storage import LocalStorage
+
+
+class TestBlobStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = LocalStorage(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_is_sharded_by_digest(self):
+        digest = hashlib.sha256(b"x").hexdigest()
+        self.assertEqual(blob_key("watermarked", digest, ".PNG"), f"watermarked/{digest[:2]}/{digest[2:4]}/{digest}.png")
+
+    def test_same_content_is_written_once(self):
+        data, digest = encode_image(Image.new("RGB", (8, 8), (1, 2, 3)), "png")
+        self.assertEqual(digest, hashlib.sha256(data).hexdigest())
+        key, created = asyncio.run(put_blob(self.storage, "watermarked", data, digest, "png"))
+        self.assertTrue(created)
+        with Image.open(self.storage.path(key)) as image:
+            self.assertEqual(image.format, "PNG")
+        self.assertEqual(asyncio.run(put_blob(self.storage, "watermarked", data, digest, "png")), (key, False))
+
+
+class TestArtworkDigest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        engine = create_engine(f"sqlite:///{os.path.join(self.tmp.name, 'artworks.db')}")
+        user.User.__table__.create(engine)
+        artwork.Artwork.__table__.create(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.owner = user.User(id=uuid.uuid4(), username="ani", name="Ani", email="ani@example.com", password_hash="x")
+        self.db.add(self.owner)
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def add(self, key, content_sha256, image_sha256):
+        self.db.add(artwork.Artwork(
+            id=uuid.uuid4(), owner_id=self.owner.id, title=key, image_url=f"/{key}.png", unique_key=key,
+            content_sha256=content_sha256, image_sha256=image_sha256, hash="0" * 16,
+        ))
+        self.db.commit()
+
+    def test_lookup_matches_upload_or_published_file(self):
+        self.add("a", "c" * 64, "i" * 64)
+        self.assertEqual(get_artwork_by_digest(self.db, "c" * 64).unique_key, "a")
+        self.assertEqual(get_artwork_by_digest(self.db, "i" * 64).unique_key, "a")
+        self.assertIsNone(get_artwork_by_digest(self.db, "0" * 64))
+
+    def test_digest_is_unique(self):
+        self.add("a", "c" * 64, "i" * 64)
+        with self.assertRaises(IntegrityError):
+            self.add("b", "c" * 64, "j" * 64)
+
+    def test_copyright_hash_lookup_joins_owner(self):
+        self.add("a", "c" * 64, "i" * 64)
+        found_artwork, owner = get_artwork_with_owner_by_copyright_hash(self.db, hashlib.sha256(b"a").hexdigest())
+        self.assertEqual((found_artwork.unique_key, owner.username), ("a", "ani"))
+        self.assertIsNone(get_artwork_with_owner_by_copyright_hash(self.db, "0" * 64))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.jobs import cluster_duplicates
+from app.jobs.cluster_duplicates import Checkpoint, build_clusters, process_shard
+
+
+class TestClusterDuplicates(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        bits = rng.integers(0, 2 ** 63, size=(50, 4), dtype=np.int64).astype(np.uint64)
+        # Artwork 1 dan 2 salinan dekat artwork 0 (dua hash berjarak <= 2)
+        bits[1, :2] = bits[0, :2] ^ np.uint64(0b11)
+        bits[2, 1:3] = bits[0, 1:3] ^ np.uint64(0b1)
+        cluster_duplicates._data.clear()
+        cluster_duplicates._data.update(
+            bits=bits,
+            valid=np.ones_like(bits, dtype=bool),
+            params={"hash_thresholds": [2, 2, 2, 2], "min_similar_hashes": 2, "max_bucket": 100},
+        )
+        self.shards = [f"hash:{k}:{b}:{m}" for k in range(4) for b in range(4) for m in range(16)]
+
+    def edges(self):
+        return {edge for shard in self.shards for edge in map(tuple, process_shard(shard)["edges"])}
+
+    def test_lsh_buckets_find_all_close_pairs(self):
+        self.assertEqual({(a, b) for a, b, _ in self.edges()}, {(0, 1), (0, 2)})
+
+    def test_clusters_are_transitive(self):
+        self.assertEqual(build_clusters(50, self.edges()), [[0, 1, 2]])
+
+    def test_oversized_buckets_are_skipped(self):
+        cluster_duplicates._data["params"]["max_bucket"] = 1
+        results = [process_shard(shard) for shard in self.shards]
+        self.assertFalse(any(result["edges"] for result in results))
+        self.assertGreater(sum(result["skipped_buckets"] for result in results), 0)
+
+    def test_checkpoint_resumes_only_same_run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = Checkpoint(tmp, "run-a")
+            checkpoint.record({"shard": "hash:0:0:0", "edges": [(0, 1, "hash")], "skipped_buckets": 0})
+
+            resumed = Checkpoint(tmp, "run-a")
+            self.assertEqual(resumed.done, {"hash:0:0:0"})
+            self.assertEqual(resumed.edges, {(0, 1, "hash")})
+
+            restarted = Checkpoint(tmp, "run-b")
+            self.assertEqual(restarted.done, set())
+            self.assertEqual(restarted.edges, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
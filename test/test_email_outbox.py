@@ -0,0 +1,114 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from datetime import timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings wajib diisi saat app.db.database diimpor; tes ini memakai SQLite sendiri
+for name, value in {
+    "DATABASE_URL": "sqlite://", "SECRET_KEY": "test", "MAIL_USERNAME": "test", "MAIL_PASSWORD": "test",
+    "MAIL_FROM": "test@example.com", "MAIL_PORT": "25", "MAIL_SERVER": "localhost",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.email_outbox import EmailOutbox
+from app.services import email_outbox
+from app.services.email_outbox import claim_batch, enqueue_email, record_results, render_email, send_batch
+
+CONTEXT = {
+    "title": "Senja di Pantai", "category": "-", "description": "-", "unique_key": "abc123_Senja",
+    "buyer_code": "N/A", "image_url": "http://localhost:8000/static/watermarked/abc123_Senja.png",
+}
+
+
+class FakeConnection:
+    """Pengganti SmtpConnection: mencatat pesan, gagal untuk penerima tertentu."""
+
+    def __init__(self, refuse=(), down=False):
+        self.refuse = set(refuse)
+        self.down = down
+        self.sent = []
+
+    @property
+    def connected(self):
+        return not self.down
+
+    async def send(self, message):
+        if self.down:
+            raise ConnectionRefusedError("SMTP tidak bisa dihubungi")
+        if message["To"] in self.refuse:
+            raise ValueError("Penerima ditolak")
+        self.sent.append(message)
+
+
+class TestEmailOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        engine = create_engine(f"sqlite:///{os.path.join(self.tmp.name, 'outbox.db')}")
+        EmailOutbox.__table__.create(engine)
+        self.db = sessionmaker(bind=engine)()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def enqueue(self, *recipients):
+        emails = [enqueue_email(self.db, to, "certificate", CONTEXT) for to in recipients]
+        self.db.commit()
+        return emails
+
+    def deliver(self, connection, max_attempts=3):
+        results = asyncio.run(send_batch(connection, claim_batch(self.db, 10), "noreply@example.com"))
+        record_results(self.db, results, max_attempts, base_seconds=30, max_seconds=3600)
+
+    def test_render_uses_cached_template(self):
+        email, = self.enqueue("ani@example.com")
+        message = render_email(email, "noreply@example.com")
+        self.assertEqual(message["Subject"], "Sertifikat Kepemilikan Karya Digital")
+        self.assertIn("abc123_Senja", message.get_content())
+        render_email(email, "noreply@example.com")
+        self.assertEqual(email_outbox._template.cache_info().currsize, 1)
+
+    def test_claimed_batch_is_leased(self):
+        self.enqueue("a@example.com", "b@example.com")
+        self.assertEqual(len(claim_batch(self.db, 10)), 2)
+        self.assertEqual(claim_batch(self.db, 10), [])
+
+    def test_failed_send_is_retried_with_backoff_then_failed(self):
+        ok, refused = self.enqueue("a@example.com", "b@example.com")
+        connection = FakeConnection(refuse={"b@example.com"})
+        self.deliver(connection)
+        self.assertEqual([m["To"] for m in connection.sent], ["a@example.com"])
+        self.assertEqual((ok.status, refused.status, refused.attempts), ("sent", "pending", 1))
+        self.assertEqual(refused.last_error, "Penerima ditolak")
+
+        # Belum jatuh tempo: tidak diambil lagi
+        self.assertEqual(claim_batch(self.db, 10), [])
+        for attempt in (2, 3):
+            refused.next_attempt_at -= timedelta(hours=2)
+            self.db.commit()
+            self.deliver(connection)
+            self.assertEqual(refused.attempts, attempt)
+        self.assertEqual(refused.status, "failed")
+
+    def test_unreachable_server_reschedules_whole_batch(self):
+        emails = self.enqueue("a@example.com", "b@example.com", "c@example.com")
+        self.deliver(FakeConnection(down=True))
+        self.assertEqual({(e.status, e.attempts) for e in emails}, {("pending", 1)})
+        self.assertTrue(all(e.last_error == "SMTP tidak bisa dihubungi" for e in emails))
+
+    def test_backoff_is_exponential_and_capped(self):
+        delays = [email_outbox.retry_delay(n, 30, 3600) for n in range(1, 10)]
+        self.assertEqual(delays[:4], [30, 60, 120, 240])
+        self.assertEqual(delays[-1], 3600)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.embedding_index import EMBEDDING_DIM, EmbeddingIndex
+
+
+class TestEmbeddingIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = EmbeddingIndex(os.path.join(self.tmp.name, "embeddings"))
+        self.rng = np.random.default_rng(0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def vector(self):
+        return self.rng.standard_normal(EMBEDDING_DIM).astype(np.float32)
+
+    def test_search_returns_close_vectors_first(self):
+        target_id, other_id = uuid.uuid4(), uuid.uuid4()
+        target = self.vector()
+        self.index.add(uuid.uuid4(), self.vector())
+        self.index.add(target_id, target)
+        self.index.add(other_id, target + 0.3 * self.vector())
+
+        hits = self.index.search(target + 0.05 * self.vector(), threshold=0.9)
+        self.assertEqual([artwork_id for artwork_id, _ in hits], [target_id, other_id])
+        self.assertGreater(hits[0][1], 0.99)
+        self.assertEqual(self.index.search(self.vector(), threshold=0.9), [])
+
+    def test_similarity_and_membership(self):
+        artwork_id = uuid.uuid4()
+        vector = self.vector()
+        self.index.add(artwork_id, vector)
+
+        reader = EmbeddingIndex(self.index.path)
+        self.assertAlmostEqual(reader.similarity(artwork_id, vector), 1.0, places=3)
+        self.assertIsNone(reader.similarity(uuid.uuid4(), vector))
+        self.assertEqual(reader.contains([str(artwork_id), uuid.uuid4()]).tolist(), [True, False])
+
+    def test_deleted_artwork_is_not_returned(self):
+        artwork_id, other_id = uuid.uuid4(), uuid.uuid4()
+        vector = self.vector()
+        self.index.add(artwork_id, vector)
+        self.index.add(other_id, self.vector())
+        self.index.delete(artwork_id)
+
+        self.assertNotIn(artwork_id, [a for a, _ in self.index.search(vector, threshold=-1.0)])
+        self.assertIsNone(self.index.similarity(artwork_id, vector))
+        self.assertEqual(self.index.contains([artwork_id, other_id]).tolist(), [False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
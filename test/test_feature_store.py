@@ -0,0 +1,74 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.feature_store import (
+    FeatureStore,
+    decode_features,
+    encode_features,
+    features_from_image,
+)
+from app.storage import LocalStorage
+
+
+def make_image(seed: int = 0) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, (320, 480, 3), dtype=np.uint8)
+    return Image.fromarray(pixels, "RGB")
+
+
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = FeatureStore(os.path.join(self.tmp.name, "features"), cache_size=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_encode_decode_roundtrip(self):
+        features = features_from_image(make_image())
+        decoded = decode_features(encode_features(features))
+        np.testing.assert_array_equal(decoded.thumb, features.thumb)
+        np.testing.assert_array_equal(decoded.descriptors, features.descriptors)
+
+        with self.assertRaises(ValueError):
+            decode_features(encode_features(features)[:-1])
+
+    def test_missing_features_are_backfilled_once(self):
+        image_path = os.path.join(self.tmp.name, "artwork.png")
+        make_image(1).save(image_path)
+
+        self.assertIsNone(self.store.get("artwork-1"))
+        features = self.store.get("artwork-1", image_path)
+        self.assertEqual(features.thumb.shape, (256, 256))
+
+        # Setelah backfill, gambar katalog tidak dibutuhkan lagi
+        os.remove(image_path)
+        reader = FeatureStore(self.store.path)
+        np.testing.assert_array_equal(reader.get("artwork-1").thumb, features.thumb)
+
+        self.store.delete("artwork-1")
+        self.assertIsNone(FeatureStore(self.store.path).get("artwork-1"))
+
+    def test_missing_features_are_backfilled_from_storage(self):
+        storage = LocalStorage(os.path.join(self.tmp.name, "static"))
+        os.makedirs(os.path.dirname(storage.path("watermarked/a.png")))
+        make_image(2).save(storage.path("watermarked/a.png"))
+
+        with mock.patch("app.storage.get_storage", return_value=storage):
+            self.assertIsNone(self.store.get("artwork-2", image_key="watermarked/hilang.png"))
+            features = self.store.get("artwork-2", image_key="watermarked/a.png")
+        self.assertEqual(features.thumb.shape, (256, 256))
+        self.assertTrue(os.path.exists(self.store._file("artwork-2")))
+
+
+if __name__ == "__main__":
+    unittest.main()
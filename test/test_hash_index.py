@@ -0,0 +1,120 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.hash_index import (
+    HashIndex,
+    from_signed64,
+    hamming_distance,
+    hash_bands,
+    required_band_matches,
+    to_signed64,
+)
+
+
+def add_in_other_process(path: str, artwork_id: uuid.UUID, hashes: dict) -> None:
+    HashIndex(path).add(artwork_id, hashes)
+
+
+def flip_bits(hex_hash: str, bits: int) -> str:
+    return format(int(hex_hash, 16) ^ ((1 << bits) - 1), "016x")
+
+
+class TestHashIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = HashIndex(os.path.join(self.tmp.name, "hash_index"))
+        self.hashes = {
+            "ahash": "a7e57f88b1e04b26",
+            "phash": "f2da234d5f38d580",
+            "dhash": "55ddac3963488b4c",
+            "whash": "a1c5dfa819c269b5",
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hamming_distance_counts_bits(self):
+        self.assertEqual(hamming_distance("0f", "f0"), 8)
+        self.assertEqual(hamming_distance("01", "03"), 1)
+
+    def test_search_requires_two_close_hashes(self):
+        artwork_id = uuid.uuid4()
+        self.index.rebuild([(uuid.uuid4(), {k: "0" * 16 for k in self.hashes}), (artwork_id, self.hashes)])
+
+        near = dict(self.hashes, ahash=flip_bits(self.hashes["ahash"], 2), dhash=flip_bits(self.hashes["dhash"], 9))
+        self.assertEqual(self.index.search(near), [artwork_id])
+
+        far = dict(near, phash=flip_bits(self.hashes["phash"], 3), whash=flip_bits(self.hashes["whash"], 3))
+        self.assertEqual(self.index.search(far), [])
+
+    def test_add_is_visible_to_other_readers(self):
+        reader = HashIndex(self.index.path)
+        self.assertEqual(len(reader), 0)
+
+        artwork_id = uuid.uuid4()
+        self.index.add(artwork_id, dict(self.hashes, whash=None))
+        self.assertEqual(len(reader), 1)
+        self.assertEqual(reader.search(self.hashes), [artwork_id])
+        self.assertEqual(reader.search({"whash": self.hashes["whash"]}, min_matches=1), [])
+
+    def test_add_from_worker_process_is_visible(self):
+        # Seperti worker upload: proses lain append ke file yang sudah dipetakan pembaca
+        self.index.add(uuid.uuid4(), {k: "0" * 16 for k in self.hashes})
+        self.assertEqual(len(self.index), 1)
+
+        artwork_id = uuid.uuid4()
+        worker = multiprocessing.get_context("spawn").Process(
+            target=add_in_other_process, args=(self.index.path, artwork_id, self.hashes)
+        )
+        worker.start()
+        worker.join(60)
+        self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(self.index.search(self.hashes), [artwork_id])
+
+    def test_deleted_artwork_is_skipped_until_rebuild(self):
+        artwork_id = uuid.uuid4()
+        self.index.add(artwork_id, self.hashes)
+        reader = HashIndex(self.index.path)
+        self.index.delete(artwork_id)
+
+        self.assertEqual(reader.search(self.hashes), [])
+        _, valid = reader.distances(self.hashes)
+        self.assertFalse(valid.any())
+        self.assertEqual(reader.positions([artwork_id]).tolist(), [-1])
+
+        # Rebuild membuang tombstone lama; artwork yang ditambahkan lagi terlihat
+        self.index.rebuild([(artwork_id, self.hashes)])
+        self.assertEqual(reader.search(self.hashes), [artwork_id])
+
+
+class TestHashBands(unittest.TestCase):
+
+    def test_signed64_roundtrip(self):
+        for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+            signed = to_signed64(value)
+            self.assertTrue(-(1 << 63) <= signed < (1 << 63))
+            self.assertEqual(from_signed64(signed), value)
+
+    def test_close_hashes_share_enough_bands(self):
+        value = int("a7e57f88b1e04b26", 16)
+        needed = required_band_matches(2)
+        for first in range(64):
+            for second in range(first, 64):
+                other = value ^ (1 << first) ^ (1 << second)
+                same = sum(a == b for a, b in zip(hash_bands(value), hash_bands(other)))
+                self.assertGreaterEqual(same, needed)
+
+    def test_radius_must_fit_band_count(self):
+        with self.assertRaises(ValueError):
+            required_band_matches(4)
+
+
+if __name__ == "__main__":
+    unittest.main()
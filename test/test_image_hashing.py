@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+
+import imagehash
+import numpy as np
+from PIL import Image, ImageFilter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.image_hashing import CANONICAL_SIZE, compute_all_hashes, compute_canonical_hashes
+
+
+def imagehash_all(pil_image):
+    return {
+        "ahash": str(imagehash.average_hash(pil_image)),
+        "phash": str(imagehash.phash(pil_image)),
+        "dhash": str(imagehash.dhash(pil_image)),
+        "whash": str(imagehash.whash(pil_image)),
+    }
+
+
+class TestComputeAllHashes(unittest.TestCase):
+
+    def test_matches_imagehash(self):
+        rng = np.random.default_rng(0)
+        for width, height in [(640, 480), (333, 517), (6, 5)]:
+            noise = Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+            image = noise.filter(ImageFilter.GaussianBlur(3))
+            self.assertEqual(compute_all_hashes(image), imagehash_all(image))
+
+    def test_matches_imagehash_on_flat_regions(self):
+        # Blok kembar membuat median whash ambigu (jalur pywt)
+        pixels = np.zeros((256, 384, 3), dtype=np.uint8)
+        pixels[:128] = 255
+        for image in (Image.fromarray(pixels), Image.new("RGB", (300, 200), (90, 120, 30))):
+            self.assertEqual(compute_all_hashes(image), imagehash_all(image))
+
+    def test_real_image(self):
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "karya_sepeda.png")
+        image = Image.open(path).convert("RGB")
+        self.assertEqual(compute_all_hashes(image), imagehash_all(image))
+
+
+class TestCanonicalHashes(unittest.TestCase):
+
+    transposes = [None, *Image.Transpose]
+
+    def oriented(self, image):
+        return [image if op is None else image.transpose(op) for op in self.transposes]
+
+    def test_exact_for_canonical_size(self):
+        # Tanpa resize, setiap orientasi hanya permutasi piksel
+        rng = np.random.default_rng(1)
+        noise = Image.fromarray(rng.integers(0, 256, (CANONICAL_SIZE, CANONICAL_SIZE), dtype=np.uint8))
+        image = noise.filter(ImageFilter.GaussianBlur(4))
+        expected = compute_canonical_hashes(image)
+        for variant in self.oriented(image):
+            self.assertEqual(compute_canonical_hashes(variant), expected)
+
+    def test_real_image_orientations_stay_close(self):
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "karya_sepeda.png")
+        image = Image.open(path).convert("RGB")
+        expected = compute_canonical_hashes(image)
+        for variant in self.oriented(image):
+            hashes = compute_canonical_hashes(variant)
+            close = sum(bin(int(hashes[k], 16) ^ int(expected[k], 16)).count("1") <= 2 for k in hashes)
+            self.assertGreaterEqual(close, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import io
+import os
+import pickle
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings wajib diisi saat app.core.config diimpor
+for name, value in {
+    "DATABASE_URL": "sqlite://", "SECRET_KEY": "test", "MAIL_USERNAME": "test", "MAIL_PASSWORD": "test",
+    "MAIL_FROM": "test@example.com", "MAIL_PORT": "25", "MAIL_SERVER": "localhost",
+}.items():
+    os.environ.setdefault(name, value)
+
+from fastapi import UploadFile
+from PIL import Image
+
+from app.core.config import settings
+from app.services.ingest import ImageRejected, open_image, receive_image
+
+
+def png_bytes(size=(64, 48)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestReceiveImage(unittest.TestCase):
+
+    def setUp(self):
+        self.old = settings.MAX_UPLOAD_BYTES, settings.MAX_IMAGE_PIXELS, settings.UPLOAD_SPOOL_BYTES
+        settings.UPLOAD_SPOOL_BYTES = 16
+
+    def tearDown(self):
+        settings.MAX_UPLOAD_BYTES, settings.MAX_IMAGE_PIXELS, settings.UPLOAD_SPOOL_BYTES = self.old
+
+    def receive(self, content: bytes, size: int | None = None):
+        return asyncio.run(receive_image(UploadFile(io.BytesIO(content), size=size, filename="a.png")))
+
+    def rejected(self, content: bytes, size: int | None = None) -> ImageRejected:
+        with self.assertRaises(ImageRejected) as ctx:
+            self.receive(content, size)
+        return ctx.exception
+
+    def test_valid_image_is_spooled_with_header_info(self):
+        content = png_bytes()
+        received = self.receive(content)
+        try:
+            self.assertEqual((received.format, received.width, received.height), ("PNG", 64, 48))
+            self.assertEqual(received.size, len(content))
+            self.assertEqual(received.read(), content)
+            self.assertEqual(received.sha256, hashlib.sha256(content).hexdigest())
+        finally:
+            received.close()
+
+    def test_byte_cap_while_streaming_and_from_declared_size(self):
+        content = png_bytes()
+        settings.MAX_UPLOAD_BYTES = len(content) - 1
+        self.assertEqual(self.rejected(content).status_code, 413)
+        self.assertEqual(self.rejected(b"x", size=len(content)).status_code, 413)
+
+    def test_pixel_cap_is_checked_from_header(self):
+        settings.MAX_IMAGE_PIXELS = 1000
+        self.assertEqual(self.rejected(png_bytes((100, 100))).status_code, 413)
+        # Jauh di atas batas: PIL sendiri menolak sebagai decompression bomb
+        self.assertEqual(self.rejected(png_bytes((300, 300))).status_code, 413)
+
+    def test_non_image_and_empty_files(self):
+        self.assertEqual(self.rejected(b"bukan gambar sama sekali").status_code, 400)
+        self.assertEqual(self.rejected(b"").status_code, 400)
+
+    def test_rejection_survives_pickling(self):
+        settings.MAX_IMAGE_PIXELS = 1000
+        with self.assertRaises(ImageRejected) as ctx:
+            open_image(io.BytesIO(png_bytes((100, 100))))
+        restored = pickle.loads(pickle.dumps(ctx.exception))
+        self.assertEqual((restored.status_code, restored.detail), (413, ctx.exception.detail))
+
+
+if __name__ == "__main__":
+    unittest.main()
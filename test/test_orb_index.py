@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+from unittest import mock
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import orb_index
+from app.services.orb_index import OrbIndex
+
+
+class TestOrbIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "orb")
+        self.index = OrbIndex(self.path)
+        self.rng = np.random.default_rng(0)
+        self.artworks = {uuid.uuid4(): self.descriptors(300) for _ in range(20)}
+        for artwork_id, descriptors in self.artworks.items():
+            self.index.add(artwork_id, descriptors)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def descriptors(self, count):
+        return self.rng.integers(0, 256, (count, 32), dtype=np.uint8)
+
+    def noisy(self, descriptors, bits=8):
+        # Membalik beberapa bit acak per deskriptor (seperti keypoint yang sedikit bergeser)
+        result = np.unpackbits(descriptors, axis=1)
+        for row in result:
+            row[self.rng.choice(256, bits, replace=False)] ^= 1
+        return np.packbits(result, axis=1)
+
+    def test_votes_for_source_artwork(self):
+        target = list(self.artworks)[7]
+        query = np.vstack([self.noisy(self.artworks[target][:200]), self.descriptors(100)])
+        results = self.index.search(query, top_k=3)
+        artwork_id, score, votes = results[0]
+        self.assertEqual(artwork_id, target)
+        self.assertGreater(votes, 150)
+        self.assertAlmostEqual(score, votes / 300)
+
+    def test_unrelated_descriptors_score_low(self):
+        results = self.index.search(self.descriptors(300))
+        self.assertTrue(all(score < 0.05 for _, score, _ in results))
+
+    def test_tail_and_reopened_index(self):
+        self.index.warm_up()  # menyusun postings
+        late_id, late = uuid.uuid4(), self.descriptors(300)
+        self.index.add(late_id, late)
+        self.assertEqual(self.index.search(self.noisy(late))[0][0], late_id)
+
+        reopened = OrbIndex(self.path)
+        self.assertEqual(reopened.search(self.noisy(late))[0][0], late_id)
+
+    def test_add_leaves_merge_to_merge_tail(self):
+        self.index.warm_up()
+        self.assertEqual(self.index._stored_postings_rows(), 20 * 300)
+        late_id, late = uuid.uuid4(), self.descriptors(1000)
+        with mock.patch.object(orb_index, "_MAX_TAIL_ROWS", 100):
+            self.index.add(late_id, late)
+            self.assertEqual(self.index._stored_postings_rows(), 20 * 300)
+            self.assertTrue(self.index.merge_tail())
+            self.assertFalse(self.index.merge_tail())
+        self.assertEqual(self.index._stored_postings_rows(), 20 * 300 + 1000)
+        self.assertEqual(self.index.search(self.noisy(late))[0][0], late_id)
+
+    def test_search_without_postings_does_not_build_them(self):
+        target = list(self.artworks)[2]
+        self.assertEqual(self.index.search(self.artworks[target])[0][0], target)
+        self.assertFalse(os.path.exists(os.path.join(self.path, "postings.json")))
+
+    def test_delete_and_compact(self):
+        target = list(self.artworks)[3]
+        self.index.delete(target)
+        self.assertNotIn(target, [a for a, _, _ in self.index.search(self.artworks[target])])
+
+        self.assertEqual(self.index.compact(), 19 * 300)
+        self.assertNotIn(target, [a for a, _, _ in self.index.search(self.artworks[target])])
+        other = list(self.artworks)[4]
+        self.assertEqual(self.index.search(self.artworks[other])[0][0], other)
+
+    def test_readd_after_delete(self):
+        target = list(self.artworks)[5]
+        self.index.delete(target)
+        self.index.add(target, self.artworks[target])
+        self.assertEqual(self.index.search(self.artworks[target])[0][0], target)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings wajib diisi saat app.core.config diimpor (juga di worker pool)
+for name, value in {
+    "DATABASE_URL": "sqlite://", "SECRET_KEY": "test", "MAIL_USERNAME": "test", "MAIL_PASSWORD": "test",
+    "MAIL_FROM": "test@example.com", "MAIL_PORT": "25", "MAIL_SERVER": "localhost",
+    "NEURAL_SIMILARITY_ENABLED": "false",
+}.items():
+    os.environ.setdefault(name, value)
+
+from app.core import process_pool
+from app.core.config import settings
+
+
+class TestProcessPool(unittest.TestCase):
+
+    def setUp(self):
+        self.old_workers = settings.CPU_POOL_WORKERS
+        settings.CPU_POOL_WORKERS = 1
+
+    def tearDown(self):
+        process_pool.shutdown_pool()
+        settings.CPU_POOL_WORKERS = self.old_workers
+
+    def test_requests_before_startup_wait_for_process_pool(self):
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            pids = await asyncio.gather(*(process_pool.run_in_pool(os.getpid) for _ in range(3)))
+            task.cancel()
+            return pids, ticks
+
+        with mock.patch.object(process_pool, "start_pool", wraps=process_pool.start_pool) as start:
+            pids, ticks = asyncio.run(scenario())
+        self.assertEqual(start.call_count, 1)
+        # Tidak ada task yang jatuh ke thread executor proses ini
+        self.assertNotIn(os.getpid(), pids)
+        self.assertEqual(process_pool.pool_stats()["mode"], "process")
+        # Event loop tetap berjalan selama worker dipanaskan
+        self.assertGreater(ticks, 0)
+
+    def test_disabled_pool_runs_in_thread_executor(self):
+        settings.CPU_POOL_WORKERS = 0
+        self.assertEqual(asyncio.run(process_pool.run_in_pool(os.getpid)), os.getpid())
+        self.assertEqual(process_pool.pool_stats()["mode"], "thread")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings wajib diisi saat app.db.database diimpor; tes ini memakai SQLite sendiri
+for name, value in {
+    "DATABASE_URL": "sqlite://", "SECRET_KEY": "test", "MAIL_USERNAME": "test", "MAIL_PASSWORD": "test",
+    "MAIL_FROM": "test@example.com", "MAIL_PORT": "25", "MAIL_SERVER": "localhost",
+}.items():
+    os.environ.setdefault(name, value)
+
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import artwork, like, purchase, receipt, user  # noqa: F401
+from app.services import similarity
+from app.services.hash_index import HASH_BANDS
+from app.utils.image_similarity import HASH_THRESHOLDS, is_similar_by_hashes
+
+
+class TestHashThresholds(unittest.TestCase):
+    BASE = "0" * 16
+
+    def artwork(self, value):
+        return mock.Mock(hash=value, hash_phash=value, hash_dhash=None, hash_whash=None)
+
+    def test_threshold_counts_bits(self):
+        hashes = {"ahash": self.BASE, "phash": self.BASE, "dhash": self.BASE, "whash": self.BASE}
+        self.assertTrue(is_similar_by_hashes(hashes, self.artwork("0" * 15 + "3")))  # 2 bit
+        self.assertFalse(is_similar_by_hashes(hashes, self.artwork("0" * 15 + "7")))  # 3 bit
+        # Satu karakter hex berbeda 4 bit; aturan lama (per karakter) menganggapnya mirip
+        self.assertFalse(is_similar_by_hashes(hashes, self.artwork("0" * 15 + "f")))
+
+    def test_thresholds_fit_band_index(self):
+        self.assertLess(max(HASH_THRESHOLDS.values()), HASH_BANDS)
+
+
+class TestLiveCandidates(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        engine = create_engine(f"sqlite:///{os.path.join(self.tmp.name, 'artworks.db')}")
+        user.User.__table__.create(engine)
+        artwork.Artwork.__table__.create(engine)
+        self.sessions = sessionmaker(bind=engine)
+        owner = user.User(id=uuid.uuid4(), username="ani", name="Ani", email="ani@example.com", password_hash="x")
+        self.live_id = uuid.uuid4()
+        with self.sessions() as db:
+            db.add(owner)
+            db.add(artwork.Artwork(
+                id=self.live_id, owner_id=owner.id, title="Ada", image_url="/static/a.png",
+                unique_key="key-1", hash="0" * 16,
+            ))
+            db.commit()
+        patcher = mock.patch("app.db.database.SessionLocal", self.sessions)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_first_live_skips_deleted_artworks(self):
+        deleted = str(uuid.uuid4())
+        self.assertEqual(similarity._first_live([deleted, str(self.live_id)]), str(self.live_id))
+        self.assertIsNone(similarity._first_live([deleted]))
+        self.assertIsNone(similarity._first_live([]))
+
+    def test_hash_stage_decides_on_live_artwork_only(self):
+        deleted = str(uuid.uuid4())
+        image = Image.new("RGB", (16, 16))
+        with mock.patch.object(similarity, "_hash_stage", return_value=([deleted, str(self.live_id)], [])):
+            verdict = similarity.find_duplicate(image, {})
+        self.assertEqual((verdict["duplicate_of"], verdict["stage"]), (str(self.live_id), "hash"))
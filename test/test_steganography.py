@@ -2,17 +2,30 @@
 import os
 import sys
 import unittest
+import io
 import string
+import tempfile
+from unittest import mock
+import numpy as np
 from PIL import Image
 from PIL.ImageEnhance import Brightness
 
 # pastikan bisa import package app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app import steganography
 from app.steganography import (
     embed_message_lsb_from_pil_image,
     extract_message_lsb_from_pil_image,
     extract_message_lsb,  # tambahin ini
+    embed_message_lsb,
+    embed_watermark,
+    embed_watermark_from_pil_image,
+    extract_watermark,
+    extract_watermark_from_pil_image,
+    pack_watermark,
+    unpack_watermark,
+    text_to_binary,
     rotate_image,
 )
 
@@ -82,6 +95,94 @@ class TestSteganography(unittest.TestCase):
         extracted = extract_message_lsb_from_pil_image(encoded)
         self.assertEqual(extracted, self.message)
 
+    def test_embed_message_lsb_matches_legacy_bits(self):
+        message = "COPYRIGHT:abc<USER_MESSAGE>héllo"
+        pixels = np.random.default_rng(0).integers(0, 256, (40, 30, 3), dtype=np.uint8)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "art.png")
+            Image.fromarray(pixels).save(path)
+            stego_path = embed_message_lsb(path, message)
+            stego = np.asarray(Image.open(stego_path).convert("RGB")).reshape(-1)
+
+            expected = [int(b) for b in text_to_binary(message + "<END>")]
+            self.assertEqual(list(stego[:len(expected)] & 1), expected)
+            self.assertTrue(np.array_equal(stego[len(expected):], pixels.reshape(-1)[len(expected):]))
+            self.assertEqual(extract_message_lsb(stego_path), message)
+
+    def test_watermark_container_roundtrip(self):
+        copyright_hash = "ab" * 32
+        payload = pack_watermark(copyright_hash, "pesan kreator ✓")
+        self.assertEqual(unpack_watermark(payload)["user_message"], "pesan kreator ✓")
+
+        corrupted = bytearray(payload)
+        corrupted[-1] ^= 0xFF
+        with self.assertRaises(ValueError):
+            unpack_watermark(bytes(corrupted))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "art.png")
+            self.image.save(path)
+            self.assertIsNone(extract_watermark(path))
+
+            extracted = extract_watermark(embed_watermark(path, copyright_hash, "中文"))
+            self.assertEqual(extracted["copyright_hash"], copyright_hash)
+            self.assertEqual(extracted["user_message"], "中文")
+
+            legacy = extract_watermark(embed_message_lsb(path, f"COPYRIGHT:{copyright_hash}<USER_MESSAGE>abc"))
+            self.assertEqual(legacy["copyright_hash"], copyright_hash)
+            self.assertEqual(legacy["user_message"], "abc")
+
+    def test_extract_watermark_decodes_only_leading_rows(self):
+        copyright_hash = "cd" * 32
+        pixels = np.random.default_rng(1).integers(0, 256, (400, 300, 3), dtype=np.uint8)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "art.png")
+            Image.fromarray(pixels).save(path)
+            stego_path = embed_watermark(path, copyright_hash, "pesan")
+
+            # Potong file: baris bawah hilang, strip atas masih utuh
+            with open(stego_path, "rb") as f:
+                data = f.read()
+            truncated_path = os.path.join(tmp, "truncated.png")
+            with open(truncated_path, "wb") as f:
+                f.write(data[:len(data) // 2])
+
+            extracted = extract_watermark(truncated_path)
+            self.assertEqual(extracted["copyright_hash"], copyright_hash)
+            self.assertEqual(extracted["user_message"], "pesan")
+
+    def test_extract_watermark_falls_back_to_full_decode(self):
+        stego = embed_watermark_from_pil_image(self.image, "ab" * 32, "pesan")
+        png = io.BytesIO()
+        stego.save(png, format="PNG")
+        # Versi Pillow yang belum diuji: internal ImageFile tidak disentuh
+        with mock.patch.object(steganography, "PARTIAL_DECODE_PILLOW_MAJORS", range(0)):
+            self.assertEqual(extract_watermark(png)["copyright_hash"], "ab" * 32)
+
+    def test_extract_watermark_decodes_non_png_once(self):
+        stego = embed_watermark_from_pil_image(self.image, "ab" * 32, "pesan " * 50)
+        bmp = io.BytesIO()
+        stego.save(bmp, format="BMP")
+        with mock.patch.object(steganography, "_decode_all_rows", wraps=steganography._decode_all_rows) as decode:
+            self.assertEqual(extract_watermark(bmp)["user_message"], "pesan " * 50)
+        self.assertEqual(decode.call_count, 1)
+
+    def test_embed_watermark_from_pil_image_in_memory(self):
+        stego = embed_watermark_from_pil_image(self.image, "ef" * 32, "pesan")
+        buffer = io.BytesIO()
+        stego.save(buffer, format="PNG")
+
+        extracted = extract_watermark(buffer)
+        self.assertEqual(extracted["copyright_hash"], "ef" * 32)
+        self.assertEqual(extracted["user_message"], "pesan")
+
+    def test_extract_watermark_from_decoded_image(self):
+        stego = embed_watermark_from_pil_image(self.image, "ef" * 32, "pesan")
+        extracted = extract_watermark_from_pil_image(stego)
+        self.assertEqual(extracted["copyright_hash"], "ef" * 32)
+        self.assertEqual(extracted["user_message"], "pesan")
+        self.assertIsNone(extract_watermark_from_pil_image(self.image))
+
     def test_rotate(self):
         r90 = rotate_image(self.image, 90)
         self.assertEqual(r90.size, (100, 100))
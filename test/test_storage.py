@@ -0,0 +1,142 @@
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.storage import LocalStorage, S3Storage, key_from_url, static_url
+from app.storage.s3 import MIN_PART_BYTES
+
+
+class ClientError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """Pengganti bucket S3 di memori (subset API boto3 yang dipakai S3Storage)."""
+
+    def __init__(self, fail_on_part=None):
+        self.objects = {}
+        self.uploads = {}
+        self.aborted = []
+        self.fail_on_part = fail_on_part
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        self.objects[(Bucket, Key)] = bytes(Body)
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise ClientError("NoSuchKey")
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise ClientError("404")
+        return {}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == self.fail_on_part:
+            raise ClientError("InternalError")
+        self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[(Bucket, Key)] = b"".join(parts[p["PartNumber"]] for p in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId)
+        self.aborted.append(UploadId)
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://s3.test/{Params['Bucket']}/{Params['Key']}?expires={ExpiresIn}"
+
+
+class StorageContract:
+    """Perilaku yang sama untuk semua driver."""
+
+    def test_put_get_exists_delete(self):
+        run = asyncio.run
+        run(self.storage.put("watermarked/ab/x.png", b"isi"))
+        self.assertTrue(run(self.storage.exists("watermarked/ab/x.png")))
+        self.assertEqual(run(self.storage.get("watermarked/ab/x.png")), b"isi")
+        self.assertEqual(self.storage.read("watermarked/ab/x.png"), b"isi")
+        run(self.storage.delete("watermarked/ab/x.png"))
+        run(self.storage.delete("watermarked/ab/x.png"))
+        self.assertFalse(run(self.storage.exists("watermarked/ab/x.png")))
+        with self.assertRaises(FileNotFoundError):
+            run(self.storage.get("watermarked/ab/x.png"))
+
+    def test_put_stream(self):
+        data = os.urandom(3 * 1024 + 7)
+        self.assertEqual(asyncio.run(self.storage.put_stream("profile_pictures/a.png", io.BytesIO(data))), len(data))
+        self.assertEqual(asyncio.run(self.storage.get("profile_pictures/a.png")), data)
+
+    def test_keys_outside_root_are_rejected(self):
+        for key in ("../x.png", "/etc/passwd", "a/../../x", ""):
+            with self.assertRaises(ValueError):
+                asyncio.run(self.storage.put(key, b"x"))
+
+
+class TestLocalStorage(StorageContract, unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = LocalStorage(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_url_is_static_path(self):
+        self.assertEqual(self.storage.url("watermarked/x.png"), "/static/watermarked/x.png")
+
+
+class TestS3Storage(StorageContract, unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeS3Client()
+        self.storage = S3Storage(self.client, "artworks", prefix="prod", part_bytes=MIN_PART_BYTES)
+
+    def test_large_stream_uses_multipart_upload(self):
+        data = os.urandom(2 * MIN_PART_BYTES + 10)
+        self.assertEqual(asyncio.run(self.storage.put_stream("big.png", io.BytesIO(data))), len(data))
+        self.assertEqual(self.client.objects[("artworks", "prod/big.png")], data)
+        self.assertEqual(self.client.uploads, {})
+
+    def test_failed_multipart_upload_is_aborted(self):
+        self.client.fail_on_part = 2
+        with self.assertRaises(ClientError):
+            asyncio.run(self.storage.put_stream("big.png", io.BytesIO(os.urandom(2 * MIN_PART_BYTES))))
+        self.assertEqual(self.client.aborted, ["upload-0"])
+        self.assertNotIn(("artworks", "prod/big.png"), self.client.objects)
+
+    def test_presigned_or_public_url(self):
+        self.assertEqual(self.storage.url("a.png", expires_in=60), "https://s3.test/artworks/prod/a.png?expires=60")
+        public = S3Storage(self.client, "artworks", public_base_url="https://cdn.test/")
+        self.assertEqual(public.url("a.png"), "https://cdn.test/a.png")
+
+
+class TestStaticUrl(unittest.TestCase):
+
+    def test_round_trip(self):
+        self.assertEqual(static_url("watermarked/ab/x.png"), "/static/watermarked/ab/x.png")
+        self.assertEqual(key_from_url("/static/watermarked/ab/x.png"), "watermarked/ab/x.png")
+        self.assertEqual(key_from_url("http://localhost:8000/static/profile_pictures/a%20b.png"), "profile_pictures/a b.png")
+        self.assertIsNone(key_from_url("/api/media/profile_pictures/a.png"))
+
+
+if __name__ == "__main__":
+    unittest.main()
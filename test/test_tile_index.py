@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.tile_index import TILES, TileIndex, compute_tile_hashes
+
+
+def make_image(seed, size=(480, 360)):
+    rng = np.random.default_rng(seed)
+    small = Image.fromarray(rng.integers(0, 256, (size[1] // 12, size[0] // 12, 3), dtype=np.uint8))
+    return small.resize(size, Image.Resampling.BICUBIC).filter(ImageFilter.GaussianBlur(2))
+
+
+class TestTileIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = TileIndex(os.path.join(self.tmp.name, "tiles"))
+        self.artwork_id = uuid.uuid4()
+        self.image = make_image(0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_flat_tiles_are_skipped(self):
+        self.assertEqual(len(compute_tile_hashes(self.image)), len(TILES))
+        self.assertEqual(compute_tile_hashes(Image.new("RGB", (200, 200), (40, 40, 40))), [])
+
+    def test_quadrant_reports_region(self):
+        self.index.add(uuid.uuid4(), compute_tile_hashes(make_image(1)))
+        self.index.add(self.artwork_id, compute_tile_hashes(self.image))
+
+        fragment = self.image.crop((240, 0, 480, 180))
+        results = self.index.find_fragment(fragment)
+        self.assertEqual(results[0]["artwork_id"], str(self.artwork_id))
+        self.assertEqual(results[0]["region"], {"left": 0.5, "top": 0.0, "right": 1.0, "bottom": 0.5})
+
+    def test_finds_in_sorted_postings_and_tail(self):
+        self.index.rebuild([(self.artwork_id, compute_tile_hashes(self.image))])
+        # Pencarian pertama mengurutkan postings; baris berikutnya masuk ekor
+        self.assertEqual(self.index.find_fragment(self.image.crop((0, 180, 240, 360)))[0]["artwork_id"], str(self.artwork_id))
+
+        tail_id = uuid.uuid4()
+        tail_image = make_image(2)
+        self.index.add(tail_id, compute_tile_hashes(tail_image))
+        self.assertEqual(self.index.find_fragment(tail_image.crop((0, 0, 240, 180)))[0]["artwork_id"], str(tail_id))
+        self.assertLess(self.index._sorted_count, len(self.index))
+
+    def test_deleted_artwork_is_not_a_source(self):
+        self.index.add(self.artwork_id, compute_tile_hashes(self.image))
+        fragment = self.image.crop((240, 0, 480, 180))
+        self.assertTrue(self.index.find_fragment(fragment))
+
+        self.index.delete(self.artwork_id)
+        self.assertEqual(self.index.find_fragment(fragment), [])
+
+    def test_unrelated_image_has_no_source(self):
+        self.index.add(self.artwork_id, compute_tile_hashes(self.image))
+        self.assertEqual(self.index.find_fragment(make_image(3).crop((0, 0, 240, 180))), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
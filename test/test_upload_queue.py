@@ -0,0 +1,162 @@
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import unittest
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings wajib diisi saat app.db.database diimpor; tes ini memakai SQLite sendiri
+for name, value in {
+    "DATABASE_URL": "sqlite://", "SECRET_KEY": "test", "MAIL_USERNAME": "test", "MAIL_PASSWORD": "test",
+    "MAIL_FROM": "test@example.com", "MAIL_PORT": "25", "MAIL_SERVER": "localhost",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.storage
+from app.core.config import settings
+from app.jobs.upload_worker import process_job
+from app.models import artwork, like, purchase, receipt, user  # noqa: F401
+from app.models.upload_job import UploadJob
+from app.services import upload_queue
+from app.storage import LocalStorage
+
+
+class TestUploadQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = LocalStorage(os.path.join(self.tmp.name, "private"))
+        patcher = mock.patch.object(upload_queue, "get_private_storage", return_value=self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        engine = create_engine(f"sqlite:///{os.path.join(self.tmp.name, 'jobs.db')}")
+        user.User.__table__.create(engine)
+        artwork.Artwork.__table__.create(engine)
+        UploadJob.__table__.create(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.owner = uuid.uuid4()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def enqueue(self, title="karya"):
+        return asyncio.run(upload_queue.enqueue(
+            self.db, self.owner, io.BytesIO(b"image-bytes"), {"title": title, "filename": "a.png"}
+        ))
+
+    def claim(self, worker="w1", stale_seconds=600):
+        return asyncio.run(upload_queue.claim_next(self.db, worker, stale_seconds, max_attempts=2))
+
+    def test_jobs_are_claimed_once_in_order(self):
+        first, second = self.enqueue("a"), self.enqueue("b")
+        self.assertTrue(first.upload_path.startswith("upload_jobs/"))
+        self.assertEqual(asyncio.run(upload_queue.read_upload(first)), b"image-bytes")
+
+        claimed = self.claim()
+        self.assertEqual(claimed.id, first.id)
+        self.assertEqual((claimed.status, claimed.attempts, claimed.worker), ("running", 1, "w1"))
+        self.assertEqual(self.claim("w2").id, second.id)
+        self.assertIsNone(self.claim("w3"))
+
+    def test_finish_and_fail_remove_upload(self):
+        done, failed = self.enqueue("a"), self.enqueue("b")
+        asyncio.run(upload_queue.finish(self.db, self.claim(), {"artwork_id": "x"}))
+        asyncio.run(upload_queue.fail(self.db, self.claim(), "duplikat", 400))
+
+        self.assertEqual(upload_queue.job_status(done)["result"], {"artwork_id": "x"})
+        status = upload_queue.job_status(failed)
+        self.assertEqual((status["status"], status["error"]), ("failed", "duplikat"))
+        self.assertEqual(failed.error_status, 400)
+        self.assertFalse(os.path.exists(self.storage.path(done.upload_path)))
+        self.assertFalse(os.path.exists(self.storage.path(failed.upload_path)))
+
+    def test_job_with_saved_artwork_is_reindexed_before_finishing(self):
+        self.enqueue()
+        job = self.claim()
+        self.db.add(artwork.Artwork(
+            id=job.artwork_id, owner_id=self.owner, title="karya", image_url="/static/watermarked/a.png",
+            unique_key="key-1", hash="0" * 16,
+        ))
+        self.db.commit()
+
+        with mock.patch("app.services.upload_service.reindex_artwork", new_callable=mock.AsyncMock) as reindex:
+            asyncio.run(process_job(self.db, job))
+        saved, content = reindex.await_args.args
+        self.assertEqual((saved.id, content), (job.artwork_id, b"image-bytes"))
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.result["artwork_id"], str(job.artwork_id))
+
+    def test_heartbeat_keeps_long_running_job_claimed(self):
+        job = self.enqueue()
+        self.claim("w1")
+        job.heartbeat_at -= timedelta(seconds=700)
+        self.db.commit()
+
+        self.assertTrue(upload_queue.heartbeat(self.db, job.id, "w1"))
+        self.assertIsNone(self.claim("w2"))
+        self.assertFalse(upload_queue.heartbeat(self.db, job.id, "w2"))
+
+        asyncio.run(upload_queue.finish(self.db, job, {}))
+        self.assertFalse(upload_queue.heartbeat(self.db, job.id, "w1"))
+
+    def test_stale_running_job_is_reclaimed_then_failed(self):
+        job = self.enqueue()
+        self.claim()
+        self.assertIsNone(self.claim("w2"))
+
+        job.heartbeat_at -= timedelta(seconds=700)
+        self.db.commit()
+        reclaimed = self.claim("w2")
+        self.assertEqual((reclaimed.id, reclaimed.worker, reclaimed.attempts), (job.id, "w2", 2))
+
+        job.heartbeat_at -= timedelta(seconds=700)
+        self.db.commit()
+        self.assertIsNone(self.claim("w3"))
+        self.assertEqual(job.status, "failed")
+        self.assertFalse(os.path.exists(self.storage.path(job.upload_path)))
+
+
+class TestPrivateStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        names = ("STORAGE_BACKEND", "STORAGE_LOCAL_ROOT", "PRIVATE_STORAGE_LOCAL_ROOT", "S3_BUCKET", "S3_PRIVATE_BUCKET")
+        self.old = {name: getattr(settings, name) for name in names}
+        settings.STORAGE_LOCAL_ROOT = os.path.join(self.tmp.name, "static")
+        app.storage._private_storage = None
+
+    def tearDown(self):
+        for name, value in self.old.items():
+            setattr(settings, name, value)
+        app.storage._private_storage = None
+        self.tmp.cleanup()
+
+    def test_spool_is_outside_public_root(self):
+        settings.STORAGE_BACKEND = "local"
+        settings.PRIVATE_STORAGE_LOCAL_ROOT = os.path.join(settings.STORAGE_LOCAL_ROOT, "upload_jobs")
+        with self.assertRaises(ValueError):
+            app.storage.get_private_storage()
+
+        settings.PRIVATE_STORAGE_LOCAL_ROOT = os.path.join(self.tmp.name, "private")
+        self.assertEqual(app.storage.get_private_storage().root, settings.PRIVATE_STORAGE_LOCAL_ROOT)
+
+    def test_s3_requires_separate_private_bucket(self):
+        settings.STORAGE_BACKEND = "s3"
+        settings.S3_BUCKET = "artworks"
+        for bucket in (None, "artworks"):
+            settings.S3_PRIVATE_BUCKET = bucket
+            with self.assertRaises(ValueError):
+                app.storage.get_private_storage()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import watermark
+from app.services.watermark import OUTLINE_COLOR, OUTLINE_WIDTH, TEXT_COLOR, add_physical_watermark, load_font, text_sprite
+
+
+def make_image(size=(480, 360)):
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8))
+
+
+class TestWatermark(unittest.TestCase):
+
+    def test_sprite_matches_direct_drawing(self):
+        # Referensi: outline + isi digambar langsung dengan ImageDraw seperti implementasi lama
+        image = make_image()
+        text, position = "by pelukis_senja", (30, 40)
+        font = load_font("arial.ttf", 24)
+        reference = image.convert("RGBA")
+        draw = ImageDraw.Draw(reference)
+        for dx in (-OUTLINE_WIDTH, 0, OUTLINE_WIDTH):
+            for dy in (-OUTLINE_WIDTH, 0, OUTLINE_WIDTH):
+                if dx or dy:
+                    draw.text((position[0] + dx, position[1] + dy), text, font=font, fill=OUTLINE_COLOR)
+        draw.text(position, text, font=font, fill=TEXT_COLOR)
+
+        sprite = text_sprite(text, "arial.ttf", 24, TEXT_COLOR, OUTLINE_COLOR, OUTLINE_WIDTH)
+        result = watermark.draw_text_sprites(image, [(sprite, position)])
+        difference = np.abs(np.asarray(result, dtype=int) - np.asarray(reference.convert("RGB"), dtype=int))
+        self.assertLessEqual(difference.max(), 2)
+
+    def test_sprites_are_cached(self):
+        text_sprite.cache_clear()
+        watermark.diagonal_sprite.cache_clear()
+        for _ in range(3):
+            add_physical_watermark(make_image(), "by pelukis_senja")
+        self.assertEqual(text_sprite.cache_info().misses, 1)
+        self.assertEqual(watermark.diagonal_sprite.cache_info().hits, 2)
+
+    def test_small_image_is_clipped(self):
+        image = make_image((40, 30))
+        result = add_physical_watermark(image, "by pelukis_dengan_nama_panjang")
+        self.assertEqual((result.mode, result.size), ("RGB", (40, 30)))
+        self.assertFalse(np.array_equal(np.asarray(result), np.asarray(image)))
+
+
+if __name__ == "__main__":
+    unittest.main()